@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""
+Measure allocations and memory of holding chunks as dicts versus ChunkBatch
+
+Chunks a synthetic corpus of text files both ways and keeps every result
+alive, as the ingestion pipeline does between extraction and writing.
+Each mode runs in its own subprocess so peak RSS is not shared.
+"""
+
+import argparse
+import gc
+import json
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+# Add project root to Python path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import numpy as np
+from src.core.document_processor import DocumentProcessor
+from src.utils.config import Config
+
+WORDS = ("revenue growth market product region quarter model network data training "
+         "image chart report sales customer learning system analysis forecast cost").split()
+
+
+def write_corpus(folder: Path, files: int, words_per_file: int, seed: int = 0):
+    """Plain text files with sentence punctuation for the chunker"""
+    rng = np.random.RandomState(seed)
+    for i in range(files):
+        words = rng.choice(WORDS, size=words_per_file)
+        sentences = [" ".join(words[j:j + 12]).capitalize() + "." for j in range(0, words_per_file, 12)]
+        (folder / f"file_{i}.txt").write_text(" ".join(sentences))
+
+
+def measure(mode: str, folder: str) -> dict:
+    """Chunk every file in folder, keeping the results, and report memory"""
+    processor = DocumentProcessor(Config())
+    paths = sorted(str(p) for p in Path(folder).glob("*.txt"))
+    gc.collect()
+
+    tracemalloc.start()
+    start = time.perf_counter()
+    kept = []
+    for path in paths:
+        if mode == "dicts":
+            kept.append(processor.process_document(path))
+        else:
+            kept.append(processor.process_document_batch(path))
+    seconds = time.perf_counter() - start
+    current, peak = tracemalloc.get_traced_memory()
+    blocks = sum(stat.count for stat in tracemalloc.take_snapshot().statistics("filename"))
+    tracemalloc.stop()
+
+    return {
+        "mode": mode,
+        "chunks": sum(len(chunks) for chunks in kept),
+        "seconds": seconds,
+        "retained_mb": current / 1e6,
+        "peak_traced_mb": peak / 1e6,
+        "live_blocks": blocks,
+        "max_rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--files", type=int, default=500)
+    parser.add_argument("--words", type=int, default=20000, help="Words per file")
+    parser.add_argument("--output", default=None, help="Write the report as JSON")
+    parser.add_argument("--mode", default=None, help=argparse.SUPPRESS)
+    parser.add_argument("--folder", default=None, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.mode:
+        print(json.dumps(measure(args.mode, args.folder)))
+        return 0
+
+    report = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        write_corpus(Path(tmp), args.files, args.words)
+        for mode in ("dicts", "batch"):
+            output = subprocess.run(
+                [sys.executable, __file__, "--mode", mode, "--folder", tmp],
+                check=True, capture_output=True, text=True
+            ).stdout
+            report[mode] = json.loads(output.strip().splitlines()[-1])
+
+    for mode in ("dicts", "batch"):
+        r = report[mode]
+        print(f"📊 {mode:<6} {r['chunks']} chunks: retained {r['retained_mb']:.1f} MB, "
+              f"{r['live_blocks']} live blocks, max RSS {r['max_rss_mb']:.0f} MB, {r['seconds']:.2f}s")
+    print(f"📉 retained memory x{report['dicts']['retained_mb'] / report['batch']['retained_mb']:.1f} smaller, "
+          f"live blocks x{report['dicts']['live_blocks'] / report['batch']['live_blocks']:.0f} fewer")
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+"""
+Benchmark the streaming columnar export and import of a store
+
+Fills a store in a temporary directory with synthetic chunks and random
+unit vectors (nothing is embedded), then exports it in each layout and
+imports the export into an empty collection. Reports rows/s, file size
+and the peak Python heap during export (tracemalloc), which should stay
+near one page of --batch-size chunks whatever --chunks is.
+"""
+
+import argparse
+import json
+import sys
+import tempfile
+import time
+import tracemalloc
+import uuid
+from pathlib import Path
+
+# Add project root to Python path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import numpy as np
+import yaml
+from src.core.vector_store import VectorStore
+from src.models.schemas import ChunkBatch
+from src.utils.config import Config
+
+WORDS = ("revenue growth market product region quarter model network data training "
+         "image chart report sales customer learning system analysis forecast cost").split()
+
+
+def make_config(workdir: Path, base_path: str = None) -> Config:
+    """Copy the project config with a private store"""
+    settings = json.loads(json.dumps(Config(base_path)._config))
+    settings["vector_db"]["path"] = str(workdir / "db")
+    settings.setdefault("dedup", {})["enabled"] = False
+    settings.setdefault("hierarchy", {})["enabled"] = False
+    settings.setdefault("sharding", {})["enabled"] = False
+    path = workdir / "config.yaml"
+    with open(path, "w") as f:
+        yaml.dump(settings, f, default_flow_style=False)
+    return Config(str(path))
+
+
+def fill(store: VectorStore, count: int, files: int, batch_size: int, seed: int = 0):
+    """Write synthetic chunks with random unit vectors"""
+    rng = np.random.RandomState(seed)
+    dimension = store.projection.dimension or store.embedding_model.get_sentence_embedding_dimension()
+    for start in range(0, count, batch_size):
+        documents = []
+        for i in range(start, min(start + batch_size, count)):
+            filename = f"file_{i % files}.pdf"
+            documents.append({
+                "id": f"{filename}_{i}_{str(uuid.uuid4())[:8]}",
+                "content": " ".join(rng.choice(WORDS, size=rng.randint(10, 200))),
+                "metadata": {"filename": filename, "file_type": "pdf", "page_number": i % 17,
+                             "chunk_index": i // files, "content_type": "text"}
+            })
+        vectors = rng.randn(len(documents), dimension).astype(np.float32)
+        vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+        store.write_documents(ChunkBatch.from_documents(documents), vectors)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--config", default=None, help="Config file, config.yaml by default")
+    parser.add_argument("--chunks", type=int, default=20000)
+    parser.add_argument("--files", type=int, default=200)
+    parser.add_argument("--batch-size", type=int, default=1000, help="Chunks per export page")
+    parser.add_argument("--layouts", default="npy,parquet,arrow", help="Layouts to compare")
+    parser.add_argument("--output", default=None, help="Write the report as JSON")
+    args = parser.parse_args()
+
+    report = {"chunks": args.chunks, "batch_size": args.batch_size, "layouts": {}}
+    with tempfile.TemporaryDirectory() as workdir:
+        workdir = Path(workdir)
+        config = make_config(workdir, args.config)
+        store = VectorStore(config)
+        fill(store, args.chunks, args.files, 1000)
+        print(f"📄 {store.get_collection_stats()} chunks in {config.get('vector_db.path')}")
+
+        for layout in args.layouts.split(","):
+            folder = workdir / f"export_{layout}"
+            tracemalloc.start()
+            try:
+                exported = store.export_columnar(str(folder), args.batch_size, layout)
+            except ImportError as e:
+                tracemalloc.stop()
+                print(f"❌ {layout}: {e}")
+                continue
+            peak = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+
+            target = VectorStore(config, collection_name=f"imported_{layout}")
+            start = time.perf_counter()
+            imported = target.import_columnar(str(folder), args.batch_size)
+            import_seconds = time.perf_counter() - start
+
+            entry = {
+                "bytes": exported["bytes"],
+                "export_rows_per_s": exported["rows"] / exported["seconds"],
+                "export_peak_heap_bytes": peak,
+                "import_rows_per_s": imported / import_seconds
+            }
+            report["layouts"][layout] = entry
+            print(f"📊 {layout:<8} {entry['bytes'] / 2 ** 20:6.1f} MiB, export {entry['export_rows_per_s']:.0f} rows/s "
+                  f"(heap peak {peak / 2 ** 20:.1f} MiB), import {entry['import_rows_per_s']:.0f} rows/s")
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
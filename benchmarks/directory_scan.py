@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""
+Benchmark folder scanning: one recursive glob per extension (the previous
+process_folder discovery) against the single-pass FileScanner
+
+Scans --root if given, otherwise a synthetic tree in a temporary directory.
+Run each method a few times; the first pass on a real corpus mostly
+measures the cold directory cache.
+"""
+
+import argparse
+import glob
+import json
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+# Add project root to Python path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import numpy as np
+from src.utils.config import Config
+from src.utils.file_handlers import FileScanner
+
+EXTENSIONS = [".txt", ".pdf", ".png", ".jpg", ".jpeg", ".docx", ".csv", ".py", ".json", ".md"]
+
+
+def build_tree(root: Path, directories: int, files_per_directory: int, seed: int = 0):
+    """Nested directories of empty files with mixed extensions, some hidden"""
+    rng = np.random.RandomState(seed)
+    paths = [root]
+    for i in range(directories):
+        parent = paths[rng.randint(len(paths))]
+        name = f".cache{i}" if i % 25 == 0 else f"dir{i}"
+        path = parent / name
+        path.mkdir()
+        paths.append(path)
+        for j in range(files_per_directory):
+            (path / f"file{j}{EXTENSIONS[rng.randint(len(EXTENSIONS))]}").touch()
+
+
+def glob_scan(root: str, extensions):
+    """Discovery as process_folder did it before FileScanner"""
+    files = []
+    for ext in extensions:
+        files.extend(glob.glob(os.path.join(root, f"**/*{ext}"), recursive=True))
+    return files
+
+
+def timed(fn, repeat: int):
+    """Best wall time over repeat runs and the last result"""
+    best = float("inf")
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--root", default=None, help="Existing folder to scan")
+    parser.add_argument("--directories", type=int, default=2000)
+    parser.add_argument("--files-per-directory", type=int, default=25)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--output", default=None, help="Write the report as JSON")
+    args = parser.parse_args()
+
+    config = Config()
+    extensions = config.get("processing.supported_extensions", [".txt", ".pdf", ".png", ".jpg", ".jpeg"])
+
+    with tempfile.TemporaryDirectory() as tmp:
+        root = args.root
+        if root is None:
+            build_tree(Path(tmp), args.directories, args.files_per_directory)
+            root = tmp
+
+        glob_seconds, glob_files = timed(lambda: glob_scan(root, extensions), args.repeat)
+        scanner = FileScanner(config)
+        scan_seconds, scan_files = timed(lambda: list(scanner.scan(root)), args.repeat)
+
+    entries = scanner.stats["entries"]
+    report = {
+        "root": args.root or "synthetic",
+        "entries": entries,
+        "glob": {"seconds": glob_seconds, "files": len(glob_files), "entries_per_s": entries / glob_seconds},
+        "scandir": {"seconds": scan_seconds, "files": len(scan_files), "entries_per_s": entries / scan_seconds},
+        "speedup": glob_seconds / scan_seconds,
+        "scan_stats": scanner.stats
+    }
+    print(f"📊 {entries} entries: glob {glob_seconds:.3f}s ({len(glob_files)} files), "
+          f"scandir {scan_seconds:.3f}s ({len(scan_files)} files), {report['speedup']:.1f}x")
+    print(f"   skipped: {scanner.stats['skipped_hidden']} hidden, {scanner.stats['skipped_ignored']} ignored, "
+          f"{scanner.stats['skipped_size']} over size limit")
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,152 @@
+#!/usr/bin/env python3
+"""
+Compare embedding backends: parity, throughput and query latency
+
+Every backend embeds the same synthetic chunks and queries. The
+SentenceTransformer (PyTorch) backend is the reference. For each other
+backend the script reports the cosine similarity between its vectors and
+the reference vectors, and the overlap of each query's top-10
+neighbours. It exits with status 1 when the minimum cosine falls below
+--min-cosine, so it can serve as the parity check before switching
+embedding.backend or enabling embedding.onnx.quantize.
+
+The ONNX export and int8 quantization are cached in --cache-dir; the
+first run pays for them outside the timed sections.
+"""
+
+import argparse
+import json
+import sys
+import time
+from pathlib import Path
+
+# Add project root to Python path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import numpy as np
+from src.utils.config import Config
+from src.utils.embedding_backends import OnnxBackend, SentenceTransformerBackend, _folder_name, export_onnx, quantize_onnx
+
+WORDS = ("revenue growth market product region quarter model network data training "
+         "image chart report sales customer learning system analysis forecast cost").split()
+
+
+def make_texts(count: int, seed: int = 0):
+    """Chunk-like texts of varied length, from a few words to a full chunk"""
+    rng = np.random.RandomState(seed)
+    return [" ".join(rng.choice(WORDS, size=rng.randint(5, 120))) for _ in range(count)]
+
+
+def load(name: str, model: str, cache_dir: str, threads: int):
+    if name == "sentence_transformers":
+        return SentenceTransformerBackend(model, threads)
+    if name in ("onnx", "onnx-int8"):
+        return OnnxBackend(model, cache_dir, name == "onnx-int8", threads)
+    raise ValueError(f"Unknown backend: {name}")
+
+
+def measure(backend, texts, queries, batch_size: int) -> dict:
+    backend.encode(texts[:batch_size], batch_size=batch_size)
+
+    start = time.perf_counter()
+    embeddings = np.asarray(backend.encode(texts, batch_size=batch_size))
+    seconds = time.perf_counter() - start
+
+    latencies = []
+    query_embeddings = []
+    for query in queries:
+        began = time.perf_counter()
+        query_embeddings.append(np.asarray(backend.encode([query]))[0])
+        latencies.append(time.perf_counter() - began)
+    latencies = np.array(latencies) * 1000
+
+    return {
+        "embeddings": embeddings,
+        "queries": np.array(query_embeddings),
+        "report": {
+            "chunks_per_s": len(texts) / seconds,
+            "query_p50_ms": float(np.percentile(latencies, 50)),
+            "query_p95_ms": float(np.percentile(latencies, 95))
+        }
+    }
+
+
+def normalize(vectors: np.ndarray) -> np.ndarray:
+    return vectors / np.clip(np.linalg.norm(vectors, axis=1, keepdims=True), 1e-12, None)
+
+
+def parity(reference: dict, candidate: dict, k: int = 10) -> dict:
+    """Cosine between paired vectors and top-k neighbour overlap"""
+    cosines = (normalize(reference["embeddings"]) * normalize(candidate["embeddings"])).sum(axis=1)
+    ref_top = np.argsort(-normalize(reference["queries"]) @ normalize(reference["embeddings"]).T, axis=1)[:, :k]
+    new_top = np.argsort(-normalize(candidate["queries"]) @ normalize(candidate["embeddings"]).T, axis=1)[:, :k]
+    overlap = [len(set(a) & set(b)) / k for a, b in zip(ref_top, new_top)]
+    return {
+        "cosine_min": float(cosines.min()),
+        "cosine_mean": float(cosines.mean()),
+        f"top{k}_overlap": float(np.mean(overlap))
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--model", default=None, help="Model name or path, embedding.model by default")
+    parser.add_argument("--backends", default="sentence_transformers,onnx,onnx-int8")
+    parser.add_argument("--cache-dir", default=None, help="ONNX cache, embedding.onnx.cache_dir by default")
+    parser.add_argument("--texts", type=int, default=1000)
+    parser.add_argument("--queries", type=int, default=100)
+    parser.add_argument("--batch-size", type=int, default=32)
+    parser.add_argument("--threads", type=int, default=None, help="Intra-op threads, library default if unset")
+    parser.add_argument("--min-cosine", type=float, default=0.99, help="Parity threshold against the reference")
+    parser.add_argument("--output", default=None, help="Write the report as JSON")
+    args = parser.parse_args()
+
+    config = Config()
+    model = args.model or config.get("embedding.model", "sentence-transformers/all-MiniLM-L6-v2")
+    cache_dir = args.cache_dir or config.get("embedding.onnx.cache_dir", "./data/onnx_models")
+    names = args.backends.split(",")
+    texts = make_texts(args.texts)
+    queries = make_texts(args.queries, seed=1)
+
+    # Export and quantize up front so load times compare cached models
+    if any(name.startswith("onnx") for name in names):
+        folder = export_onnx(model, Path(cache_dir) / _folder_name(model))
+        if "onnx-int8" in names:
+            quantize_onnx(folder)
+
+    runs = {}
+    report = {"model": model, "threads": args.threads, "batch_size": args.batch_size, "backends": {}}
+    for name in names:
+        start = time.perf_counter()
+        backend = load(name, model, cache_dir, args.threads)
+        load_seconds = time.perf_counter() - start
+        runs[name] = measure(backend, texts, queries, args.batch_size)
+        report["backends"][name] = dict(runs[name]["report"], load_seconds=load_seconds)
+
+    reference = names[0]
+    failed = []
+    for name in names:
+        entry = report["backends"][name]
+        if name != reference:
+            entry["parity"] = parity(runs[reference], runs[name])
+            if entry["parity"]["cosine_min"] < args.min_cosine:
+                failed.append(name)
+        line = (f"📊 {name:<22} load {entry['load_seconds']:.1f}s, {entry['chunks_per_s']:.1f} chunks/s, "
+                f"query p50 {entry['query_p50_ms']:.2f} ms, p95 {entry['query_p95_ms']:.2f} ms")
+        if "parity" in entry:
+            line += (f", cosine min {entry['parity']['cosine_min']:.5f} mean {entry['parity']['cosine_mean']:.5f}, "
+                     f"top10 overlap {entry['parity']['top10_overlap']:.2f}")
+        print(line)
+
+    report["parity_failed"] = failed
+    for name in failed:
+        print(f"❌ {name}: cosine below {args.min_cosine} against {reference}")
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
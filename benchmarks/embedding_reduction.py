@@ -0,0 +1,183 @@
+#!/usr/bin/env python3
+"""
+Fit a PCA projection for embedding.reduction and measure what it costs
+
+Embeds a corpus sample with the configured model and compares reduced
+vectors against the full model vectors:
+
+  recall@k   share of each query's exact top-k (full dimension, float32)
+             found by the reduced vectors, PCA and truncation, float32
+             and float16
+  bytes      per vector at that dimension and precision, as held in
+             the query cache or a snapshot
+  chroma     on-disk size and query latency of a Chroma collection
+             holding the reduced vectors; Chroma stores float32, so
+             float16 rounding does not change these
+
+The sample comes from the chunks already in the configured collection,
+from --corpus (a folder DocumentProcessor can read) or, without either,
+from synthetic text. Queries are the opening words of --queries held-out
+chunks. With --save the PCA for --dimension is written where
+embedding.reduction.path points (or to the given path); set
+embedding.reduction.method to pca and re-ingest to use it.
+"""
+
+import argparse
+import json
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+# Add project root to Python path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import chromadb
+import numpy as np
+from src.core.document_processor import DocumentProcessor
+from src.utils.config import Config
+from src.utils.dimension_reduction import Projection, fit_pca
+from src.utils.embedding_backends import create_embedding_backend
+
+WORDS = ("revenue growth market product region quarter model network data training image chart "
+         "report sales customer learning system analysis forecast cost supply shipment budget").split()
+
+
+def load_chunks(config: Config, corpus: str, sample: int, seed: int = 0):
+    """Chunk texts from --corpus, the configured collection or synthetic text"""
+    rng = np.random.RandomState(seed)
+    if corpus:
+        processor = DocumentProcessor(config)
+        chunks = []
+        for path in sorted(Path(corpus).rglob("*")):
+            if path.is_file() and path.suffix.lower() in (".txt", ".md", ".pdf"):
+                chunks.extend(chunk["content"] for chunk in processor.process_document(str(path)))
+        source = corpus
+    else:
+        client = chromadb.PersistentClient(path=config.get("vector_db.path", "./data/vector_db"))
+        name = config.get("vector_db.collection_name", "multimodal_docs")
+        try:
+            chunks = client.get_collection(name).get(limit=sample, include=["documents"])["documents"]
+            source = f"collection {name}"
+        except Exception:
+            chunks = []
+        if not chunks:
+            chunks = [" ".join(rng.choice(WORDS, size=rng.randint(8, 160))) for _ in range(sample)]
+            source = "synthetic text"
+    chunks = [chunk for chunk in chunks if chunk and chunk.strip()]
+    rng.shuffle(chunks)
+    return chunks[:sample], source
+
+
+def top_k(queries: np.ndarray, corpus: np.ndarray, k: int) -> np.ndarray:
+    scores = queries @ corpus.T
+    return np.argsort(-scores, axis=1)[:, :k]
+
+
+def recall(reference: np.ndarray, found: np.ndarray) -> float:
+    return float(np.mean([len(set(a) & set(b)) / len(a) for a, b in zip(reference, found)]))
+
+
+def chroma_cost(vectors: np.ndarray, queries: np.ndarray, k: int) -> dict:
+    """Disk size and query latency of a Chroma collection with these vectors"""
+    with tempfile.TemporaryDirectory() as folder:
+        client = chromadb.PersistentClient(path=folder)
+        collection = client.create_collection("reduction_eval")
+        for start in range(0, len(vectors), 1000):
+            rows = vectors[start:start + 1000]
+            collection.add(ids=[str(i) for i in range(start, start + len(rows))], embeddings=rows)
+        collection.query(query_embeddings=queries[:1], n_results=k)
+        latencies = []
+        for query in queries:
+            began = time.perf_counter()
+            collection.query(query_embeddings=query[None, :], n_results=k, include=[])
+            latencies.append(time.perf_counter() - began)
+        size = sum(path.stat().st_size for path in Path(folder).rglob("*") if path.is_file())
+        del collection, client
+    return {"disk_bytes": size, "query_p50_ms": float(np.percentile(latencies, 50) * 1000)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--model", default=None, help="Model name or path, embedding.model by default")
+    parser.add_argument("--corpus", default=None, help="Folder of documents to sample chunks from")
+    parser.add_argument("--sample", type=int, default=5000, help="Chunks to fit and evaluate on")
+    parser.add_argument("--queries", type=int, default=200, help="Held-out chunks used as queries")
+    parser.add_argument("--dimensions", default="64,128,192,256", help="Reduced dimensions to compare")
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--no-chroma", action="store_true", help="Skip the Chroma size and latency runs")
+    parser.add_argument("--dimension", type=int, default=128, help="PCA dimension written by --save")
+    parser.add_argument("--save", nargs="?", const="", default=None,
+                        help="Write the fitted PCA, to embedding.reduction.path unless a path is given")
+    parser.add_argument("--output", default=None, help="Write the report as JSON")
+    args = parser.parse_args()
+
+    config = Config()
+    model_name = args.model or config.get("embedding.model", "sentence-transformers/all-MiniLM-L6-v2")
+    model = create_embedding_backend(config, model_name)
+    chunks, source = load_chunks(config, args.corpus, args.sample + args.queries)
+    queries = [" ".join(chunk.split()[:12]) for chunk in chunks[:args.queries]]
+    chunks = chunks[args.queries:]
+    print(f"📄 {len(chunks)} chunks and {len(queries)} queries from {source}, model {model_name} ({model.name})")
+
+    corpus_vectors = np.asarray(model.encode(chunks, batch_size=64), dtype=np.float32)
+    query_vectors = np.asarray(model.encode(queries, batch_size=64), dtype=np.float32)
+    full = Projection()
+    reference = top_k(full.transform(query_vectors), full.transform(corpus_vectors), args.k)
+
+    variants = [("none", None, full)]
+    for dimension in (int(value) for value in args.dimensions.split(",")):
+        if dimension >= corpus_vectors.shape[1]:
+            continue
+        variants.append(("pca", dimension, fit_pca(corpus_vectors, dimension, model_name)))
+        variants.append(("truncate", dimension, Projection("truncate", dimension)))
+
+    report = {"model": model_name, "source": source, "chunks": len(chunks), "queries": len(queries),
+              "k": args.k, "variants": []}
+    chroma = {}
+    for method, dimension, projection in variants:
+        width = dimension or corpus_vectors.shape[1]
+        for dtype in ("float32", "float16"):
+            projection.dtype = np.dtype(dtype)
+            stored = projection.transform(corpus_vectors)
+            asked = projection.transform(query_vectors)
+            entry = {
+                "method": method,
+                "dimension": width,
+                "dtype": dtype,
+                f"recall@{args.k}": recall(reference, top_k(asked, stored, args.k)),
+                "bytes_per_vector": width * projection.dtype.itemsize
+            }
+            if "explained_variance" in projection.info:
+                entry["explained_variance"] = projection.info["explained_variance"]
+            # Chroma keeps float32 whatever the rounding, so measure one dtype
+            if not args.no_chroma and dtype == "float32":
+                chroma[(method, width)] = chroma_cost(stored, asked, args.k)
+            if (method, width) in chroma:
+                entry["chroma"] = chroma[(method, width)]
+            report["variants"].append(entry)
+
+            line = (f"📊 {method:<8} {width:>4}d {dtype:<7} recall@{args.k} {entry[f'recall@{args.k}']:.3f}, "
+                    f"{entry['bytes_per_vector']:>5} B/vector")
+            if "chroma" in entry:
+                line += (f", chroma {entry['chroma']['disk_bytes'] / 2 ** 20:.1f} MiB, "
+                         f"query p50 {entry['chroma']['query_p50_ms']:.2f} ms")
+            if "explained_variance" in entry:
+                line += f", {entry['explained_variance']:.2%} variance"
+            print(line)
+        projection.dtype = np.dtype("float32")
+
+    if args.save is not None:
+        path = args.save or config.get("embedding.reduction.path", "./data/projection.npz")
+        projection = fit_pca(corpus_vectors, args.dimension, model_name)
+        projection.save(path)
+        print(f"💾 Saved {args.dimension}-d PCA ({projection.info['explained_variance']:.2%} variance) to {path}")
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
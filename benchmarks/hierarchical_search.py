@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""
+Benchmark two-stage (document -> page -> chunk) search against flat search
+
+Queries are sampled from stored chunks. Recall is the share of the flat
+top-k results that the hierarchical search also returns.
+"""
+
+import argparse
+import json
+import sys
+import time
+from pathlib import Path
+
+# Add project root to Python path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import numpy as np
+from src.core.rag_system import MultimodalRAG
+
+
+def sample_queries(collection, count: int, seed: int = 0):
+    """Use the opening words of random stored chunks as queries"""
+    total = collection.count()
+    rng = np.random.RandomState(seed)
+    offsets = rng.choice(total, size=min(count, total), replace=False)
+    queries = []
+    for offset in offsets:
+        doc = collection.get(limit=1, offset=int(offset), include=["documents"])
+        words = doc["documents"][0].split()
+        queries.append(" ".join(words[:12]))
+    return queries
+
+
+def run(vector_store, queries, top_k: int, hierarchical: bool):
+    """Run all queries, returning latencies and result ids"""
+    latencies = []
+    result_ids = []
+    for query in queries:
+        start = time.perf_counter()
+        results = vector_store.search(query, top_k=top_k, threshold=-1.0, hierarchical=hierarchical)
+        latencies.append(time.perf_counter() - start)
+        result_ids.append([r["id"] for r in results])
+    return np.array(latencies), result_ids
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--config", default=None, help="Config file (hierarchy.enabled must be true)")
+    parser.add_argument("--queries", type=int, default=100)
+    parser.add_argument("--top-k", type=int, default=5)
+    parser.add_argument("--rebuild", action="store_true", help="Rebuild summaries from the stored chunks first")
+    parser.add_argument("--output", default=None, help="Write the report as JSON")
+    args = parser.parse_args()
+
+    rag = MultimodalRAG(args.config)
+    store = rag.vector_store
+    if store.hierarchy is None:
+        print("❌ Set hierarchy.enabled: true in the config to build the summary index")
+        return 1
+    if args.rebuild:
+        store.hierarchy.rebuild(store.iter_chunks())
+
+    queries = sample_queries(store.collection, args.queries)
+    if not queries:
+        print("❌ Collection is empty")
+        return 1
+
+    # Warm up the model and the index
+    store.search(queries[0], top_k=args.top_k, threshold=-1.0)
+
+    flat_latency, flat_ids = run(store, queries, args.top_k, hierarchical=False)
+    tree_latency, tree_ids = run(store, queries, args.top_k, hierarchical=True)
+
+    recalls = [len(set(f) & set(t)) / len(f) for f, t in zip(flat_ids, tree_ids) if f]
+
+    report = {
+        "queries": len(queries),
+        "top_k": args.top_k,
+        "chunks": store.collection.count(),
+        "documents": store.hierarchy.documents.count(),
+        "pages": store.hierarchy.pages.count(),
+        "flat_ms": {"p50": float(np.percentile(flat_latency, 50) * 1000),
+                    "p95": float(np.percentile(flat_latency, 95) * 1000)},
+        "hierarchical_ms": {"p50": float(np.percentile(tree_latency, 50) * 1000),
+                            "p95": float(np.percentile(tree_latency, 95) * 1000)},
+        "recall_vs_flat": float(np.mean(recalls)) if recalls else 0.0
+    }
+
+    print(f"📊 {report['queries']} queries over {report['chunks']} chunks "
+          f"({report['documents']} documents, {report['pages']} pages)")
+    print(f"  Flat:         p50 {report['flat_ms']['p50']:.2f} ms, p95 {report['flat_ms']['p95']:.2f} ms")
+    print(f"  Hierarchical: p50 {report['hierarchical_ms']['p50']:.2f} ms, p95 {report['hierarchical_ms']['p95']:.2f} ms")
+    print(f"  Recall@{args.top_k} vs flat: {report['recall_vs_flat']:.3f}")
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
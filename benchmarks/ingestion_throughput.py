@@ -0,0 +1,297 @@
+#!/usr/bin/env python3
+"""
+Benchmark ingestion throughput per stage and end to end
+
+Synthesizes a corpus of text files, multi-page PDFs (PyMuPDF) and images
+with rendered text, then times each ingestion stage on its own:
+
+  scan      FileScanner over the corpus folder            files/s
+  extract   text file reads and PDF page.get_text         pages/s
+  ocr       ImageProcessor on the images                  images/s
+  chunk     the processors' chunkers on extracted text    chunks/s
+  dedup     VectorStore.prepare_documents                 chunks/s
+  embed     VectorStore.embed_documents                   chunks/s
+  write     VectorStore.write_documents                   chunks/s
+
+and MultimodalRAG.process_folder end to end for each extraction worker
+count. This is repeated for every corpus size in --sizes.
+
+Pass an earlier report to --baseline to fail (exit code 1) when any
+throughput figure dropped by more than --tolerance, e.g. before upgrading
+PyMuPDF, Chroma or the embedding model. Images are left out when no OCR
+backend is available. The default "hashing" model needs no download;
+pass --model to include a real model's embedding cost.
+"""
+
+import argparse
+import json
+import logging
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+# Add project root to Python path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import fitz
+import numpy as np
+import yaml
+from PIL import Image, ImageDraw, ImageFont
+from src.core.document_processor import DocumentProcessor
+from src.core.rag_system import MultimodalRAG
+from src.core.vector_store import VectorStore
+from src.models.schemas import ChunkBatch
+from src.utils.config import Config
+from src.utils.file_handlers import FileScanner
+from src.utils.image_processor import ImageProcessor
+from src.utils.ocr_backends import create_ocr_backend
+
+WORDS = ("revenue growth market product region quarter model network data training "
+         "image chart report sales customer learning system analysis forecast cost").split()
+
+
+def sentences(rng, words: int) -> str:
+    picked = rng.choice(WORDS, size=words)
+    return " ".join(" ".join(picked[i:i + 12]).capitalize() + "." for i in range(0, words, 12))
+
+
+def build_corpus(folder: Path, files: int, pages: int, images: int, seed: int = 0):
+    """Text files and PDFs in equal parts plus the given number of images"""
+    rng = np.random.RandomState(seed)
+    font = ImageFont.load_default(size=28)
+    for i in range(files):
+        if i % 2 == 0:
+            (folder / f"text_{i}.txt").write_text(sentences(rng, 1500))
+        else:
+            doc = fitz.open()
+            for _ in range(pages):
+                page = doc.new_page()
+                page.insert_textbox(fitz.Rect(50, 50, 545, 790), sentences(rng, 350), fontsize=10)
+            doc.save(str(folder / f"report_{i}.pdf"))
+            doc.close()
+    for i in range(images):
+        image = Image.new("L", (1200, 400), 255)
+        draw = ImageDraw.Draw(image)
+        for line in range(4):
+            draw.text((40, 40 + line * 80), sentences(rng, 8), fill=0, font=font)
+        image.save(folder / f"scan_{i}.png")
+
+
+def make_config(workdir: Path, name: str, model: str, extract_workers: int = None,
+                base_path: str = None) -> Config:
+    """Copy the project config with a private store and queue"""
+    settings = json.loads(json.dumps(Config(base_path)._config))
+    settings["vector_db"]["path"] = str(workdir / f"db_{name}")
+    settings.setdefault("ingestion", {})["queue_path"] = str(workdir / f"queue_{name}.db")
+    settings.setdefault("embedding", {})["model"] = model
+    if extract_workers is not None:
+        settings["ingestion"].setdefault("stages", {})["extract_workers"] = extract_workers
+    path = workdir / f"config_{name}.yaml"
+    with open(path, "w") as f:
+        yaml.dump(settings, f, default_flow_style=False)
+    return Config(str(path))
+
+
+def quiet_logs():
+    """Per-file info logs would be part of the measured time"""
+    for name in list(logging.root.manager.loggerDict):
+        if name.startswith("src."):
+            logging.getLogger(name).setLevel(logging.WARNING)
+
+
+def ocr_available(config) -> str:
+    """None if OCR works here, otherwise the reason it does not"""
+    try:
+        create_ocr_backend(config).image_to_string(Image.new("L", (64, 32), 255))
+        return None
+    except Exception as e:
+        return str(e) or type(e).__name__
+
+
+def rate(items: int, seconds: float, unit: str) -> dict:
+    return {"items": items, "unit": unit, "seconds": seconds, "items_per_s": items / seconds if seconds else 0.0}
+
+
+def time_stages(corpus: Path, config: Config) -> dict:
+    """Each stage on its own, single-threaded, in ingestion order"""
+    stages = {}
+    processor = DocumentProcessor(config)
+    chunk_size = config.get("processing.chunk_size", 1000)
+    overlap = config.get("processing.chunk_overlap", 200)
+
+    start = time.perf_counter()
+    paths = list(FileScanner(config).scan(str(corpus)))
+    stages["scan"] = rate(len(paths), time.perf_counter() - start, "files")
+    texts = [p for p in paths if p.endswith(".txt")]
+    pdfs = [p for p in paths if p.endswith(".pdf")]
+    images = [p for p in paths if p.endswith(".png")]
+
+    # Text files count as one page each
+    start = time.perf_counter()
+    file_texts = [Path(p).read_text(encoding="utf-8") for p in texts]
+    page_texts = []
+    for path in pdfs:
+        with fitz.open(path) as doc:
+            page_texts.extend(page.get_text().strip() for page in doc)
+    stages["extract"] = rate(len(file_texts) + len(page_texts), time.perf_counter() - start, "pages")
+
+    if images:
+        image_processor = ImageProcessor(config)
+        start = time.perf_counter()
+        for path in images:
+            image_processor.extract_text_from_image(path)
+        stages["ocr"] = rate(len(images), time.perf_counter() - start, "images")
+
+    start = time.perf_counter()
+    chunks = sum(len(processor._chunk_spans(text, chunk_size, overlap)) for text in file_texts)
+    chunks += sum(len(processor.pdf_processor._chunk_spans(text)) for text in page_texts if text)
+    stages["chunk"] = rate(chunks, time.perf_counter() - start, "chunks")
+
+    # The storage stages take what the processors produce for each file
+    batches = [processor.process_document_batch(p) for p in texts + pdfs]
+    store = VectorStore(config)
+
+    start = time.perf_counter()
+    batches = [store.prepare_documents(batch) for batch in batches]
+    batches = [batch for batch in batches if len(batch)]
+    stages["dedup"] = rate(sum(len(b) for b in batches), time.perf_counter() - start, "chunks")
+
+    start = time.perf_counter()
+    embeddings = [store.embed_documents(batch) for batch in batches]
+    stages["embed"] = rate(sum(len(b) for b in batches), time.perf_counter() - start, "chunks")
+
+    start = time.perf_counter()
+    written = sum(store.write_documents(batch, vectors) for batch, vectors in zip(batches, embeddings))
+    stages["write"] = rate(written, time.perf_counter() - start, "chunks")
+    return stages
+
+
+def time_end_to_end(corpus: Path, config: Config) -> dict:
+    rag = MultimodalRAG(str(config.config_path))
+    quiet_logs()
+    start = time.perf_counter()
+    results = rag.process_folder(str(corpus))
+    seconds = time.perf_counter() - start
+    return {
+        "seconds": seconds,
+        "files": results["total_files"],
+        "chunks": results["total_chunks"],
+        "files_per_s": results["total_files"] / seconds,
+        "chunks_per_s": results["total_chunks"] / seconds,
+        "failed": results.get("jobs", {}).get("failed", 0),
+        "bottleneck": results["stages"]["bottleneck"],
+        "utilization": {name: stage["utilization"] for name, stage in results["stages"]["stages"].items()}
+    }
+
+
+def throughputs(report: dict) -> dict:
+    """Every *_per_s figure of a report, keyed by its path"""
+    found = {}
+
+    def walk(node, path):
+        for key, value in node.items():
+            if isinstance(value, dict):
+                walk(value, path + [key])
+            elif key.endswith("_per_s"):
+                found["/".join(path + [key])] = value
+
+    walk(report.get("runs", {}), [])
+    return found
+
+
+def check_regressions(report: dict, baseline_path: str, tolerance: float) -> list:
+    """Figures that fell more than tolerance below the baseline"""
+    with open(baseline_path) as f:
+        baseline = throughputs(json.load(f))
+    current = throughputs(report)
+    regressions = []
+    for key, before in baseline.items():
+        after = current.get(key)
+        if after is not None and before and after < before * (1 - tolerance):
+            regressions.append({"metric": key, "baseline": before, "current": after, "change": after / before - 1})
+    return regressions
+
+
+def git_commit() -> str:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=Path(__file__).parent,
+                              check=True, capture_output=True, text=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", default="20,100", help="Comma-separated text+PDF file counts")
+    parser.add_argument("--pages", type=int, default=5, help="Pages per PDF")
+    parser.add_argument("--image-ratio", type=float, default=0.2, help="Images per text/PDF file")
+    parser.add_argument("--workers", default="1,2,4", help="Extraction worker counts for the end-to-end runs")
+    parser.add_argument("--model", default="hashing", help="Embedding model, 'hashing' needs no download")
+    parser.add_argument("--config", default=None, help="Base config, config.yaml by default")
+    parser.add_argument("--output", default=None, help="Write the report as JSON")
+    parser.add_argument("--baseline", default=None, help="Earlier report to check for regressions")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="Allowed throughput drop, 0.2 = 20%%")
+    args = parser.parse_args()
+
+    base = Config(args.config)
+    ocr_missing = ocr_available(base)
+    if ocr_missing:
+        print(f"⚠️ OCR unavailable, images are left out ({ocr_missing})")
+
+    report = {
+        "commit": git_commit(),
+        "settings": {
+            "model": args.model,
+            "pages_per_pdf": args.pages,
+            "chunk_size": base.get("processing.chunk_size"),
+            "chunk_overlap": base.get("processing.chunk_overlap"),
+            "ocr": ocr_missing or "available"
+        },
+        "runs": {}
+    }
+
+    with tempfile.TemporaryDirectory() as workdir:
+        workdir = Path(workdir)
+        for size in [int(s) for s in args.sizes.split(",")]:
+            corpus = workdir / f"corpus_{size}"
+            corpus.mkdir()
+            images = 0 if ocr_missing else int(size * args.image_ratio)
+            build_corpus(corpus, size, args.pages, images)
+
+            config = make_config(workdir, f"{size}_stages", args.model, base_path=args.config)
+            quiet_logs()
+            run = {"files": size + images, "stages": time_stages(corpus, config), "end_to_end": {}}
+            for name, stage in run["stages"].items():
+                print(f"📊 {size:>5} files  {name:<8} {stage['items']:>7} {stage['unit']:<6} "
+                      f"{stage['items_per_s']:>10.1f}/s")
+
+            for workers in [int(w) for w in args.workers.split(",")]:
+                config = make_config(workdir, f"{size}_w{workers}", args.model, workers, args.config)
+                result = time_end_to_end(corpus, config)
+                run["end_to_end"][f"workers_{workers}"] = result
+                print(f"🚀 {size:>5} files  {workers} workers: {result['files_per_s']:.1f} files/s, "
+                      f"{result['chunks_per_s']:.1f} chunks/s, bottleneck {result['bottleneck']}")
+            report["runs"][str(size)] = run
+
+    status = 0
+    if args.baseline:
+        regressions = check_regressions(report, args.baseline, args.tolerance)
+        report["regressions"] = regressions
+        for regression in regressions:
+            print(f"❌ {regression['metric']}: {regression['baseline']:.1f} -> {regression['current']:.1f} "
+                  f"({regression['change']:+.0%})")
+        if regressions:
+            status = 1
+        else:
+            print(f"✅ No throughput regressions beyond {args.tolerance:.0%} of {args.baseline}")
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+    return status
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""
+Benchmark per-image OCR latency for each available OCR backend
+"""
+
+import argparse
+import json
+import sys
+import time
+from pathlib import Path
+
+# Add project root to Python path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import numpy as np
+from PIL import Image, ImageDraw, ImageFont
+from src.utils.config import Config
+from src.utils.ocr_backends import create_ocr_backend
+
+
+def synthesize(count: int, size=(1200, 400)):
+    """Small images with a few lines of rendered text"""
+    font = ImageFont.load_default(size=28)
+    images = []
+    for i in range(count):
+        image = Image.new("L", size, 255)
+        draw = ImageDraw.Draw(image)
+        for line in range(4):
+            draw.text((40, 40 + line * 80), f"Invoice {i}-{line}: total amount due 1,{i:03d}.50 EUR", fill=0, font=font)
+        images.append(image)
+    return images
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--images", type=int, default=20)
+    parser.add_argument("--backends", default="tesserocr,subprocess")
+    parser.add_argument("--output", default=None, help="Write the report as JSON")
+    args = parser.parse_args()
+
+    config = Config()
+    images = synthesize(args.images)
+    report = {}
+
+    for name in args.backends.split(","):
+        # First call pays engine start-up; report it separately
+        try:
+            backend = create_ocr_backend(config, name)
+            start = time.perf_counter()
+            backend.image_to_string(images[0])
+            first = time.perf_counter() - start
+        except Exception as e:
+            print(f"⚠️ {name}: unavailable ({e})")
+            continue
+
+        latencies = []
+        characters = 0
+        for image in images:
+            start = time.perf_counter()
+            characters += len(backend.image_to_string(image).strip())
+            latencies.append(time.perf_counter() - start)
+        backend.close()
+
+        latencies = np.array(latencies) * 1000
+        report[name] = {
+            "first_call_ms": first * 1000,
+            "p50_ms": float(np.percentile(latencies, 50)),
+            "p95_ms": float(np.percentile(latencies, 95)),
+            "images_per_s": len(images) / (latencies.sum() / 1000),
+            "characters": characters
+        }
+        print(f"📊 {name}: first {report[name]['first_call_ms']:.0f} ms, p50 {report[name]['p50_ms']:.0f} ms, "
+              f"p95 {report[name]['p95_ms']:.0f} ms, {report[name]['images_per_s']:.1f} images/s")
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""
+Benchmark OCR time and text yield with and without image preprocessing
+
+Uses images from --images if given, otherwise synthesizes a mix of large
+scans, small low-DPI text, skewed pages and text-free images.
+"""
+
+import argparse
+import json
+import sys
+import time
+from pathlib import Path
+
+# Add project root to Python path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import numpy as np
+from PIL import Image, ImageDraw, ImageFont
+from src.utils.config import Config
+from src.utils.image_processor import ImageProcessor
+
+SENTENCE = "Quarterly revenue grew 15% driven by Product A and strong results in Europe"
+
+
+def synthesize(seed: int = 0):
+    """Generate named test images"""
+    rng = np.random.RandomState(seed)
+    images = []
+
+    def page(size, font_size, lines, angle=0.0):
+        image = Image.new("L", size, 255)
+        draw = ImageDraw.Draw(image)
+        font = ImageFont.load_default(size=font_size)
+        for i in range(lines):
+            draw.text((size[0] // 10, size[1] // 10 + i * font_size * 2), f"{SENTENCE} {i}", fill=0, font=font)
+        return image.rotate(angle, expand=True, fillcolor=255) if angle else image
+
+    images.append(("large_scan", page((5000, 6500), 60, 40)))
+    images.append(("small_text", page((700, 300), 9, 6)))
+    images.append(("skewed", page((2400, 1800), 36, 12, angle=3.5)))
+    images.append(("photo", Image.fromarray((rng.rand(1200, 1600) * 20 + 120).astype(np.uint8))))
+    images.append(("gradient", Image.fromarray(np.tile(np.linspace(0, 255, 1600), (1200, 1)).astype(np.uint8))))
+    return images
+
+
+def run(processor: ImageProcessor, images):
+    """OCR every image, returning seconds and characters per image"""
+    rows = []
+    for name, image in images:
+        start = time.perf_counter()
+        text = processor._ocr(image.copy())
+        rows.append({
+            "image": name,
+            "seconds": time.perf_counter() - start,
+            "characters": sum(c.isalnum() for c in text)
+        })
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--images", default=None, help="Folder of images to use instead of synthetic ones")
+    parser.add_argument("--output", default=None, help="Write the report as JSON")
+    args = parser.parse_args()
+
+    if args.images:
+        paths = sorted(p for p in Path(args.images).iterdir() if p.suffix.lower() in (".png", ".jpg", ".jpeg"))
+        images = [(p.name, Image.open(p)) for p in paths]
+    else:
+        images = synthesize()
+
+    processor = ImageProcessor(Config())
+    processor.preprocessor.enabled = False
+    before = run(processor, images)
+    processor.preprocessor.enabled = True
+    after = run(processor, images)
+
+    print(f"{'Image':<20}{'Before s':>10}{'After s':>10}{'Before chars':>14}{'After chars':>13}")
+    for b, a in zip(before, after):
+        print(f"{b['image']:<20}{b['seconds']:>10.2f}{a['seconds']:>10.2f}{b['characters']:>14}{a['characters']:>13}")
+
+    report = {
+        "images": len(images),
+        "before": {"seconds_per_image": float(np.mean([r["seconds"] for r in before])),
+                   "characters": int(sum(r["characters"] for r in before)), "per_image": before},
+        "after": {"seconds_per_image": float(np.mean([r["seconds"] for r in after])),
+                  "characters": int(sum(r["characters"] for r in after)), "per_image": after}
+    }
+    print(f"📊 OCR s/image: {report['before']['seconds_per_image']:.2f} -> {report['after']['seconds_per_image']:.2f}, "
+          f"characters: {report['before']['characters']} -> {report['after']['characters']}")
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,284 @@
+#!/usr/bin/env python3
+"""
+Evaluate search quality and latency on a labeled query set
+
+Ingests a corpus with MultimodalRAG.process_folder into a private store,
+runs every labeled query through MultimodalRAG.search and reports
+document-level recall@k, MRR and nDCG@k next to p50/p95/p99 latency and
+queries/s. Write the report with --output and pass an earlier report to
+--compare to see what a change to chunking, thresholds or the index did.
+
+Without --corpus a synthetic corpus is generated: filler text on a few
+topics with planted facts ("The <attribute> of <entity> is <value>."),
+some repeated in a second document, and one question per fact. With
+--corpus, --queries names a JSONL file of
+{"query": ..., "relevant": ["file.txt", ...]} or
+{"query": ..., "relevant": {"file.txt": 2, "other.pdf": 1}} (graded).
+
+The default model is the deterministic offline "hashing" embedder, so
+runs need no network and are comparable across machines; pass --model to
+evaluate a real SentenceTransformer.
+"""
+
+import argparse
+import json
+import logging
+import math
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+# Add project root to Python path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import numpy as np
+import yaml
+from src.core.rag_system import MultimodalRAG
+from src.utils.config import Config
+
+TOPICS = {
+    "finance": "revenue growth market quarter sales forecast cost margin budget profit investor share".split(),
+    "research": "model network data training learning system analysis experiment dataset accuracy".split(),
+    "operations": "region customer report supply shipment warehouse order delivery schedule vendor".split(),
+    "product": "product image chart feature release design interface version roadmap launch".split()
+}
+ATTRIBUTES = ["budget", "owner", "launch date", "headquarters", "error rate", "team size", "codename", "supplier"]
+SYLLABLES = "ka lo mi ra ven tor sil bex qua dor fen lin mar pos zul tri".split()
+
+
+def entity_name(rng) -> str:
+    return "".join(rng.choice(SYLLABLES, size=3)).capitalize()
+
+
+def generate_dataset(folder: Path, documents: int, facts_per_document: int, words: int, seed: int = 0):
+    """Write a synthetic corpus and return its labeled queries"""
+    rng = np.random.RandomState(seed)
+    topics = list(TOPICS)
+    bodies = []
+    for i in range(documents):
+        vocabulary = TOPICS[topics[i % len(topics)]]
+        sentences = [" ".join(rng.choice(vocabulary, size=12)).capitalize() + "." for _ in range(words // 12)]
+        bodies.append(sentences)
+
+    queries = []
+    for i in range(documents):
+        for _ in range(facts_per_document):
+            entity = entity_name(rng)
+            attribute = ATTRIBUTES[rng.randint(len(ATTRIBUTES))]
+            value = f"{rng.randint(10, 9999)} {rng.choice(TOPICS[topics[i % len(topics)]])}"
+            fact = f"The {attribute} of {entity} is {value}."
+            relevant = {f"doc_{i:05d}.txt": 2}
+            bodies[i].insert(rng.randint(len(bodies[i]) + 1), fact)
+            # Some facts are restated elsewhere, a weaker but relevant hit
+            if rng.rand() < 0.3:
+                other = rng.randint(documents)
+                if other != i:
+                    bodies[other].insert(rng.randint(len(bodies[other]) + 1), f"As noted, {entity} has {attribute} {value}.")
+                    relevant[f"doc_{other:05d}.txt"] = 1
+            queries.append({"query": f"What is the {attribute} of {entity}?", "relevant": relevant})
+
+    for i, sentences in enumerate(bodies):
+        (folder / f"doc_{i:05d}.txt").write_text(" ".join(sentences))
+    return queries
+
+
+def load_queries(path: str):
+    """Labeled queries from JSONL; list labels count as grade 1"""
+    queries = []
+    with open(path) as f:
+        for line in f:
+            if not line.strip():
+                continue
+            entry = json.loads(line)
+            relevant = entry["relevant"]
+            if isinstance(relevant, list):
+                relevant = {name: 1 for name in relevant}
+            queries.append({"query": entry["query"], "relevant": relevant})
+    return queries
+
+
+def make_config(workdir: Path, model: str, overrides, base_path: str = None) -> Config:
+    """Copy the project config with a private store, the model and --set overrides"""
+    settings = json.loads(json.dumps(Config(base_path)._config))
+    settings["vector_db"]["path"] = str(workdir / "vector_db")
+    settings.setdefault("ingestion", {})["queue_path"] = str(workdir / "ingestion.db")
+    settings.setdefault("embedding", {})["model"] = model
+    for override in overrides:
+        key, _, value = override.partition("=")
+        section = settings
+        parts = key.split(".")
+        for part in parts[:-1]:
+            section = section.setdefault(part, {})
+        section[parts[-1]] = yaml.safe_load(value)
+    path = workdir / "config.yaml"
+    with open(path, "w") as f:
+        yaml.dump(settings, f, default_flow_style=False)
+    return Config(str(path))
+
+
+def quiet_logs():
+    """Per-query info logs would be part of the measured latency"""
+    for name in list(logging.root.manager.loggerDict):
+        if name.startswith("src."):
+            logging.getLogger(name).setLevel(logging.WARNING)
+
+
+def ranked_files(results):
+    """Distinct filenames in result order"""
+    files = []
+    for result in results:
+        filename = result["metadata"].get("filename")
+        if filename not in files:
+            files.append(filename)
+    return files
+
+
+def score_query(ranking, relevant, ks):
+    """recall@k, nDCG@k and reciprocal rank for one query"""
+    scores = {}
+    for k in ks:
+        top = ranking[:k]
+        scores[f"recall@{k}"] = sum(1 for name in top if name in relevant) / len(relevant)
+        dcg = sum((2 ** relevant.get(name, 0) - 1) / math.log2(rank + 2) for rank, name in enumerate(top))
+        ideal = sorted(relevant.values(), reverse=True)[:k]
+        idcg = sum((2 ** grade - 1) / math.log2(rank + 2) for rank, grade in enumerate(ideal))
+        scores[f"ndcg@{k}"] = dcg / idcg if idcg else 0.0
+    scores["mrr"] = next((1.0 / (rank + 1) for rank, name in enumerate(ranking) if name in relevant), 0.0)
+    return scores
+
+
+def git_commit() -> str:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=Path(__file__).parent,
+                              check=True, capture_output=True, text=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(report, path: str):
+    """Print metric and latency deltas against an earlier report"""
+    with open(path) as f:
+        previous = json.load(f)
+    print(f"🔁 Compared with {path} (commit {previous.get('commit')})")
+    for section in ("quality", "latency"):
+        for key, value in report[section].items():
+            before = previous.get(section, {}).get(key)
+            if isinstance(before, (int, float)) and isinstance(value, (int, float)):
+                print(f"   {key:<14} {before:10.4f} -> {value:10.4f} ({value - before:+.4f})")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--corpus", default=None, help="Folder to ingest instead of the synthetic corpus")
+    parser.add_argument("--queries", default=None, help="Labeled queries (JSONL), required with --corpus")
+    parser.add_argument("--save-dataset", default=None, help="Also write the synthetic corpus and queries here")
+    parser.add_argument("--documents", type=int, default=200)
+    parser.add_argument("--facts", type=int, default=2, help="Planted facts (queries) per document")
+    parser.add_argument("--words", type=int, default=400, help="Filler words per document")
+    parser.add_argument("--model", default="hashing", help="Embedding model, 'hashing' needs no download")
+    parser.add_argument("--config", default=None, help="Base config, config.yaml by default")
+    parser.add_argument("--set", action="append", default=[], metavar="KEY=VALUE",
+                        help="Config override, e.g. --set processing.chunk_size=300")
+    parser.add_argument("--top-k", type=int, default=10, help="Chunks requested per query")
+    parser.add_argument("--k", default="1,3,5,10", help="Cutoffs for recall and nDCG")
+    parser.add_argument("--threshold", type=float, default=None,
+                        help="Similarity threshold; by default nothing is filtered so ranking is measured")
+    parser.add_argument("--warmup", type=int, default=5)
+    parser.add_argument("--output", default=None, help="Write the report as JSON")
+    parser.add_argument("--compare", default=None, help="Earlier report to diff against")
+    args = parser.parse_args()
+
+    ks = [int(k) for k in args.k.split(",")]
+    threshold = args.threshold if args.threshold is not None else -math.inf
+
+    with tempfile.TemporaryDirectory() as workdir:
+        workdir = Path(workdir)
+        if args.corpus:
+            if not args.queries:
+                parser.error("--queries is required with --corpus")
+            corpus = args.corpus
+            queries = load_queries(args.queries)
+        else:
+            corpus = workdir / "corpus"
+            corpus.mkdir()
+            queries = generate_dataset(corpus, args.documents, args.facts, args.words)
+            if args.save_dataset:
+                target = Path(args.save_dataset)
+                target.mkdir(parents=True, exist_ok=True)
+                for path in corpus.iterdir():
+                    (target / path.name).write_bytes(path.read_bytes())
+                with open(target / "queries.jsonl", "w") as f:
+                    for query in queries:
+                        f.write(json.dumps(query) + "\n")
+
+        config = make_config(workdir, args.model, args.set, args.config)
+        rag = MultimodalRAG(str(config.config_path))
+        quiet_logs()
+
+        start = time.perf_counter()
+        ingestion = rag.process_folder(str(corpus))
+        ingest_seconds = time.perf_counter() - start
+        print(f"📥 Ingested {ingestion['total_files']} files, {ingestion['total_chunks']} chunks "
+              f"in {ingest_seconds:.1f}s")
+
+        # Warm the model and collection, then drop what the warmup cached
+        for query in queries[:args.warmup]:
+            rag.search(query["query"], top_k=args.top_k, threshold=threshold)
+        rag.tenants.get().invalidate()
+        rag.vector_store.query_embeddings.clear()
+
+        latencies = []
+        per_query = []
+        start = time.perf_counter()
+        for query in queries:
+            began = time.perf_counter()
+            results = rag.search(query["query"], top_k=args.top_k, threshold=threshold)
+            latencies.append(time.perf_counter() - began)
+            per_query.append(score_query(ranked_files(results), query["relevant"], ks))
+        total_seconds = time.perf_counter() - start
+
+    latencies_ms = np.array(latencies) * 1000
+    report = {
+        "commit": git_commit(),
+        "settings": {
+            "corpus": args.corpus or "synthetic",
+            "documents": ingestion["total_files"],
+            "chunks": ingestion["total_chunks"],
+            "queries": len(queries),
+            "model": args.model,
+            "top_k": args.top_k,
+            "threshold": args.threshold,
+            "chunk_size": config.get("processing.chunk_size"),
+            "chunk_overlap": config.get("processing.chunk_overlap"),
+            "overrides": args.set
+        },
+        "quality": {key: float(np.mean([scores[key] for scores in per_query]))
+                    for key in per_query[0]} if per_query else {},
+        "latency": {
+            "p50_ms": float(np.percentile(latencies_ms, 50)),
+            "p95_ms": float(np.percentile(latencies_ms, 95)),
+            "p99_ms": float(np.percentile(latencies_ms, 99)),
+            "mean_ms": float(latencies_ms.mean()),
+            "queries_per_s": len(queries) / total_seconds
+        },
+        "ingest_seconds": ingest_seconds
+    }
+
+    quality = report["quality"]
+    print(f"🎯 {len(queries)} queries: " + ", ".join(f"{key} {value:.3f}" for key, value in quality.items()))
+    latency = report["latency"]
+    print(f"⏱️  p50 {latency['p50_ms']:.1f} ms, p95 {latency['p95_ms']:.1f} ms, p99 {latency['p99_ms']:.1f} ms, "
+          f"{latency['queries_per_s']:.1f} queries/s")
+
+    if args.compare:
+        compare(report, args.compare)
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
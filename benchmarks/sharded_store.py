@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""
+Benchmark ingest throughput and query latency against the shard count
+
+Each shard count gets a fresh store in a temporary directory, filled with
+the same synthetic chunks.
+"""
+
+import argparse
+import json
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+# Add project root to Python path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import numpy as np
+import yaml
+from src.core.sharded_store import ShardedVectorStore
+from src.utils.config import Config
+
+WORDS = ("revenue growth market product region quarter model network data training "
+         "image chart report sales customer learning system analysis forecast cost").split()
+
+
+def make_chunks(count: int, files: int, seed: int = 0):
+    """Synthetic chunks spread over a number of files"""
+    rng = np.random.RandomState(seed)
+    chunks = []
+    for i in range(count):
+        text = " ".join(rng.choice(WORDS, size=60))
+        chunks.append({
+            "id": f"chunk_{i}",
+            "content": text,
+            "metadata": {"filename": f"file_{i % files}.txt", "file_type": "text", "chunk_index": i // files}
+        })
+    return chunks
+
+
+def make_config(workdir: Path, shards: int, base_path: str = None) -> Config:
+    """Copy the project config with a private store and the given shard count"""
+    base = Config(base_path)._config
+    settings = json.loads(json.dumps(base))
+    settings["vector_db"]["path"] = str(workdir / f"db_{shards}")
+    settings.setdefault("sharding", {}).update({"enabled": True, "shards": shards})
+    settings.setdefault("dedup", {})["enabled"] = False
+    settings.setdefault("hierarchy", {})["enabled"] = False
+    path = workdir / f"config_{shards}.yaml"
+    with open(path, "w") as f:
+        yaml.dump(settings, f, default_flow_style=False)
+    return Config(str(path))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--shards", default="1,2,4,8", help="Comma-separated shard counts")
+    parser.add_argument("--chunks", type=int, default=5000)
+    parser.add_argument("--files", type=int, default=200)
+    parser.add_argument("--queries", type=int, default=100)
+    parser.add_argument("--batch-size", type=int, default=256)
+    parser.add_argument("--top-k", type=int, default=5)
+    parser.add_argument("--output", default=None, help="Write the report as JSON")
+    args = parser.parse_args()
+
+    chunks = make_chunks(args.chunks, args.files)
+    queries = [" ".join(np.random.RandomState(i).choice(WORDS, size=8)) for i in range(args.queries)]
+    report = []
+
+    with tempfile.TemporaryDirectory() as workdir:
+        for shards in [int(s) for s in args.shards.split(",")]:
+            store = ShardedVectorStore(make_config(Path(workdir), shards))
+
+            start = time.perf_counter()
+            for i in range(0, len(chunks), args.batch_size):
+                store.add_documents([dict(c, metadata=dict(c["metadata"])) for c in chunks[i:i + args.batch_size]])
+            ingest_seconds = time.perf_counter() - start
+
+            store.search(queries[0], top_k=args.top_k, threshold=-1.0)
+            latencies = []
+            for query in queries:
+                start = time.perf_counter()
+                store.search(query, top_k=args.top_k, threshold=-1.0)
+                latencies.append(time.perf_counter() - start)
+            latencies = np.array(latencies) * 1000
+
+            row = {
+                "shards": shards,
+                "chunks": store.get_collection_stats(),
+                "ingest_chunks_per_s": args.chunks / ingest_seconds,
+                "query_ms_p50": float(np.percentile(latencies, 50)),
+                "query_ms_p95": float(np.percentile(latencies, 95))
+            }
+            report.append(row)
+            store.executor.shutdown()
+            print(f"📊 {shards} shards: {row['ingest_chunks_per_s']:.0f} chunks/s ingest, "
+                  f"query p50 {row['query_ms_p50']:.2f} ms, p95 {row['query_ms_p95']:.2f} ms")
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
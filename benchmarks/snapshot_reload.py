@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+"""
+Benchmark compaction, snapshot export and snapshot import
+
+Fills a store in a temporary directory with synthetic chunks, ingests
+them a second time (new chunk ids, as a re-ingest without deletes does),
+compacts it, exports float32 and float16 snapshots and imports each into
+an empty store. Reports store size before and after compaction, snapshot
+size, export and import time next to the time it took to embed the
+chunks, and how many of each query's top-k an imported store returns
+compared to the compacted one.
+"""
+
+import argparse
+import json
+import sys
+import tempfile
+import time
+import uuid
+from pathlib import Path
+
+# Add project root to Python path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import numpy as np
+import yaml
+from src.core import snapshot
+from src.core.vector_store import VectorStore, shared_client
+from src.utils.config import Config
+
+WORDS = ("revenue growth market product region quarter model network data training "
+         "image chart report sales customer learning system analysis forecast cost").split()
+
+
+def make_chunks(count: int, files: int, seed: int = 0):
+    """Synthetic chunks with ids in the processors' format, fresh on every call"""
+    rng = np.random.RandomState(seed)
+    chunks = []
+    for i in range(count):
+        filename, index = f"file_{i % files}.txt", i // files
+        chunks.append({
+            "id": f"{filename}_{index}_{str(uuid.uuid4())[:8]}",
+            "content": " ".join(rng.choice(WORDS, size=rng.randint(20, 120))),
+            "metadata": {"filename": filename, "file_type": "text", "chunk_index": index}
+        })
+    return chunks
+
+
+def make_config(workdir: Path, name: str, base_path: str = None) -> Config:
+    """Copy the project config with a private store"""
+    settings = json.loads(json.dumps(Config(base_path)._config))
+    settings["vector_db"]["path"] = str(workdir / name)
+    settings.setdefault("dedup", {})["enabled"] = False
+    settings.setdefault("sharding", {})["enabled"] = False
+    settings.setdefault("image_embedding", {})["enabled"] = False
+    path = workdir / f"config_{name}.yaml"
+    with open(path, "w") as f:
+        yaml.dump(settings, f, default_flow_style=False)
+    return Config(str(path))
+
+
+def top_ids(config: Config, vectors: np.ndarray, k: int):
+    collection = shared_client(config.get("vector_db.path"))
+    collection = collection.get_collection(config.get("vector_db.collection_name", "multimodal_docs"))
+    return collection.query(query_embeddings=vectors, n_results=k, include=[])["ids"]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--config", default=None, help="Config file, config.yaml by default")
+    parser.add_argument("--chunks", type=int, default=5000)
+    parser.add_argument("--files", type=int, default=200)
+    parser.add_argument("--batch-size", type=int, default=256)
+    parser.add_argument("--queries", type=int, default=100)
+    parser.add_argument("--top-k", type=int, default=10)
+    parser.add_argument("--output", default=None, help="Write the report as JSON")
+    args = parser.parse_args()
+
+    queries = [" ".join(np.random.RandomState(i).choice(WORDS, size=8)) for i in range(args.queries)]
+    report = {"chunks": args.chunks}
+
+    with tempfile.TemporaryDirectory() as workdir:
+        workdir = Path(workdir)
+        config = make_config(workdir, "source", args.config)
+        store = VectorStore(config)
+        store.encode_query(queries[0])
+        ingest_seconds = 0.0
+        for _ in range(2):
+            chunks = make_chunks(args.chunks, args.files)
+            start = time.perf_counter()
+            for i in range(0, len(chunks), args.batch_size):
+                store.add_documents(chunks[i:i + args.batch_size])
+            ingest_seconds = ingest_seconds or time.perf_counter() - start
+        query_vectors = np.asarray([store.encode_query(query)[0] for query in queries], dtype=np.float32)
+        report["ingest"] = {"seconds": ingest_seconds, "chunks_per_s": args.chunks / ingest_seconds}
+        print(f"📄 Ingested {args.chunks} chunks twice, {report['ingest']['chunks_per_s']:.0f} chunks/s "
+              f"({store.embedding_model.name})")
+
+        start = time.perf_counter()
+        compacted = snapshot.compact(config, batch_size=args.batch_size)
+        counts = compacted["collections"][store.collection_name]
+        report["compact"] = dict(counts, seconds=time.perf_counter() - start,
+                                 bytes_before=compacted["bytes_before"], bytes_after=compacted["bytes_after"])
+        print(f"📊 compact: kept {counts['kept']} of {counts['rows']} chunks, "
+              f"{compacted['bytes_before'] / 2 ** 20:.1f} -> {compacted['bytes_after'] / 2 ** 20:.1f} MiB "
+              f"in {report['compact']['seconds']:.2f}s")
+        reference = top_ids(config, query_vectors, args.top_k)
+
+        for dtype in ("float32", "float16"):
+            folder = workdir / f"snapshot_{dtype}"
+            start = time.perf_counter()
+            exported = snapshot.export_snapshot(config, str(folder), dtype=dtype, batch_size=args.batch_size)
+            export_seconds = time.perf_counter() - start
+
+            target = make_config(workdir, f"target_{dtype}", args.config)
+            imported = snapshot.import_snapshot(target, str(folder), batch_size=args.batch_size)
+            found = top_ids(target, query_vectors, args.top_k)
+            overlap = np.mean([len(set(a) & set(b)) / len(a) for a, b in zip(reference, found)])
+
+            entry = {
+                "snapshot_bytes": exported["bytes"],
+                "store_bytes": exported["store_bytes"],
+                "export_seconds": export_seconds,
+                "import_seconds": imported["seconds"],
+                "import_rows_per_s": imported["rows_per_s"],
+                "speedup_vs_ingest": ingest_seconds / imported["seconds"],
+                f"top{args.top_k}_overlap": float(overlap)
+            }
+            report[dtype] = entry
+            print(f"📊 {dtype}: snapshot {entry['snapshot_bytes'] / 2 ** 20:.1f} MiB "
+                  f"(store {entry['store_bytes'] / 2 ** 20:.1f} MiB), export {export_seconds:.2f}s, "
+                  f"import {imported['seconds']:.2f}s = x{entry['speedup_vs_ingest']:.1f} vs ingest, "
+                  f"top-{args.top_k} overlap {overlap:.3f}")
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
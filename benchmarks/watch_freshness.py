@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+"""
+Measure freshness lag of watch mode: time from writing a file to the
+moment a search for its unique marker word returns it
+
+Runs against a private store and watch folder in a temporary directory.
+"""
+
+import argparse
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+# Add project root to Python path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import numpy as np
+import yaml
+from src.core.rag_system import MultimodalRAG
+from src.utils.config import Config
+
+
+def make_config(workdir: Path, backend: str) -> str:
+    """Copy the project config with a private store, queue and watch backend"""
+    settings = json.loads(json.dumps(Config()._config))
+    settings["vector_db"]["path"] = str(workdir / "db")
+    settings.setdefault("ingestion", {})["queue_path"] = str(workdir / "ingestion.db")
+    settings.setdefault("watch", {})["backend"] = backend
+    path = workdir / "config.yaml"
+    with open(path, "w") as f:
+        yaml.dump(settings, f, default_flow_style=False)
+    return str(path)
+
+
+def wait_searchable(rag: MultimodalRAG, marker: str, filename: str, timeout: float) -> bool:
+    """Poll search until a chunk of filename is returned for marker"""
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        results = rag.vector_store.search(marker, top_k=5, threshold=-1.0)
+        if any(r["metadata"].get("filename") == filename for r in results):
+            return True
+        time.sleep(0.05)
+    return False
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--files", type=int, default=20)
+    parser.add_argument("--interval", type=float, default=1.0, help="Seconds between written files")
+    parser.add_argument("--backend", default="auto", help="auto, inotify or polling")
+    parser.add_argument("--timeout", type=float, default=30.0)
+    parser.add_argument("--output", default=None, help="Write the report as JSON")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        workdir = Path(tmp)
+        folder = workdir / "input"
+        folder.mkdir()
+        rag = MultimodalRAG(make_config(workdir, args.backend))
+        watcher = rag.watch(str(folder))
+        thread = threading.Thread(target=watcher.run, daemon=True)
+        thread.start()
+        time.sleep(1.0)
+
+        lags = []
+        missed = 0
+        for i in range(args.files):
+            marker = f"zebracode{i:05d}"
+            filename = f"note_{i}.txt"
+            start = time.time()
+            with open(folder / filename, "w") as f:
+                f.write(f"Meeting note {i}. The project codename is {marker}. " * 5)
+            if wait_searchable(rag, marker, filename, args.timeout):
+                lags.append(time.time() - start)
+            else:
+                missed += 1
+            time.sleep(args.interval)
+
+        os.remove(folder / "note_0.txt")
+        time.sleep(watcher.debounce + 2.0)
+        watcher.stop()
+        thread.join()
+        stats = watcher.get_stats()
+
+    lags = np.array(lags) if lags else np.zeros(1)
+    report = {
+        "backend": stats["backend"],
+        "files": args.files,
+        "missed": missed,
+        "lag_p50_s": float(np.percentile(lags, 50)),
+        "lag_p95_s": float(np.percentile(lags, 95)),
+        "lag_max_s": float(lags.max()),
+        "files_removed": stats["files_removed"]
+    }
+    print(f"📊 {report['backend']}: lag p50 {report['lag_p50_s']:.2f}s, p95 {report['lag_p95_s']:.2f}s, "
+          f"max {report['lag_max_s']:.2f}s, missed {missed}, deletes {report['files_removed']}")
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
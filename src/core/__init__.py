@@ -1,3 +1,3 @@
-"""
-Core functionality package
+"""
+Core functionality package
 """
\ No newline at end of file
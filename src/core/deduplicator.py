@@ -0,0 +1,257 @@
+"""
+Near-duplicate chunk detection using MinHash/LSH
+"""
+
+import os
+import re
+import zlib
+from collections import OrderedDict
+from typing import List, Dict, Any, Iterable, Tuple, Optional
+
+import numpy as np
+from src.models.schemas import ChunkBatch, source_key
+from src.utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+# Mersenne prime used for the universal hash family
+_PRIME = np.uint64((1 << 31) - 1)
+_TOKEN_RE = re.compile(r"\w+")
+
+
+class ChunkDeduplicator:
+    """Detects near-duplicate chunks before they are embedded.
+
+    Each chunk is reduced to a MinHash signature over word shingles and
+    indexed with LSH banding. The index is an LRU bounded by
+    ``dedup.max_index_entries`` (about 1 KB per entry) so memory stays
+    flat on large imports. It lives in memory; seed() fills it with
+    chunks already stored.
+    """
+
+    def __init__(self, config):
+        self.config = config
+        self.shingle_size = config.get("dedup.shingle_size", 5)
+        self.num_perm = config.get("dedup.num_perm", 64)
+        self.bands = config.get("dedup.bands", 16)
+        self.threshold = config.get("dedup.threshold", 0.8)
+        self.max_entries = config.get("dedup.max_index_entries", 200000)
+
+        if self.num_perm % self.bands != 0:
+            raise ValueError("dedup.num_perm must be divisible by dedup.bands")
+        self.rows = self.num_perm // self.bands
+
+        rng = np.random.RandomState(config.get("dedup.seed", 1))
+        self._a = rng.randint(1, int(_PRIME), size=self.num_perm).astype(np.uint64)
+        self._b = rng.randint(0, int(_PRIME), size=self.num_perm).astype(np.uint64)
+
+        # chunk id -> signature, oldest first
+        self._signatures: "OrderedDict[str, np.ndarray]" = OrderedDict()
+        # band key -> chunk id
+        self._buckets: Dict[int, str] = {}
+
+        self.chunks_seen = 0
+        self.duplicates_found = 0
+
+    def signature(self, text: str) -> np.ndarray:
+        """Compute the MinHash signature of a chunk"""
+        tokens = _TOKEN_RE.findall(text.lower())
+        k = self.shingle_size
+        if len(tokens) <= k:
+            shingles = {" ".join(tokens)}
+        else:
+            shingles = {" ".join(tokens[i:i + k]) for i in range(len(tokens) - k + 1)}
+
+        hashes = np.fromiter(
+            (zlib.crc32(s.encode("utf-8")) for s in shingles),
+            dtype=np.uint64,
+            count=len(shingles)
+        )
+        # (num_perm, n_shingles) permuted hashes, minimum per permutation
+        permuted = (self._a[:, None] * hashes[None, :] + self._b[:, None]) % _PRIME
+        return permuted.min(axis=1).astype(np.uint32)
+
+    def _band_keys(self, signature: np.ndarray) -> List[int]:
+        """Hash each signature band into a bucket key"""
+        r = self.rows
+        return [hash((band, signature[band * r:(band + 1) * r].tobytes()))
+                for band in range(self.bands)]
+
+    def _find(self, signature: np.ndarray, keys: List[int]) -> Optional[str]:
+        """Return the id of an indexed near-duplicate, if any"""
+        checked = set()
+        for key in keys:
+            candidate = self._buckets.get(key)
+            if candidate is None or candidate in checked:
+                continue
+            checked.add(candidate)
+            candidate_sig = self._signatures.get(candidate)
+            if candidate_sig is None:
+                continue
+            similarity = float(np.mean(candidate_sig == signature))
+            if similarity >= self.threshold:
+                self._signatures.move_to_end(candidate)
+                return candidate
+        return None
+
+    def _insert(self, doc_id: str, signature: np.ndarray, keys: List[int]):
+        """Add a signature to the index, evicting the oldest when full"""
+        self._signatures[doc_id] = signature
+        for key in keys:
+            self._buckets.setdefault(key, doc_id)
+
+        while len(self._signatures) > self.max_entries:
+            old_id, old_sig = self._signatures.popitem(last=False)
+            for key in self._band_keys(old_sig):
+                if self._buckets.get(key) == old_id:
+                    del self._buckets[key]
+
+    def seed(self, doc_ids: List[str], contents: List[Optional[str]]):
+        """Index stored chunks without counting them as seen"""
+        for doc_id, content in zip(doc_ids, contents):
+            if content is None or doc_id in self._signatures:
+                continue
+            signature = self.signature(content)
+            self._insert(doc_id, signature, self._band_keys(signature))
+
+    def forget(self, doc_ids: List[str]):
+        """Drop chunks from the index, e.g. after they were deleted from the store"""
+        for doc_id in doc_ids:
+            signature = self._signatures.pop(doc_id, None)
+            if signature is None:
+                continue
+            for key in self._band_keys(signature):
+                if self._buckets.get(key) == doc_id:
+                    del self._buckets[key]
+
+    def deduplicate(self, documents: List[Dict[str, Any]]) -> Tuple[List[Dict[str, Any]], Dict[str, List[Dict[str, Any]]]]:
+        """Split documents into unique chunks and duplicates of known chunks.
+
+        Returns the chunks that still need to be stored, and a mapping from
+        the id of an already stored chunk to the metadata of the duplicates
+        that matched it. Duplicates of chunks in the same batch are folded
+        into that chunk's provenance metadata directly.
+        """
+        unique, in_batch, stored = self._match(
+            [doc["id"] for doc in documents], (doc["content"] for doc in documents)
+        )
+        for row, match in in_batch:
+            add_provenance(documents[match]["metadata"], documents[row]["metadata"])
+
+        stored_matches: Dict[str, List[Dict[str, Any]]] = {}
+        for row, match in stored:
+            stored_matches.setdefault(match, []).append(documents[row]["metadata"])
+        return [documents[row] for row in unique], stored_matches
+
+    def deduplicate_batch(self, batch: ChunkBatch) -> Tuple[ChunkBatch, Dict[str, List[Dict[str, Any]]]]:
+        """deduplicate() for a ChunkBatch; provenance goes into the batch's extra metadata"""
+        unique, in_batch, stored = self._match(batch.ids, (batch.content(row) for row in range(len(batch))))
+        for row, match in in_batch:
+            metadata = batch.metadata(match)
+            add_provenance(metadata, batch.metadata(row))
+            batch.update_extra(match, sources=metadata["sources"], duplicate_count=metadata["duplicate_count"])
+
+        stored_matches: Dict[str, List[Dict[str, Any]]] = {}
+        for row, match in stored:
+            stored_matches.setdefault(match, []).append(batch.metadata(row))
+        if len(unique) == len(batch):
+            return batch, stored_matches
+        return batch.select(unique), stored_matches
+
+    def _match(self, ids: List[str], contents: Iterable[str]) -> Tuple[List[int], List[Tuple[int, int]], List[Tuple[int, str]]]:
+        """Index unique chunks and pair each duplicate with what it matched.
+
+        Returns unique row numbers, (row, unique row) pairs for duplicates
+        within the batch and (row, stored id) pairs for duplicates of
+        chunks indexed earlier.
+        """
+        unique = []
+        unique_rows = {}
+        in_batch = []
+        stored = []
+
+        for row, (doc_id, content) in enumerate(zip(ids, contents)):
+            self.chunks_seen += 1
+            signature = self.signature(content)
+            keys = self._band_keys(signature)
+            match = self._find(signature, keys)
+
+            if match is None:
+                self._insert(doc_id, signature, keys)
+                unique.append(row)
+                unique_rows[doc_id] = row
+                continue
+
+            self.duplicates_found += 1
+            if match in unique_rows:
+                in_batch.append((row, unique_rows[match]))
+            else:
+                stored.append((row, match))
+
+        if len(unique) < len(ids):
+            logger.info("Dedup skipped %d of %d chunks", len(ids) - len(unique), len(ids))
+
+        return unique, in_batch, stored
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get deduplication counters"""
+        ratio = self.duplicates_found / self.chunks_seen if self.chunks_seen else 0.0
+        return {
+            "chunks_seen": self.chunks_seen,
+            "duplicates": self.duplicates_found,
+            "ratio": ratio,
+            "indexed": len(self._signatures)
+        }
+
+
+def provenance(metadata: Dict[str, Any]) -> List[str]:
+    """Source paths (see source_key) of the files holding a chunk, its own file first"""
+    sources = metadata.get("sources") or [source_key(metadata)]
+    if isinstance(sources, str):
+        # Stored as a "|"-separated string before sources became a list
+        sources = sources.split("|")
+    return [s for s in sources if s]
+
+
+def add_provenance(metadata: Dict[str, Any], duplicate_metadata: Dict[str, Any]):
+    """Record a duplicate's source file on the canonical chunk's metadata.
+
+    ``sources`` is a list metadata value, so the chunks a file duplicates
+    can be found with a ``$contains`` filter; ``duplicate_count`` is the
+    number of other files listed.
+    """
+    known = provenance(metadata)
+    source = source_key(duplicate_metadata)
+    if source and source not in known:
+        known.append(source)
+    metadata["sources"] = known
+    metadata["duplicate_count"] = len(known) - 1
+    # The chunk's own file ingested again: the chunk is part of that ingest
+    ingested_at = duplicate_metadata.get("ingested_at")
+    if source == source_key(metadata) and ingested_at is not None:
+        metadata["ingested_at"] = max(metadata.get("ingested_at", 0.0), ingested_at)
+
+
+def remove_provenance(metadata: Dict[str, Any], removed: Iterable[str]) -> bool:
+    """Drop deleted files from a chunk's sources.
+
+    Returns False when no other file holds the chunk, so it has to be
+    deleted. When the chunk's own file is removed, the first remaining
+    source becomes its file; page and chunk_index stay those of the
+    removed copy.
+    """
+    removed = set(removed)
+    known = provenance(metadata)
+    left = [s for s in known if s not in removed]
+    if not left:
+        return False
+    if len(left) == len(known):
+        return True
+
+    if source_key(metadata) in removed:
+        metadata["filename"] = os.path.basename(left[0])
+        # Sources recorded before paths were stored are bare file names
+        metadata["source_path"] = left[0] if os.path.isabs(left[0]) else None
+    metadata["sources"] = left
+    metadata["duplicate_count"] = len(left) - 1
+    return True
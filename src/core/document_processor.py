@@ -1,108 +1,142 @@
-"""
-Document Processor for handling multiple file types
-"""
-
-import os
-import uuid
-from typing import List, Dict, Any
-from pathlib import Path
-
-from src.core.pdf_processor import PDFProcessor
-from src.utils.image_processor import ImageProcessor
-from src.utils.logger import setup_logger
-
-logger = setup_logger(__name__)
-
-class DocumentProcessor:
-    def __init__(self, config):
-        self.config = config
-        self.pdf_processor = PDFProcessor(config)
-        self.image_processor = ImageProcessor(config)
-    
-    def process_document(self, file_path: str) -> List[Dict[str, Any]]:
-        """Process document based on file type"""
-        file_ext = Path(file_path).suffix.lower()
-        filename = Path(file_path).name
-        
-        logger.info(f"Processing document: {filename} (type: {file_ext})")
-        
-        if file_ext == '.pdf':
-            return self.pdf_processor.process_pdf(file_path, filename)
-        elif file_ext in ['.png', '.jpg', '.jpeg']:
-            return self.image_processor.process_image(file_path, filename)
-        elif file_ext == '.txt':
-            return self.process_text_file(file_path, filename)
-        else:
-            raise ValueError(f"Unsupported file type: {file_ext}")
-    
-    def process_text_file(self, file_path: str, filename: str) -> List[Dict[str, Any]]:
-        """Process plain text files"""
-        try:
-            with open(file_path, 'r', encoding='utf-8') as f:
-                content = f.read()
-            
-            if not content.strip():
-                logger.warning(f"Empty text file: {filename}")
-                return []
-            
-            # Simple chunking strategy
-            chunks = self._chunk_text(
-                content, 
-                chunk_size=self.config.get("processing.chunk_size", 1000),
-                overlap=self.config.get("processing.chunk_overlap", 200)
-            )
-            
-            documents = []
-            for i, chunk in enumerate(chunks):
-                documents.append({
-                    "id": f"{filename}_{i}_{str(uuid.uuid4())[:8]}",
-                    "content": chunk,
-                    "metadata": {
-                        "filename": filename,
-                        "file_type": "text",
-                        "chunk_index": i,
-                        "total_chunks": len(chunks),
-                        "source": "text_file"
-                    }
-                })
-            
-            logger.info(f"Created {len(documents)} chunks from text file: {filename}")
-            return documents
-            
-        except Exception as e:
-            logger.error(f"Error processing text file {filename}: {e}")
-            return []
-    
-    def _chunk_text(self, text: str, chunk_size: int = 1000, overlap: int = 200) -> List[str]:
-        """Split text into overlapping chunks"""
-        if len(text) <= chunk_size:
-            return [text]
-        
-        chunks = []
-        start = 0
-        
-        while start < len(text):
-            end = start + chunk_size
-            if end > len(text):
-                end = len(text)
-            
-            # Try to break at sentence boundary
-            if end < len(text):
-                # Look for sentence endings
-                for break_pos in range(end, start + chunk_size // 2, -1):
-                    if text[break_pos] in ['.', '!', '?', '\n']:
-                        end = break_pos + 1
-                        break
-            
-            chunk = text[start:end].strip()
-            if chunk:
-                chunks.append(chunk)
-            
-            if end == len(text):
-                break
-                
-            start = end - overlap
-            if start < 0:
-                start = 0
-        
-        return chunks
\ No newline at end of file
+"""
+Document Processor for handling multiple file types
+"""
+
+import os
+from typing import List, Dict, Any, Optional, Tuple
+from pathlib import Path
+
+from src.core.pdf_processor import PDFProcessor
+from src.models.schemas import ChunkBatch
+from src.utils.image_processor import ImageProcessor
+from src.utils.logger import setup_logger
+from src.utils.text_spans import trim_span
+
+logger = setup_logger(__name__)
+
+class DocumentProcessor:
+    def __init__(self, config):
+        self.config = config
+        self.pdf_processor = PDFProcessor(config)
+        self.image_processor = ImageProcessor(config)
+    
+    def process_document(self, file_path: str, stats: Optional[Dict[str, Any]] = None) -> List[Dict[str, Any]]:
+        """Process document based on file type, filling stats for PDFs when given"""
+        return self.process_document_batch(file_path, stats).to_documents()
+    
+    def process_document_batch(self, file_path: str, stats: Optional[Dict[str, Any]] = None) -> ChunkBatch:
+        """Like process_document, returning a compact ChunkBatch"""
+        file_ext = Path(file_path).suffix.lower()
+        filename = Path(file_path).name
+        
+        logger.info("Processing document: %s (type: %s)", filename, file_ext)
+        
+        if file_ext == '.pdf':
+            batch = self.pdf_processor.process_pdf_batch(file_path, filename, stats)
+        elif file_ext in ['.png', '.jpg', '.jpeg']:
+            batch = ChunkBatch.from_documents(self.image_processor.process_image(file_path, filename))
+        elif file_ext == '.txt':
+            batch = self.process_text_file_batch(file_path, filename)
+        else:
+            raise ValueError(f"Unsupported file type: {file_ext}")
+        
+        # Deletes and summaries are keyed on the path, names repeat across folders
+        batch.set_source_path(os.path.abspath(file_path))
+        return batch
+    
+    def extract_images(self, file_path: str) -> List[Dict[str, Any]]:
+        """Collect raw images (image files, images embedded in PDFs) for image embedding"""
+        file_ext = Path(file_path).suffix.lower()
+        filename = Path(file_path).name
+        
+        if file_ext == '.pdf':
+            records = self.pdf_processor.extract_images(file_path, filename)
+        elif file_ext in ['.png', '.jpg', '.jpeg']:
+            with open(file_path, 'rb') as f:
+                image_data = f.read()
+            records = [{
+                "image": image_data,
+                "metadata": {
+                    "filename": filename,
+                    "file_type": "image",
+                    "source": "image_file"
+                }
+            }]
+        else:
+            records = []
+        
+        for record in records:
+            record["metadata"]["source_path"] = os.path.abspath(file_path)
+        return records
+    
+    def process_text_file(self, file_path: str, filename: str) -> List[Dict[str, Any]]:
+        """Process plain text files"""
+        return self.process_text_file_batch(file_path, filename).to_documents()
+    
+    def process_text_file_batch(self, file_path: str, filename: str) -> ChunkBatch:
+        """Chunk a plain text file into spans over its content"""
+        batch = ChunkBatch()
+        try:
+            with open(file_path, 'r', encoding='utf-8') as f:
+                content = f.read()
+            
+            if not content.strip():
+                logger.warning(f"Empty text file: {filename}")
+                return batch
+            
+            # Simple chunking strategy
+            spans = self._chunk_spans(
+                content, 
+                chunk_size=self.config.get("processing.chunk_size", 1000),
+                overlap=self.config.get("processing.chunk_overlap", 200)
+            )
+            
+            buffer = batch.add_buffer(content)
+            for i, (start, end) in enumerate(spans):
+                batch.append(buffer, start, end, filename, "text", source="text_file",
+                             chunk_index=i, total_chunks=len(spans))
+            
+            logger.info("Created %d chunks from text file: %s", len(batch), filename)
+            return batch
+            
+        except Exception as e:
+            logger.error(f"Error processing text file {filename}: {e}")
+            return ChunkBatch()
+    
+    def _chunk_text(self, text: str, chunk_size: int = 1000, overlap: int = 200) -> List[str]:
+        """Split text into overlapping chunks"""
+        return [text[start:end] for start, end in self._chunk_spans(text, chunk_size, overlap)]
+    
+    def _chunk_spans(self, text: str, chunk_size: int = 1000, overlap: int = 200) -> List[Tuple[int, int]]:
+        """(start, end) offsets of overlapping chunks, whitespace trimmed"""
+        if len(text) <= chunk_size:
+            return [(0, len(text))]
+        
+        chunks = []
+        start = 0
+        
+        while start < len(text):
+            end = start + chunk_size
+            if end > len(text):
+                end = len(text)
+            
+            # Try to break at sentence boundary
+            if end < len(text):
+                # Look for sentence endings
+                for break_pos in range(end, start + chunk_size // 2, -1):
+                    if text[break_pos] in ['.', '!', '?', '\n']:
+                        end = break_pos + 1
+                        break
+            
+            span = trim_span(text, start, end)
+            if span is not None:
+                chunks.append(span)
+            
+            if end == len(text):
+                break
+                
+            start = end - overlap
+            if start < 0:
+                start = 0
+        
+        return chunks
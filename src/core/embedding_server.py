@@ -0,0 +1,390 @@
+"""
+Local embedding server shared by every process on the machine
+
+Run it with ``python -m src.core.embedding_server``. It loads the
+configured text embedding model once and listens on a Unix socket
+(embedding.server.socket). VectorStore connects to it when it is running
+and loads its own model copy otherwise.
+
+Requests carry the texts as length-prefixed JSON. Vectors do not go back
+over the socket: each client owns a shared-memory buffer, named with the
+prefix the server hands out, the server writes the float32 rows into it
+and replies with the row count and each text's token count. Failed
+requests get an error reply.
+Requests from all clients are merged into batches of up to
+embedding.server.max_batch texts, waiting at most max_wait_ms for more.
+"""
+
+import argparse
+import atexit
+import json
+import os
+import queue
+import secrets
+import signal
+import socket
+import struct
+import sys
+import threading
+import time
+from multiprocessing import shared_memory
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from src.utils.config import Config
+from src.utils.embedding_backends import EmbeddingBackend, create_embedding_backend
+from src.utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+_HEADER = struct.Struct("!I")
+
+
+def _send(sock: socket.socket, message: Dict[str, Any]):
+    payload = json.dumps(message).encode("utf-8")
+    sock.sendall(_HEADER.pack(len(payload)) + payload)
+
+
+def _receive_exactly(sock: socket.socket, size: int) -> bytes:
+    data = bytearray()
+    while len(data) < size:
+        chunk = sock.recv(size - len(data))
+        if not chunk:
+            raise ConnectionError("Connection closed")
+        data.extend(chunk)
+    return bytes(data)
+
+
+def _receive(sock: socket.socket) -> Dict[str, Any]:
+    (size,) = _HEADER.unpack(_receive_exactly(sock, _HEADER.size))
+    return json.loads(_receive_exactly(sock, size).decode("utf-8"))
+
+
+def _attach(name: str, prefix: str) -> shared_memory.SharedMemory:
+    """Open a client's buffer without taking over its lifetime
+
+    Only segments named with this server's prefix are opened, so a client
+    cannot make the server write into someone else's shared memory.
+    """
+    if not name.lstrip("/").startswith(prefix):
+        raise ValueError(f"Buffer {name} was not created for this server")
+    try:
+        return shared_memory.SharedMemory(name=name, track=False)
+    except TypeError:
+        # Before Python 3.13 attaching registers the segment with this
+        # process's resource tracker, which would unlink it on exit
+        from multiprocessing import resource_tracker
+        buffer = shared_memory.SharedMemory(name=name)
+        resource_tracker.unregister(buffer._name, "shared_memory")
+        return buffer
+
+
+class _Request:
+    __slots__ = ("texts", "target", "counts", "done", "error")
+
+    def __init__(self, texts: List[str], target: np.ndarray):
+        self.texts = texts
+        self.target = target
+        self.counts: List[int] = []
+        self.done = threading.Event()
+        self.error: Optional[str] = None
+
+
+class EmbeddingServer:
+    """Serves one embedding model to local clients over a Unix socket"""
+
+    def __init__(self, config, socket_path: Optional[str] = None):
+        self.config = config
+        self.socket_path = socket_path or config.get("embedding.server.socket", "./data/embedding.sock")
+        self.max_batch = config.get("embedding.server.max_batch", 256)
+        self.max_wait = config.get("embedding.server.max_wait_ms", 5) / 1000
+        self.model_name = config.get("embedding.model", "sentence-transformers/all-MiniLM-L6-v2")
+        self.backend = create_embedding_backend(config, self.model_name)
+        self.dimension = self.backend.get_sentence_embedding_dimension()
+        self.buffer_prefix = f"ragemb_{os.getpid()}_{secrets.token_hex(4)}_"
+        self.requests: "queue.Queue[_Request]" = queue.Queue()
+        self.stats = {"requests": 0, "texts": 0, "batches": 0, "encode_seconds": 0.0}
+        self._stop = threading.Event()
+        self._listener: Optional[socket.socket] = None
+
+    def serve_forever(self):
+        """Accept clients until stop() is called"""
+        path = Path(self.socket_path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        if path.exists():
+            if server_running(str(path)):
+                raise RuntimeError(f"An embedding server is already listening on {path}")
+            path.unlink()
+
+        self._listener = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self._listener.bind(str(path))
+        self._listener.listen(64)
+        self._listener.settimeout(0.5)
+        threading.Thread(target=self._batch_loop, name="embed-batcher", daemon=True).start()
+        logger.info(f"Embedding server for {self.model_name} ({self.backend.name}) listening on {path}")
+
+        try:
+            while not self._stop.is_set():
+                try:
+                    connection, _ = self._listener.accept()
+                except socket.timeout:
+                    continue
+                connection.settimeout(None)
+                threading.Thread(target=self._serve_client, args=(connection,), daemon=True).start()
+        finally:
+            self._listener.close()
+            if path.exists():
+                path.unlink()
+            logger.info(f"Embedding server stopped: {self.stats}")
+
+    def stop(self):
+        self._stop.set()
+
+    def _serve_client(self, connection: socket.socket):
+        """One thread per client; requests are queued for the batcher"""
+        attached: Dict[str, shared_memory.SharedMemory] = {}
+        try:
+            while True:
+                try:
+                    message = _receive(connection)
+                except (ConnectionError, OSError):
+                    return
+                try:
+                    reply = self._handle(message, attached)
+                except Exception as e:
+                    logger.warning(f"Embedding request failed: {e}")
+                    reply = {"error": str(e)}
+                try:
+                    _send(connection, reply)
+                except OSError:
+                    return
+        finally:
+            for buffer in attached.values():
+                buffer.close()
+            connection.close()
+
+    def _handle(self, message: Dict[str, Any], attached: Dict[str, shared_memory.SharedMemory]) -> Dict[str, Any]:
+        """Reply to one client message; attached holds the client's open buffer"""
+        op = message.get("op")
+        if op == "hello":
+            return {
+                "model": self.model_name,
+                "backend": self.backend.name,
+                "dimension": self.dimension,
+                "max_seq_length": self.backend.max_seq_length,
+                "buffer_prefix": self.buffer_prefix
+            }
+        if op == "encode":
+            name = message["buffer"].lstrip("/")
+            buffer = attached.get("buffer")
+            if buffer is None or buffer.name.lstrip("/") != name:
+                if buffer is not None:
+                    buffer.close()
+                    del attached["buffer"]
+                buffer = attached["buffer"] = _attach(name, self.buffer_prefix)
+            texts = message["texts"]
+            if len(texts) * self.dimension * 4 > buffer.size:
+                raise ValueError(f"{len(texts)} vectors do not fit the {buffer.size} byte buffer")
+            target = np.ndarray((len(texts), self.dimension), dtype=np.float32, buffer=buffer.buf)
+            request = _Request(texts, target)
+            self.requests.put(request)
+            request.done.wait()
+            del target
+            request.target = None
+            if request.error:
+                return {"error": request.error}
+            return {"rows": len(texts), "counts": request.counts}
+        if op == "count_tokens":
+            return {"counts": self.backend.count_tokens(message["texts"])}
+        if op == "stats":
+            return dict(self.stats, queued=self.requests.qsize())
+        return {"error": f"Unknown op: {op}"}
+
+    def _batch_loop(self):
+        """Merge queued requests into batches and encode them"""
+        while not self._stop.is_set():
+            try:
+                first = self.requests.get(timeout=0.5)
+            except queue.Empty:
+                continue
+            batch = [first]
+            size = len(first.texts)
+            deadline = time.perf_counter() + self.max_wait
+            while size < self.max_batch:
+                remaining = deadline - time.perf_counter()
+                if remaining <= 0:
+                    break
+                try:
+                    request = self.requests.get(timeout=remaining)
+                except queue.Empty:
+                    break
+                batch.append(request)
+                size += len(request.texts)
+
+            texts = [text for request in batch for text in request.texts]
+            start = time.perf_counter()
+            try:
+                if texts:
+                    embeddings = np.asarray(self.backend.encode(texts), dtype=np.float32)
+                    counts = self.backend.count_tokens(texts)
+                    offset = 0
+                    for request in batch:
+                        request.target[:] = embeddings[offset:offset + len(request.texts)]
+                        request.counts = counts[offset:offset + len(request.texts)]
+                        offset += len(request.texts)
+            except Exception as e:
+                logger.error(f"Embedding batch failed: {e}")
+                for request in batch:
+                    request.error = str(e)
+            self.stats["encode_seconds"] += time.perf_counter() - start
+            self.stats["requests"] += len(batch)
+            self.stats["texts"] += len(texts)
+            self.stats["batches"] += 1
+            for request in batch:
+                request.done.set()
+
+
+class EmbeddingClient(EmbeddingBackend):
+    """Backend that forwards encode calls to a running EmbeddingServer.
+
+    If the server goes away, the client logs a warning and loads the
+    model locally through fallback, so callers keep working.
+    """
+
+    def __init__(self, socket_path: str, fallback=None, timeout: float = 60.0):
+        self.socket_path = socket_path
+        self.fallback = fallback
+        self._local = None
+        self._lock = threading.Lock()
+        self._sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self._sock.settimeout(timeout)
+        self._sock.connect(socket_path)
+        _send(self._sock, {"op": "hello"})
+        self.info = _receive(self._sock)
+        self.name = f"server:{self.info['backend']}"
+        self.max_seq_length = self.info["max_seq_length"]
+        self.dimension = self.info["dimension"]
+        self.buffer_prefix = self.info["buffer_prefix"]
+        self._buffer: Optional[shared_memory.SharedMemory] = None
+        # Clients live as long as the process; free the buffer on exit
+        atexit.register(self.close)
+
+    def get_sentence_embedding_dimension(self) -> int:
+        return self.dimension
+
+    def count_tokens(self, texts: List[str]) -> List[int]:
+        if self._local is not None:
+            return self._local.count_tokens(texts)
+        try:
+            with self._lock:
+                _send(self._sock, {"op": "count_tokens", "texts": list(texts)})
+                return _receive(self._sock)["counts"]
+        except (ConnectionError, OSError):
+            # encode() switches to the local model on its next call
+            return super().count_tokens(texts)
+
+    def _ensure_buffer(self, rows: int):
+        """Grow the shared buffer to hold rows vectors"""
+        needed = max(rows, 1) * self.dimension * 4
+        if self._buffer is None or self._buffer.size < needed:
+            if self._buffer is not None:
+                self._buffer.close()
+                self._buffer.unlink()
+            self._buffer = shared_memory.SharedMemory(
+                name=self.buffer_prefix + secrets.token_hex(8), create=True, size=max(needed, 1 << 20)
+            )
+
+    def encode(self, sentences, batch_size: int = 32, **kwargs) -> np.ndarray:
+        if self._local is not None:
+            return self._local.encode(sentences, batch_size=batch_size, **kwargs)
+        single = isinstance(sentences, str)
+        texts = [sentences] if single else [str(text) for text in sentences]
+        embeddings, _ = self.encode_counted(texts, batch_size=batch_size, **kwargs)
+        return embeddings[0] if single else embeddings
+
+    def encode_counted(self, texts: List[str], batch_size: int = 32, **kwargs) -> Tuple[np.ndarray, List[int]]:
+        """Embeddings and untruncated token counts of texts in one round trip"""
+        if self._local is None:
+            try:
+                with self._lock:
+                    self._ensure_buffer(len(texts))
+                    _send(self._sock, {"op": "encode", "texts": list(texts), "buffer": self._buffer.name})
+                    reply = _receive(self._sock)
+                    if "error" in reply:
+                        raise RuntimeError(f"Embedding server: {reply['error']}")
+                    view = np.ndarray((reply["rows"], self.dimension), dtype=np.float32, buffer=self._buffer.buf)
+                    embeddings = view.copy()
+                    del view
+                return embeddings, reply["counts"]
+            except (ConnectionError, OSError) as e:
+                if self.fallback is None:
+                    raise
+                logger.warning(f"Embedding server unavailable ({e}), loading the model locally")
+                self._local = self.fallback()
+        return self._local.encode(texts, batch_size=batch_size, **kwargs), self._local.count_tokens(texts)
+
+    def close(self):
+        with self._lock:
+            self._sock.close()
+            if self._local is not None:
+                self._local.close()
+            if self._buffer is not None:
+                self._buffer.close()
+                self._buffer.unlink()
+                self._buffer = None
+
+
+def server_running(socket_path: str) -> bool:
+    """Whether something accepts connections on socket_path"""
+    if not os.path.exists(socket_path):
+        return False
+    probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        probe.settimeout(1.0)
+        probe.connect(socket_path)
+        return True
+    except OSError:
+        return False
+    finally:
+        probe.close()
+
+
+def connect_embedding_server(config, model_name: str, fallback=None) -> Optional[EmbeddingClient]:
+    """Client for the configured server if it runs and serves model_name"""
+    if config.get("embedding.server.use", "auto") == "never":
+        return None
+    socket_path = config.get("embedding.server.socket", "./data/embedding.sock")
+    if not server_running(socket_path):
+        return None
+    try:
+        client = EmbeddingClient(socket_path, fallback)
+    except (OSError, ValueError, KeyError) as e:
+        logger.warning(f"Could not use embedding server at {socket_path}: {e}")
+        return None
+    if client.info["model"] != model_name:
+        logger.warning(f"Embedding server serves {client.info['model']}, not {model_name}; loading locally")
+        client.close()
+        return None
+    logger.info(f"Using embedding server at {socket_path} ({client.info['backend']})")
+    return client
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve the configured embedding model to local processes")
+    parser.add_argument("--config", default=None, help="Config file, config.yaml by default")
+    parser.add_argument("--socket", default=None, help="Socket path, embedding.server.socket by default")
+    args = parser.parse_args()
+
+    server = EmbeddingServer(Config(args.config), args.socket)
+    signal.signal(signal.SIGTERM, lambda *_: server.stop())
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        server.stop()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
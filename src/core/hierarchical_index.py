@@ -0,0 +1,171 @@
+"""
+Document and page level summary vectors for two-stage retrieval
+"""
+
+from typing import List, Dict, Any, Iterable, Optional
+
+import numpy as np
+from src.models.schemas import source_key
+from src.utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+
+class HierarchicalIndex:
+    """Coarse index over documents and pages built from chunk embeddings.
+
+    Every document and every PDF page gets a summary vector: the mean of
+    its chunk embeddings, renormalized. Means are kept as running averages
+    (the chunk count lives in metadata) so a file may be added over several
+    calls. A query first selects candidate documents, then candidate pages
+    inside them, and the chunk search is restricted to those.
+
+    Summaries are keyed on the chunks' source path (see source_key), held
+    in the "document" metadata key, so same-named files in different
+    folders get separate summaries. Summaries written before that are
+    replaced by rebuild().
+    """
+
+    def __init__(self, client, collection_name: str, config):
+        self.client = client
+        self.collection_name = collection_name
+        self.config = config
+        self.candidate_documents = config.get("hierarchy.candidate_documents", 5)
+        self.candidate_pages = config.get("hierarchy.candidate_pages", 20)
+
+        self._open_collections()
+
+    def _open_collections(self):
+        """Create or get the summary collections"""
+        self.documents = self.client.get_or_create_collection(
+            name=f"{self.collection_name}_documents",
+            metadata={"description": "Document summary embeddings"}
+        )
+        self.pages = self.client.get_or_create_collection(
+            name=f"{self.collection_name}_pages",
+            metadata={"description": "Page summary embeddings"}
+        )
+
+    def rebuild(self, pages: Iterable[Dict[str, Any]]) -> int:
+        """Recompute all summaries from the stored chunk embeddings
+
+        pages are Chroma get() pages with metadatas and embeddings of
+        every chunk, e.g. VectorStore.iter_chunks().
+        """
+        self.client.delete_collection(self.documents.name)
+        self.client.delete_collection(self.pages.name)
+        self._open_collections()
+
+        total = 0
+        for page in pages:
+            self.update(page["metadatas"], np.asarray(page["embeddings"], dtype=np.float32))
+            total += len(page["ids"])
+
+        logger.info(f"Rebuilt summaries for {self.documents.count()} documents and {self.pages.count()} pages")
+        return total
+
+    def remove(self, document: str):
+        """Drop the summaries of a document, given its source path"""
+        self.documents.delete(ids=[document])
+        self.pages.delete(where={"document": document})
+
+    def update(self, metadatas: List[Dict[str, Any]], embeddings: np.ndarray):
+        """Fold newly stored chunk embeddings into document and page summaries"""
+        doc_groups: Dict[str, List[int]] = {}
+        doc_keys: Dict[str, Dict[str, Any]] = {}
+        page_groups: Dict[str, List[int]] = {}
+        page_keys: Dict[str, tuple] = {}
+
+        for i, metadata in enumerate(metadatas):
+            if metadata.get("filename") is None:
+                continue
+            document = source_key(metadata)
+            doc_groups.setdefault(document, []).append(i)
+            doc_keys[document] = {key: metadata[key] for key in ("filename", "source_path") if metadata.get(key)}
+            page_number = metadata.get("page_number")
+            if page_number is not None:
+                page_id = f"{document}::page{page_number}"
+                page_groups.setdefault(page_id, []).append(i)
+                page_keys[page_id] = (document, page_number)
+
+        paged = {document for document, _ in page_keys.values()}
+        self._upsert(self.documents, doc_groups, embeddings,
+                     {doc_id: dict(doc_keys[doc_id], document=doc_id, paged=doc_id in paged) for doc_id in doc_groups})
+        self._upsert(self.pages, page_groups, embeddings,
+                     {page_id: dict(doc_keys[d], document=d, page_number=p) for page_id, (d, p) in page_keys.items()})
+
+    def _upsert(self, collection, groups: Dict[str, List[int]], embeddings: np.ndarray,
+                base_metadata: Dict[str, Dict[str, Any]]):
+        """Merge group means into existing summary vectors"""
+        if not groups:
+            return
+
+        ids = list(groups.keys())
+        existing = collection.get(ids=ids, include=["embeddings", "metadatas"])
+        previous = {
+            doc_id: (np.asarray(embedding, dtype=np.float32), metadata)
+            for doc_id, embedding, metadata in zip(existing["ids"], existing["embeddings"], existing["metadatas"])
+        }
+
+        vectors = []
+        metadatas = []
+        for doc_id in ids:
+            rows = embeddings[groups[doc_id]]
+            total = rows.sum(axis=0)
+            count = len(rows)
+            metadata = dict(base_metadata[doc_id])
+            if doc_id in previous:
+                old_mean, old_metadata = previous[doc_id]
+                old_count = old_metadata.get("chunk_count", 0)
+                total = total + old_mean * old_count
+                count += old_count
+                if old_metadata.get("paged"):
+                    metadata["paged"] = True
+            mean = total / count
+            norm = np.linalg.norm(mean)
+            vectors.append((mean / norm if norm else mean).tolist())
+            metadata["chunk_count"] = count
+            metadatas.append(metadata)
+
+        collection.upsert(ids=ids, embeddings=vectors, metadatas=metadatas)
+
+    def candidate_filter(self, query_embedding: List[List[float]]) -> Optional[Dict[str, Any]]:
+        """Build a chunk-level where filter from the best documents and pages"""
+        doc_count = self.documents.count()
+        if doc_count == 0:
+            return None
+
+        doc_hits = self.documents.query(
+            query_embeddings=query_embedding,
+            n_results=min(self.candidate_documents, doc_count),
+            include=["metadatas"]
+        )
+        documents = doc_hits["metadatas"][0]
+        paged_files = [m.get("document", m["filename"]) for m in documents if m.get("paged")]
+
+        conditions = []
+        if paged_files:
+            page_hits = self.pages.query(
+                query_embeddings=query_embedding,
+                n_results=self.candidate_pages,
+                where={"document": {"$in": paged_files}},
+                include=["metadatas"]
+            )
+            for metadata in page_hits["metadatas"][0]:
+                conditions.append({"$and": [
+                    _chunk_filter(metadata),
+                    {"page_number": metadata["page_number"]}
+                ]})
+        # Documents without pages (text files, images) are searched whole
+        conditions.extend(_chunk_filter(m) for m in documents if not m.get("paged"))
+
+        if not conditions:
+            return None
+        return conditions[0] if len(conditions) == 1 else {"$or": conditions}
+
+
+def _chunk_filter(metadata: Dict[str, Any]) -> Dict[str, Any]:
+    """Where clause matching the chunks of a document, on its source path when known"""
+    if metadata.get("source_path"):
+        return {"source_path": metadata["source_path"]}
+    return {"filename": metadata["filename"]}
@@ -0,0 +1,137 @@
+"""
+Joint image-text embeddings (CLIP) for cross-modal search
+"""
+
+import hashlib
+import io
+from pathlib import Path
+from typing import List, Dict, Any, Optional
+
+from PIL import Image
+from src.models.schemas import source_key
+from src.utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+
+class ImageIndex:
+    """Stores CLIP image vectors in a side collection and searches them with text.
+
+    Images are downscaled to thumbnails before encoding; thumbnails are
+    cached on disk by content hash, so re-ingesting a file skips decoding
+    the full-size image. Image ids are derived from the same hash, which
+    makes re-ingestion an upsert rather than a duplicate.
+    """
+
+    def __init__(self, client, collection_name: str, config):
+        self.config = config
+        self.model_name = config.get("image_embedding.model", "clip-ViT-B-32")
+        self.batch_size = config.get("image_embedding.batch_size", 16)
+        self.thumbnail_size = config.get("image_embedding.thumbnail_size", 224)
+        self.min_size = config.get("image_embedding.min_image_size", 32)
+        self.cache_dir = Path(config.get("image_embedding.thumbnail_cache", "./data/thumbnails"))
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self._model = None
+
+        self.collection = client.get_or_create_collection(
+            name=f"{collection_name}_images",
+            metadata={"description": "Image embeddings", "hnsw:space": "cosine"}
+        )
+
+    @property
+    def model(self):
+        """CLIP model, loaded on first use"""
+        if self._model is None:
+            from src.core.vector_store import shared_model
+            # CLIP encodes images too, which only SentenceTransformer does
+            self._model = shared_model(self.model_name, self.config, "sentence_transformers")
+        return self._model
+
+    def thumbnail(self, image_bytes: bytes, digest: str) -> Optional[Image.Image]:
+        """Load a cached thumbnail or build one from the full image"""
+        cached = self.cache_dir / f"{digest}.jpg"
+        if cached.exists():
+            return Image.open(cached).convert("RGB")
+
+        image = Image.open(io.BytesIO(image_bytes))
+        if min(image.size) < self.min_size:
+            return None
+        # Let the JPEG decoder downscale while decoding
+        image.draft("RGB", (self.thumbnail_size, self.thumbnail_size))
+        image = image.convert("RGB")
+        image.thumbnail((self.thumbnail_size, self.thumbnail_size))
+        image.save(cached, "JPEG", quality=85)
+        return image
+
+    def add_images(self, records: List[Dict[str, Any]]) -> int:
+        """Embed and store images.
+
+        Each record has "image" (encoded bytes), "metadata" and an optional
+        "content" (e.g. OCR text) returned with search hits.
+        """
+        stored = 0
+        for start in range(0, len(records), self.batch_size):
+            batch = records[start:start + self.batch_size]
+            ids, images, documents, metadatas = [], [], [], []
+            for record in batch:
+                digest = hashlib.sha1(record["image"]).hexdigest()
+                try:
+                    image = self.thumbnail(record["image"], digest)
+                except Exception as e:
+                    logger.warning(f"Could not decode image from {record['metadata'].get('filename')}: {e}")
+                    continue
+                if image is None:
+                    continue
+                ids.append(f"{source_key(record['metadata'])}_img_{digest[:16]}")
+                images.append(image)
+                documents.append(record.get("content") or f"[image] {record['metadata'].get('filename')}")
+                metadatas.append(dict(record["metadata"], content_type="image_embedding", image_hash=digest))
+
+            if not images:
+                continue
+            embeddings = self.model.encode(images, batch_size=self.batch_size)
+            self.collection.upsert(ids=ids, embeddings=embeddings.tolist(), documents=documents, metadatas=metadatas)
+            stored += len(ids)
+
+        if stored:
+            logger.info(f"Embedded {stored} images")
+        return stored
+
+    def remove(self, file_path: str):
+        """Drop the image vectors of a file, matched like VectorStore.delete_file"""
+        filename = Path(file_path).name
+        found = self.collection.get(where={"filename": filename}, include=["metadatas"])
+        ids = [image_id for image_id, metadata in zip(found["ids"], found["metadatas"])
+               if source_key(metadata or {}) in (file_path, filename)]
+        if ids:
+            self.collection.delete(ids=ids)
+
+    def search(self, query: str, top_k: int = 5, threshold: Optional[float] = None) -> List[Dict[str, Any]]:
+        """Search image vectors with a text query"""
+        if threshold is None:
+            threshold = self.config.get("image_embedding.similarity_threshold", 0.2)
+        if self.collection.count() == 0:
+            return []
+
+        query_embedding = self.model.encode([query]).tolist()
+        results = self.collection.query(
+            query_embeddings=query_embedding,
+            n_results=top_k,
+            include=["metadatas", "documents", "distances"]
+        )
+
+        search_results = []
+        for doc_id, doc, metadata, distance in zip(
+            results["ids"][0], results["documents"][0], results["metadatas"][0], results["distances"][0]
+        ):
+            # Cosine space: similarity = 1 - distance
+            score = 1 - distance
+            if score >= threshold:
+                search_results.append({
+                    "id": doc_id,
+                    "content": doc,
+                    "metadata": metadata,
+                    "score": score,
+                    "document_type": metadata.get("file_type", "image")
+                })
+        return search_results
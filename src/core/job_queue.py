@@ -0,0 +1,244 @@
+"""
+Durable ingestion job queue backed by SQLite
+"""
+
+import os
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import List, Dict, Any, Iterable, Optional
+
+from src.utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+PENDING = "pending"
+EXTRACTING = "extracting"
+EMBEDDING = "embedding"
+DONE = "done"
+FAILED = "failed"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    file_path TEXT NOT NULL,
+    tenant TEXT NOT NULL DEFAULT '',
+    state TEXT NOT NULL DEFAULT 'pending',
+    attempts INTEGER NOT NULL DEFAULT 0,
+    written INTEGER NOT NULL DEFAULT 0,
+    mtime REAL,
+    size INTEGER,
+    chunks INTEGER NOT NULL DEFAULT 0,
+    error TEXT,
+    worker TEXT,
+    updated_at REAL,
+    UNIQUE (file_path, tenant)
+);
+CREATE INDEX IF NOT EXISTS jobs_state ON jobs (state, id);
+"""
+
+
+class IngestionQueue:
+    """Per-file ingestion state that survives crashes and restarts.
+
+    Each file moves pending -> extracting -> embedding -> done, or back to
+    pending on error until ``ingestion.max_attempts`` is reached and it is
+    marked failed. Every transition is its own transaction, so a killed run
+    leaves each file in the last state it reached. ``written`` records that
+    chunks of the file may already be in the vector store; such files are
+    cleared from the store before they are written again.
+
+    One runner per queue file is assumed: ``recover`` hands every job that
+    was in progress back to the pending state.
+    """
+
+    def __init__(self, config, path: Optional[str] = None):
+        self.path = path or config.get("ingestion.queue_path", "./data/ingestion.db")
+        self.max_attempts = config.get("ingestion.max_attempts", 3)
+        Path(self.path).parent.mkdir(parents=True, exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, isolation_level=None, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(_SCHEMA)
+
+    def enqueue(self, file_paths: Iterable[str], tenant: Optional[str] = None, batch_size: int = 500) -> int:
+        """Queue files, returning how many are new or changed since last ingested.
+
+        Files already queued are left alone unless their size or mtime
+        changed, in which case they start over with a fresh attempt count.
+        file_paths may be a generator; every batch_size files are committed
+        so workers can start on them while the rest is still being listed.
+        """
+        queued = 0
+        seen = 0
+        rows = []
+        for file_path in file_paths:
+            try:
+                stat = os.stat(file_path)
+            except OSError as e:
+                logger.warning(f"Not queueing {file_path}: {e}")
+                continue
+            rows.append((os.path.abspath(file_path), tenant or "", stat.st_mtime, stat.st_size, time.time()))
+            if len(rows) >= batch_size:
+                queued += self._insert(rows)
+                seen += len(rows)
+                rows = []
+        if rows:
+            queued += self._insert(rows)
+            seen += len(rows)
+
+        logger.info(f"Queued {queued} of {seen} files")
+        return queued
+
+    def _insert(self, rows: List[tuple]) -> int:
+        """Upsert one batch of jobs in a single transaction"""
+        with self._lock:
+            before = self._conn.total_changes
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                self._conn.executemany(
+                    """
+                    INSERT INTO jobs (file_path, tenant, mtime, size, updated_at) VALUES (?, ?, ?, ?, ?)
+                    ON CONFLICT (file_path, tenant) DO UPDATE SET
+                        state = 'pending', attempts = 0, error = NULL,
+                        mtime = excluded.mtime, size = excluded.size, updated_at = excluded.updated_at
+                    WHERE jobs.mtime IS NOT excluded.mtime OR jobs.size IS NOT excluded.size
+                    """,
+                    rows
+                )
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+            return self._conn.total_changes - before
+
+    def claim(self, worker: str, file_paths: Optional[List[str]] = None,
+              tenant: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        """Atomically take the oldest pending job and mark it extracting
+
+        With file_paths only the tenant's jobs for those files are claimed.
+        """
+        sql = "SELECT * FROM jobs WHERE state = ?"
+        params = [PENDING]
+        if file_paths is not None:
+            sql += f" AND tenant = ? AND file_path IN ({', '.join('?' * len(file_paths))})"
+            params += [tenant or ""] + [os.path.abspath(path) for path in file_paths]
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                row = self._conn.execute(sql + " ORDER BY id LIMIT 1", params).fetchone()
+                if row is not None:
+                    self._conn.execute(
+                        "UPDATE jobs SET state = ?, worker = ?, updated_at = ? WHERE id = ?",
+                        (EXTRACTING, worker, time.time(), row["id"])
+                    )
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+
+        if row is None:
+            return None
+        job = dict(row)
+        job["tenant"] = job["tenant"] or None
+        job["state"] = EXTRACTING
+        return job
+
+    def start_embedding(self, job: Dict[str, Any]):
+        """Mark a job as about to write to the vector store"""
+        self._execute(
+            "UPDATE jobs SET state = ?, written = 1, updated_at = ? WHERE id = ?",
+            (EMBEDDING, time.time(), job["id"])
+        )
+        job["state"] = EMBEDDING
+
+    def complete(self, job: Dict[str, Any], chunks: int):
+        """Mark a job done"""
+        self._execute(
+            "UPDATE jobs SET state = ?, chunks = ?, error = NULL, worker = NULL, updated_at = ? WHERE id = ?",
+            (DONE, chunks, time.time(), job["id"])
+        )
+        job["state"] = DONE
+
+    def fail(self, job: Dict[str, Any], error: str) -> str:
+        """Record a failed attempt; the job is retried until max_attempts"""
+        attempts = job["attempts"] + 1
+        state = FAILED if attempts >= self.max_attempts else PENDING
+        self._execute(
+            "UPDATE jobs SET state = ?, attempts = ?, error = ?, worker = NULL, updated_at = ? WHERE id = ?",
+            (state, attempts, error, time.time(), job["id"])
+        )
+        job["state"] = state
+        job["attempts"] = attempts
+        return state
+
+    def recover(self) -> int:
+        """Return jobs left in progress by a previous run to pending"""
+        with self._lock:
+            cursor = self._conn.execute(
+                "UPDATE jobs SET state = ?, worker = NULL, updated_at = ? WHERE state IN (?, ?)",
+                (PENDING, time.time(), EXTRACTING, EMBEDDING)
+            )
+        if cursor.rowcount:
+            logger.info(f"Resuming {cursor.rowcount} interrupted jobs")
+        return cursor.rowcount
+
+    def remove(self, file_path: str, tenant: Optional[str] = None):
+        """Forget a file, e.g. after it was deleted"""
+        self._execute("DELETE FROM jobs WHERE file_path = ? AND tenant = ?", (os.path.abspath(file_path), tenant or ""))
+
+    def paths(self, tenant: Optional[str] = None) -> List[str]:
+        """Paths of every file queued for a tenant, ingested or not"""
+        with self._lock:
+            rows = self._conn.execute("SELECT file_path FROM jobs WHERE tenant = ?", (tenant or "",)).fetchall()
+        return [row[0] for row in rows]
+
+    def states(self, file_paths: Iterable[str], tenant: Optional[str] = None) -> Dict[str, str]:
+        """State of each given file's job, keyed by the path as given"""
+        states = {}
+        with self._lock:
+            for file_path in file_paths:
+                row = self._conn.execute(
+                    "SELECT state FROM jobs WHERE file_path = ? AND tenant = ?",
+                    (os.path.abspath(file_path), tenant or "")
+                ).fetchone()
+                if row is not None:
+                    states[file_path] = row[0]
+        return states
+
+    def retry_failed(self) -> int:
+        """Give failed jobs a fresh set of attempts"""
+        with self._lock:
+            cursor = self._conn.execute(
+                "UPDATE jobs SET state = ?, attempts = 0, updated_at = ? WHERE state = ?",
+                (PENDING, time.time(), FAILED)
+            )
+        return cursor.rowcount
+
+    def counts(self) -> Dict[str, int]:
+        """Number of jobs in each state"""
+        with self._lock:
+            rows = self._conn.execute("SELECT state, COUNT(*) FROM jobs GROUP BY state").fetchall()
+        counts = {state: 0 for state in (PENDING, EXTRACTING, EMBEDDING, DONE, FAILED)}
+        counts.update({state: count for state, count in rows})
+        return counts
+
+    def failures(self) -> List[Dict[str, Any]]:
+        """Failed jobs with their last error"""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT file_path, tenant, attempts, error FROM jobs WHERE state = ? ORDER BY id", (FAILED,)
+            ).fetchall()
+        return [dict(row) for row in rows]
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+    def _execute(self, sql: str, params: tuple):
+        with self._lock:
+            self._conn.execute(sql, params)
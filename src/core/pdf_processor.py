@@ -1,134 +1,428 @@
-"""
-PDF Processing with mixed content handling
-"""
-
-import fitz  # PyMuPDF
-import os
-import uuid
-from typing import List, Dict, Any
-from pathlib import Path
-from src.utils.image_processor import ImageProcessor
-from src.utils.logger import setup_logger
-
-logger = setup_logger(__name__)
-
-class PDFProcessor:
-    def __init__(self, config):
-        self.config = config
-        self.image_processor = ImageProcessor(config)
-    
-    def process_pdf(self, file_path: str, filename: str) -> List[Dict[str, Any]]:
-        """Process PDF files with mixed content"""
-        documents = []
-        
-        try:
-            doc = fitz.open(file_path)
-            logger.info(f"Processing PDF: {filename} with {len(doc)} pages")
-            
-            for page_num in range(len(doc)):
-                page = doc[page_num]
-                
-                # Extract text
-                text = page.get_text().strip()
-                if text:
-                    # Process text content with chunking
-                    text_chunks = self._chunk_text(text)
-                    for i, chunk in enumerate(text_chunks):
-                        documents.append({
-                            "id": f"{filename}_page{page_num+1}_text{i}_{str(uuid.uuid4())[:8]}",
-                            "content": chunk,
-                            "metadata": {
-                                "filename": filename,
-                                "file_type": "pdf_text",
-                                "page_number": page_num + 1,
-                                "chunk_index": i,
-                                "content_type": "text",
-                                "source": "pdf"
-                            }
-                        })
-                
-                # Extract and process images
-                image_list = page.get_images()
-                if image_list:
-                    logger.info(f"Found {len(image_list)} images on page {page_num + 1}")
-                
-                for img_index, img in enumerate(image_list):
-                    try:
-                        # Extract image
-                        xref = img[0]
-                        pix = fitz.Pixmap(doc, xref)
-                        
-                        if pix.n - pix.alpha < 4:  # RGB or Grayscale
-                            img_data = pix.tobytes("png")
-                            
-                            # Process image with OCR
-                            image_text = self.image_processor.extract_text_from_image_bytes(img_data)
-                            
-                            if image_text.strip():
-                                documents.append({
-                                    "id": f"{filename}_page{page_num+1}_img{img_index}_{str(uuid.uuid4())[:8]}",
-                                    "content": f"Image content: {image_text}",
-                                    "metadata": {
-                                        "filename": filename,
-                                        "file_type": "pdf_image",
-                                        "page_number": page_num + 1,
-                                        "image_index": img_index,
-                                        "content_type": "image_ocr",
-                                        "source": "pdf"
-                                    }
-                                })
-                                logger.info(f"Extracted text from image on page {page_num + 1}")
-                        
-                        pix = None  # Free pixmap memory
-                        
-                    except Exception as e:
-                        logger.warning(f"Error processing image on page {page_num + 1}: {e}")
-                        continue
-            
-            doc.close()
-            logger.info(f"PDF processing completed: {len(documents)} chunks created from {filename}")
-            
-        except Exception as e:
-            logger.error(f"Error processing PDF {filename}: {e}")
-        
-        return documents
-    
-    def _chunk_text(self, text: str) -> List[str]:
-        """Split text into chunks"""
-        chunk_size = self.config.get("processing.chunk_size", 1000)
-        overlap = self.config.get("processing.chunk_overlap", 200)
-        
-        if len(text) <= chunk_size:
-            return [text]
-        
-        chunks = []
-        start = 0
-        
-        while start < len(text):
-            end = start + chunk_size
-            if end > len(text):
-                end = len(text)
-            
-            # Try to break at paragraph or sentence boundary
-            if end < len(text):
-                # Look for paragraph breaks first
-                for break_pos in range(end, start + chunk_size // 2, -1):
-                    if text[break_pos:break_pos+2] == '\n\n':
-                        end = break_pos + 2
-                        break
-                    elif text[break_pos] in ['.', '!', '?'] and break_pos + 1 < len(text) and text[break_pos+1] in [' ', '\n']:
-                        end = break_pos + 1
-                        break
-            
-            chunk = text[start:end].strip()
-            if chunk:
-                chunks.append(chunk)
-            
-            if end == len(text):
-                break
-                
-            start = end - overlap
-            if start < 0:
-                start = 0
-        
-        return chunks
\ No newline at end of file
+"""
+PDF Processing with mixed content handling
+"""
+
+import fitz  # PyMuPDF
+import json
+import os
+import time
+from typing import List, Dict, Any, Tuple, Optional
+from pathlib import Path
+from PIL import Image
+import numpy as np
+from src.models.schemas import ChunkBatch
+from src.utils.image_processor import ImageProcessor
+from src.utils.logger import setup_logger
+from src.utils.metrics import get_metrics
+from src.utils.text_spans import trim_span
+from src.utils.tracing import in_current_trace, span
+
+logger = setup_logger(__name__)
+
+class PDFProcessor:
+    def __init__(self, config):
+        self.config = config
+        self.image_processor = ImageProcessor(config)
+        self.metrics = get_metrics(config)
+    
+    def process_pdf(self, file_path: str, filename: str, stats: Optional[Dict[str, Any]] = None) -> List[Dict[str, Any]]:
+        """Process PDF files with mixed content
+        
+        If a stats dict is given it is filled with page counts and the
+        number of pages (and seconds) that needed full-page OCR.
+        """
+        return self.process_pdf_batch(file_path, filename, stats).to_documents()
+    
+    def process_pdf_batch(self, file_path: str, filename: str, stats: Optional[Dict[str, Any]] = None) -> ChunkBatch:
+        """Like process_pdf, returning a compact ChunkBatch"""
+        documents = ChunkBatch()
+        layout_mode = self.config.get("processing.pdf_mode", "text") == "layout"
+        detect_scans = self.config.get("ocr.scanned_pages.enabled", True)
+        scanned_pages = []
+        
+        try:
+            doc = fitz.open(file_path)
+            logger.info("Processing PDF: %s with %d pages", filename, len(doc))
+            
+            for page_num in range(len(doc)):
+                page = doc[page_num]
+                # Plain text is extracted once, for the scan check and chunking
+                text = None if layout_mode else page.get_text().strip()
+                
+                # Image-only pages are OCRed as a whole after the digital pages
+                if detect_scans and self._is_scanned(page, text):
+                    scanned_pages.append(page_num)
+                    continue
+                
+                # Extract text
+                self.metrics.inc("rag_pdf_pages_total")
+                with self.metrics.timer("rag_pdf_page_extract_seconds"), span("pdf_page", page=page_num + 1):
+                    if layout_mode:
+                        for i, (chunk, layout_metadata) in enumerate(self._layout_chunks(page)):
+                            documents.append_content(chunk, filename, "pdf_text", content_type="text", source="pdf",
+                                                     chunk_index=i, page_number=page_num + 1, id_kind="text",
+                                                     extra=layout_metadata)
+                    else:
+                        # Process text content with chunking, as spans over the page text
+                        if text:
+                            buffer = documents.add_buffer(text)
+                            for i, (start, end) in enumerate(self._chunk_spans(text)):
+                                documents.append(buffer, start, end, filename, "pdf_text", content_type="text",
+                                                 source="pdf", chunk_index=i, page_number=page_num + 1, id_kind="text")
+                
+                # Extract and process images
+                image_list = page.get_images()
+                if image_list:
+                    logger.info("Found %d images on page %d", len(image_list), page_num + 1)
+                
+                for img_index, img in enumerate(image_list):
+                    try:
+                        # Extract image
+                        xref = img[0]
+                        
+                        # Text drawn over the image was already extracted above
+                        if layout_mode and self._has_text_layer(page, xref):
+                            continue
+                        
+                        pix = fitz.Pixmap(doc, xref)
+                        
+                        if pix.n - pix.alpha < 4:  # RGB or Grayscale
+                            img_data = pix.tobytes("png")
+                            
+                            # Process image with OCR
+                            image_text = self.image_processor.extract_text_from_image_bytes(img_data)
+                            
+                            if image_text.strip():
+                                documents.append_content(f"Image content: {image_text}", filename, "pdf_image",
+                                                         content_type="image_ocr", source="pdf",
+                                                         page_number=page_num + 1, id_kind="img",
+                                                         extra={"image_index": img_index})
+                                logger.info("Extracted text from image on page %d", page_num + 1)
+                        
+                        pix = None  # Free pixmap memory
+                        
+                    except Exception as e:
+                        logger.warning(f"Error processing image on page {page_num + 1}: {e}")
+                        continue
+            
+            ocr_seconds = 0.0
+            if scanned_pages:
+                start = time.perf_counter()
+                with span("ocr_scanned_pages", pages=len(scanned_pages)):
+                    self._ocr_pages(doc, scanned_pages, filename, documents)
+                ocr_seconds = time.perf_counter() - start
+                documents = documents.sort_by_page()
+                logger.info(f"OCRed {len(scanned_pages)} scanned pages of {filename} in {ocr_seconds:.1f}s")
+            
+            if stats is not None:
+                stats.update({
+                    "pages": len(doc),
+                    "ocr_pages": len(scanned_pages),
+                    "ocr_seconds": ocr_seconds
+                })
+            
+            doc.close()
+            logger.info("PDF processing completed: %d chunks created from %s", len(documents), filename)
+            
+        except Exception as e:
+            logger.error(f"Error processing PDF {filename}: {e}")
+        
+        return documents
+    
+    def _is_scanned(self, page, text: Optional[str] = None) -> bool:
+        """Whether a page has (almost) no text layer but visible content
+        
+        text is the page's stripped get_text() when the caller has it.
+        """
+        if text is None:
+            text = page.get_text().strip()
+        if len(text) >= self.config.get("ocr.scanned_pages.min_text_chars", 20):
+            return False
+        
+        # get_image_info also covers inline images that get_images misses
+        page_area = abs(page.rect)
+        covered = sum(abs(fitz.Rect(info["bbox"]) & page.rect) for info in page.get_image_info())
+        if page_area and covered / page_area >= self.config.get("ocr.scanned_pages.min_image_coverage", 0.5):
+            return True
+        
+        # Content drawn some other way: look at a tiny rendering
+        if covered == 0 and page.get_contents():
+            pix = page.get_pixmap(dpi=36, colorspace=fitz.csGRAY)
+            preview = np.frombuffer(pix.samples, dtype=np.uint8).reshape(pix.height, pix.width).astype(np.float32)
+            return self.image_processor.preprocessor.has_text(preview)
+        return False
+    
+    def _ocr_pages(self, doc, page_numbers: List[int], filename: str, documents: ChunkBatch):
+        """Render scanned pages and OCR them in parallel into documents"""
+        dpi = self.config.get("ocr.scanned_pages.dpi", 300)
+        workers = self.config.get("ocr.scanned_pages.workers", 4)
+        
+        @in_current_trace
+        def ocr_page(page_num, image):
+            with span("ocr_page", page=page_num + 1):
+                return self.image_processor.extract_text_from_pil_image(image)
+        
+        # The backend's pool outlives this document, so its per-thread
+        # engines are not set up again for every scanned PDF
+        executor = self.image_processor.ocr_backend.executor(workers)
+        pending = []
+        # Rendering stays on this thread (PyMuPDF documents are not
+        # thread-safe); at most 2 * workers rendered pages are held
+        for page_num in page_numbers:
+            pix = doc[page_num].get_pixmap(dpi=dpi, colorspace=fitz.csGRAY)
+            image = Image.frombytes("L", (pix.width, pix.height), pix.samples)
+            image.info["dpi"] = (dpi, dpi)
+            pix = None
+            pending.append((page_num, executor.submit(ocr_page, page_num, image)))
+            if len(pending) >= 2 * workers:
+                self._add_page_ocr(*pending.pop(0), filename, documents)
+        for page_num, future in pending:
+            self._add_page_ocr(page_num, future, filename, documents)
+    
+    def _add_page_ocr(self, page_num: int, future, filename: str, documents: ChunkBatch):
+        """Chunk the OCR text of one page"""
+        text = future.result().strip()
+        if not text:
+            return
+        buffer = documents.add_buffer(text)
+        for i, (start, end) in enumerate(self._chunk_spans(text)):
+            documents.append(buffer, start, end, filename, "pdf_text", content_type="page_ocr", source="pdf",
+                             chunk_index=i, page_number=page_num + 1, id_kind="ocr")
+    
+    def _layout_chunks(self, page) -> List[Tuple[str, Dict[str, Any]]]:
+        """Block-level chunks in reading order, with tables as row-oriented text"""
+        chunk_size = self.config.get("processing.chunk_size", 1000)
+        units = []
+        
+        tables = self._find_tables(page)
+        table_rects = [fitz.Rect(table.bbox) for table in tables]
+        for table_index, table in enumerate(tables):
+            units.extend(self._table_units(table, table_index, chunk_size))
+        
+        # (x0, y0, x1, y1, text, block_no, block_type); type 1 is an image block
+        for x0, y0, x1, y1, text, _, block_type in page.get_text("blocks"):
+            text = text.strip()
+            if block_type != 0 or not text:
+                continue
+            rect = fitz.Rect(x0, y0, x1, y1)
+            center = fitz.Point((x0 + x1) / 2, (y0 + y1) / 2)
+            if any(center in table_rect for table_rect in table_rects):
+                continue
+            units.append({"text": text, "rect": rect, "metadata": None})
+        
+        chunks = []
+        pending_text, pending_rect, pending_blocks = [], None, 0
+        
+        def flush():
+            if pending_text:
+                chunks.append(("\n\n".join(pending_text), {
+                    "bbox": _format_rect(pending_rect),
+                    "block_count": pending_blocks
+                }))
+        
+        for unit in self._reading_order(units, page.rect.width):
+            if unit["metadata"] is not None:
+                flush()
+                pending_text, pending_rect, pending_blocks = [], None, 0
+                chunks.append((unit["text"], unit["metadata"]))
+                continue
+            
+            if len(unit["text"]) > chunk_size:
+                flush()
+                pending_text, pending_rect, pending_blocks = [], None, 0
+                for piece in self._chunk_text(unit["text"]):
+                    chunks.append((piece, {"bbox": _format_rect(unit["rect"]), "block_count": 1}))
+                continue
+            
+            # Merge small consecutive blocks, never splitting one
+            if pending_text and sum(len(t) + 2 for t in pending_text) + len(unit["text"]) > chunk_size:
+                flush()
+                pending_text, pending_rect, pending_blocks = [], None, 0
+            pending_text.append(unit["text"])
+            pending_rect = unit["rect"] if pending_rect is None else pending_rect | unit["rect"]
+            pending_blocks += 1
+        flush()
+        
+        return chunks
+    
+    def _find_tables(self, page) -> List[Any]:
+        """Detect ruled tables, skipping pages without enough vector graphics"""
+        if not self.config.get("processing.pdf_tables", True) or not hasattr(page, "find_tables"):
+            return []
+        # Table detection is the slow part; ruled tables need line drawings
+        drawings = page.get_cdrawings() if hasattr(page, "get_cdrawings") else page.get_drawings()
+        if len(drawings) < 4:
+            return []
+        try:
+            return list(page.find_tables().tables)
+        except Exception as e:
+            logger.warning(f"Table detection failed on page {page.number + 1}: {e}")
+            return []
+    
+    def _table_units(self, table, table_index: int, chunk_size: int) -> List[Dict[str, Any]]:
+        """Render a table as compact row text, split into chunk-sized row groups"""
+        rows = table.extract()
+        if not rows:
+            return []
+        
+        def clean(cell):
+            return " ".join(str(cell).split()) if cell is not None else ""
+        
+        header = [clean(cell) for cell in rows[0]]
+        has_header = len(rows) > 1 and all(header)
+        body = list(enumerate(rows))[1:] if has_header else list(enumerate(rows))
+        
+        lines = []
+        for row_index, row in body:
+            cells = [clean(cell) for cell in row]
+            if has_header:
+                line = "; ".join(f"{h}: {c}" for h, c in zip(header, cells) if c)
+            else:
+                line = " | ".join(cells)
+            if line:
+                lines.append((row_index, line))
+        
+        units = []
+        rect = fitz.Rect(table.bbox)
+        group = []
+        for row_index, line in lines + [(None, None)]:
+            if line is not None and (not group or sum(len(l) + 1 for _, l in group) + len(line) <= chunk_size):
+                group.append((row_index, line))
+                continue
+            if group:
+                row_numbers = [i for i, _ in group]
+                cells = [
+                    [[round(v, 1) for v in cell] if cell else None for cell in table.rows[i].cells]
+                    for i in row_numbers
+                ]
+                units.append({
+                    "text": "\n".join(l for _, l in group),
+                    "rect": rect,
+                    "metadata": {
+                        "content_type": "table",
+                        "table_index": table_index,
+                        "table_bbox": _format_rect(rect),
+                        "row_range": f"{row_numbers[0]}-{row_numbers[-1]}",
+                        "cells": json.dumps(cells)
+                    }
+                })
+            group = [(row_index, line)] if line is not None else []
+        return units
+    
+    def _reading_order(self, units: List[Dict[str, Any]], page_width: float) -> List[Dict[str, Any]]:
+        """Order blocks column by column within bands split by full-width blocks"""
+        middle = page_width / 2
+        ordered = []
+        left, right = [], []
+        
+        def flush_band():
+            ordered.extend(sorted(left, key=lambda u: u["rect"].y0))
+            ordered.extend(sorted(right, key=lambda u: u["rect"].y0))
+            left.clear()
+            right.clear()
+        
+        for unit in sorted(units, key=lambda u: (u["rect"].y0, u["rect"].x0)):
+            rect = unit["rect"]
+            if rect.x1 <= middle:
+                left.append(unit)
+            elif rect.x0 >= middle:
+                right.append(unit)
+            else:
+                # Spans both columns: ends the current band
+                flush_band()
+                ordered.append(unit)
+        flush_band()
+        
+        return ordered
+    
+    def _has_text_layer(self, page, xref: int, min_words: int = 3) -> bool:
+        """Whether the image area already carries extractable text"""
+        try:
+            rects = page.get_image_rects(xref)
+        except Exception:
+            return False
+        return any(len(page.get_text("words", clip=rect)) >= min_words for rect in rects)
+    
+    def extract_images(self, file_path: str, filename: str) -> List[Dict[str, Any]]:
+        """Extract embedded images as encoded bytes for image embedding"""
+        records = []
+        seen = set()
+        
+        try:
+            doc = fitz.open(file_path)
+            for page_num in range(len(doc)):
+                for img_index, img in enumerate(doc[page_num].get_images()):
+                    xref = img[0]
+                    # Logos and backgrounds repeat on every page
+                    if xref in seen:
+                        continue
+                    seen.add(xref)
+                    
+                    extracted = doc.extract_image(xref)
+                    if not extracted:
+                        continue
+                    records.append({
+                        "image": extracted["image"],
+                        "metadata": {
+                            "filename": filename,
+                            "file_type": "pdf_image",
+                            "page_number": page_num + 1,
+                            "image_index": img_index,
+                            "source": "pdf"
+                        }
+                    })
+            doc.close()
+        except Exception as e:
+            logger.error(f"Error extracting images from PDF {filename}: {e}")
+        
+        return records
+    
+    def _chunk_text(self, text: str) -> List[str]:
+        """Split text into chunks"""
+        return [text[start:end] for start, end in self._chunk_spans(text)]
+    
+    def _chunk_spans(self, text: str) -> List[Tuple[int, int]]:
+        """(start, end) offsets of overlapping chunks, whitespace trimmed"""
+        chunk_size = self.config.get("processing.chunk_size", 1000)
+        overlap = self.config.get("processing.chunk_overlap", 200)
+        
+        if len(text) <= chunk_size:
+            return [(0, len(text))]
+        
+        chunks = []
+        start = 0
+        
+        while start < len(text):
+            end = start + chunk_size
+            if end > len(text):
+                end = len(text)
+            
+            # Try to break at paragraph or sentence boundary
+            if end < len(text):
+                # Look for paragraph breaks first
+                for break_pos in range(end, start + chunk_size // 2, -1):
+                    if text[break_pos:break_pos+2] == '\n\n':
+                        end = break_pos + 2
+                        break
+                    elif text[break_pos] in ['.', '!', '?'] and break_pos + 1 < len(text) and text[break_pos+1] in [' ', '\n']:
+                        end = break_pos + 1
+                        break
+            
+            span = trim_span(text, start, end)
+            if span is not None:
+                chunks.append(span)
+            
+            if end == len(text):
+                break
+                
+            start = end - overlap
+            if start < 0:
+                start = 0
+        
+        return chunks
+
+
+
+def _format_rect(rect) -> str:
+    """Bounding box as a metadata-friendly string"""
+    return ",".join(f"{v:.1f}" for v in (rect.x0, rect.y0, rect.x1, rect.y1))
\ No newline at end of file
@@ -0,0 +1,195 @@
+"""
+Staged producer/consumer pipeline with bounded queues
+"""
+
+import queue
+import threading
+import time
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+from src.utils.logger import setup_logger
+from src.utils.tracing import in_current_trace
+
+logger = setup_logger(__name__)
+
+# Marks the end of the input on a stage queue
+_DONE = object()
+
+
+class StageMetrics:
+    """Counters for one pipeline stage"""
+
+    def __init__(self, name: str, workers: int):
+        self.name = name
+        self.workers = workers
+        self.processed = 0
+        self.failed = 0
+        self.busy_seconds = 0.0
+        self.idle_seconds = 0.0
+        self.blocked_seconds = 0.0
+        self.depth_total = 0
+        self.depth_samples = 0
+        self.depth_max = 0
+        self._lock = threading.Lock()
+
+    def record(self, busy: float, idle: float, blocked: float, depth: int, ok: bool):
+        with self._lock:
+            if ok:
+                self.processed += 1
+            else:
+                self.failed += 1
+            self.busy_seconds += busy
+            self.idle_seconds += idle
+            self.blocked_seconds += blocked
+            self.depth_total += depth
+            self.depth_samples += 1
+            self.depth_max = max(self.depth_max, depth)
+
+    def snapshot(self, elapsed: float) -> Dict[str, Any]:
+        """Throughput, utilization and queue figures over elapsed seconds"""
+        capacity = elapsed * self.workers
+        return {
+            "workers": self.workers,
+            "processed": self.processed,
+            "failed": self.failed,
+            "items_per_s": self.processed / elapsed if elapsed else 0.0,
+            "utilization": self.busy_seconds / capacity if capacity else 0.0,
+            "busy_seconds": self.busy_seconds,
+            "idle_seconds": self.idle_seconds,
+            "blocked_seconds": self.blocked_seconds,
+            "queue_depth_mean": self.depth_total / self.depth_samples if self.depth_samples else 0.0,
+            "queue_depth_max": self.depth_max
+        }
+
+
+class Stage:
+    """A named step run by a fixed number of worker threads.
+
+    fn takes an item and returns the item for the next stage, or None to
+    drop it. Exceptions are passed to the pipeline's error handler and the
+    item is dropped.
+    """
+
+    def __init__(self, name: str, fn: Callable[[Any], Any], workers: int = 1):
+        self.name = name
+        self.fn = fn
+        self.workers = max(1, workers)
+
+
+class Pipeline:
+    """Runs items through stages connected by bounded queues.
+
+    Each stage's input queue holds at most queue_size items, so a slow
+    stage blocks the ones before it instead of letting work pile up in
+    memory. Per-stage metrics show where time goes: utilization near 1
+    marks the bottleneck, blocked time marks stages waiting on it.
+    """
+
+    def __init__(self, stages: List[Stage], queue_size: int = 8,
+                 on_error: Optional[Callable[[Any, str, Exception], None]] = None):
+        self.stages = stages
+        self.queue_size = queue_size
+        self.on_error = on_error
+        self.metrics = {stage.name: StageMetrics(stage.name, stage.workers) for stage in stages}
+        self.elapsed = 0.0
+
+    def run(self, items: Iterable[Any], sink: Optional[Callable[[Any], None]] = None) -> List[Any]:
+        """Process every item and return the outputs of the last stage
+
+        With a sink, each output of the last stage is passed to it (one
+        call at a time) as soon as it is ready and nothing is kept, so a
+        long run holds no more than the queued items in memory; the
+        returned list is then empty.
+        """
+        queues = [queue.Queue(maxsize=self.queue_size) for _ in self.stages]
+        outputs: List[Any] = []
+        outputs_lock = threading.Lock()
+        remaining = [stage.workers for stage in self.stages]
+        remaining_lock = threading.Lock()
+        start = time.perf_counter()
+
+        def finish_worker(index: int):
+            # The last worker of a stage ends the next stage's input
+            with remaining_lock:
+                remaining[index] -= 1
+                last = remaining[index] == 0
+            if last and index + 1 < len(self.stages):
+                for _ in range(self.stages[index + 1].workers):
+                    queues[index + 1].put(_DONE)
+
+        def work(index: int):
+            stage = self.stages[index]
+            metrics = self.metrics[stage.name]
+            inbox = queues[index]
+            outbox = queues[index + 1] if index + 1 < len(self.stages) else None
+            try:
+                while True:
+                    waited = time.perf_counter()
+                    item = inbox.get()
+                    if item is _DONE:
+                        return
+                    depth = inbox.qsize()
+                    started = time.perf_counter()
+                    idle = started - waited
+
+                    ok = True
+                    try:
+                        result = stage.fn(item)
+                    except Exception as e:
+                        ok = False
+                        result = None
+                        self._report(item, stage.name, e)
+                    finished = time.perf_counter()
+
+                    if result is not None:
+                        if outbox is not None:
+                            outbox.put(result)
+                        elif sink is not None:
+                            # A failing sink must not stop this worker, or
+                            # the stages before it block on a full queue
+                            try:
+                                with outputs_lock:
+                                    sink(result)
+                            except Exception as e:
+                                logger.error(f"Pipeline sink failed: {e}")
+                        else:
+                            with outputs_lock:
+                                outputs.append(result)
+                    metrics.record(finished - started, idle, time.perf_counter() - finished, depth, ok)
+            finally:
+                finish_worker(index)
+
+        threads = []
+        for index, stage in enumerate(self.stages):
+            for i in range(stage.workers):
+                thread = threading.Thread(target=in_current_trace(work), args=(index,), name=f"{stage.name}-{i}", daemon=True)
+                thread.start()
+                threads.append(thread)
+
+        try:
+            for item in items:
+                queues[0].put(item)
+        finally:
+            for _ in range(self.stages[0].workers):
+                queues[0].put(_DONE)
+            for thread in threads:
+                thread.join()
+            self.elapsed = time.perf_counter() - start
+
+        return outputs
+
+    def _report(self, item: Any, stage: str, error: Exception):
+        """Pass a stage failure to the error handler, which must not raise"""
+        if self.on_error is None:
+            logger.error(f"Stage {stage} failed: {error}")
+            return
+        try:
+            self.on_error(item, stage, error)
+        except Exception as e:
+            logger.error(f"Error handler failed for stage {stage}: {e} (stage error: {error})")
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Per-stage metrics of the last run and the likely bottleneck"""
+        stages = {name: metrics.snapshot(self.elapsed) for name, metrics in self.metrics.items()}
+        bottleneck = max(stages, key=lambda name: stages[name]["utilization"]) if stages else None
+        return {"elapsed_seconds": self.elapsed, "bottleneck": bottleneck, "stages": stages}
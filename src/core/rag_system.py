@@ -1,118 +1,365 @@
-"""
-Main RAG System Orchestrator
-"""
-
-import os
-from pathlib import Path
-from typing import List, Dict, Any, Optional
-import glob
-
-from src.core.document_processor import DocumentProcessor
-from src.core.vector_store import VectorStore
-from src.core.retrieval_engine import RetrievalEngine
-from src.utils.config import Config
-from src.utils.logger import setup_logger
-
-logger = setup_logger(__name__)
-
-class MultimodalRAG:
-    """Main Multimodal RAG System"""
-    
-    def __init__(self, config_path: Optional[str] = None):
-        self.config = Config(config_path)
-        self.document_processor = DocumentProcessor(self.config)
-        self.vector_store = VectorStore(self.config)
-        self.retrieval_engine = RetrievalEngine(self.vector_store, self.config)
-        
-        logger.info("Multimodal RAG system initialized")
-    
-    def process_file(self, file_path: str) -> Dict[str, Any]:
-        """Process a single file"""
-        try:
-            logger.info(f"Processing file: {file_path}")
-            
-            # Process document
-            documents = self.document_processor.process_document(file_path)
-            
-            # Add to vector store
-            if documents:
-                self.vector_store.add_documents(documents)
-                logger.info(f"Added {len(documents)} chunks from {file_path}")
-                
-                return {
-                    "success": True,
-                    "file_path": file_path,
-                    "chunks_created": len(documents),
-                    "file_type": self._get_file_type(file_path)
-                }
-            else:
-                return {
-                    "success": False,
-                    "file_path": file_path,
-                    "error": "No content extracted"
-                }
-                
-        except Exception as e:
-            logger.error(f"Error processing file {file_path}: {e}")
-            return {
-                "success": False,
-                "file_path": file_path,
-                "error": str(e)
-            }
-    
-    def process_folder(self, folder_path: str) -> Dict[str, Any]:
-        """Process all supported files in a folder"""
-        results = {
-            "text": {"files_processed": 0, "chunks_created": 0},
-            "image": {"files_processed": 0, "chunks_created": 0},
-            "pdf": {"files_processed": 0, "chunks_created": 0},
-            "total_files": 0,
-            "total_chunks": 0
-        }
-        
-        # Find all supported files
-        supported_extensions = self.config.get("processing.supported_extensions", [".txt", ".pdf", ".png", ".jpg", ".jpeg"])
-        
-        for ext in supported_extensions:
-            pattern = os.path.join(folder_path, f"**/*{ext}")
-            files = glob.glob(pattern, recursive=True)
-            
-            for file_path in files:
-                result = self.process_file(file_path)
-                
-                if result["success"]:
-                    file_type = result["file_type"]
-                    if file_type in results:
-                        results[file_type]["files_processed"] += 1
-                        results[file_type]["chunks_created"] += result["chunks_created"]
-                    results["total_files"] += 1
-                    results["total_chunks"] += result["chunks_created"]
-        
-        return results
-    
-    def search(self, query: str, top_k: int = None, threshold: float = None) -> List[Dict[str, Any]]:
-        """Search for relevant documents"""
-        return self.retrieval_engine.search(query, top_k, threshold)
-    
-    def get_stats(self) -> Dict[str, Any]:
-        """Get system statistics"""
-        stats = self.vector_store.get_collection_stats()
-        
-        return {
-            "total_documents": stats,
-            "document_types": ["text", "image", "pdf"],
-            "collection_name": self.config.get("vector_db.collection_name"),
-            "embedding_model": self.config.get("embedding.model")
-        }
-    
-    def _get_file_type(self, file_path: str) -> str:
-        """Determine file type from extension"""
-        ext = Path(file_path).suffix.lower()
-        if ext == '.pdf':
-            return 'pdf'
-        elif ext in ['.png', '.jpg', '.jpeg']:
-            return 'image'
-        elif ext == '.txt':
-            return 'text'
-        else:
+"""
+Main RAG System Orchestrator
+"""
+
+import os
+import threading
+import time
+from pathlib import Path
+from typing import List, Dict, Any, Optional
+
+from src.core.document_processor import DocumentProcessor
+from src.core.job_queue import IngestionQueue
+from src.core.pipeline import Pipeline, Stage
+from src.core.tenancy import TenantRegistry
+from src.core.watcher import FolderWatcher
+from src.utils.config import Config
+from src.utils.file_handlers import FileScanner
+from src.utils.logger import setup_logger
+from src.utils.metrics import get_metrics
+from src.utils.tracing import Tracer, span
+
+logger = setup_logger(__name__)
+
+class MultimodalRAG:
+    """Main Multimodal RAG System"""
+    
+    def __init__(self, config_path: Optional[str] = None):
+        self.config = Config(config_path)
+        self.document_processor = DocumentProcessor(self.config)
+        
+        # The configured collection is the default tenant
+        self.tenants = TenantRegistry(self.config)
+        default_tenant = self.tenants.get()
+        self.vector_store = default_tenant.vector_store
+        self.retrieval_engine = default_tenant.retrieval_engine
+        
+        # Durable per-file state for folder imports
+        self.jobs = None
+        if self.config.get("ingestion.queue_enabled", True):
+            self.jobs = IngestionQueue(self.config)
+        # Serializes store mutations across pipeline stages and the watcher
+        self._store_lock = threading.Lock()
+        self.ingestion_stats = None
+        self.metrics = get_metrics(self.config)
+        self.tracer = Tracer(self.config)
+        
+        logger.info("Multimodal RAG system initialized")
+    
+    def process_file(self, file_path: str, tenant: Optional[str] = None,
+                     job: Optional[Dict[str, Any]] = None, trace: bool = False) -> Dict[str, Any]:
+        """Process a single file into the given tenant's collection
+        
+        Runs the ingestion stages inline. With a queue job, the job is
+        advanced to the embedding state before anything is written, and
+        chunks left by an earlier interrupted or outdated run of the same
+        job are removed first. With trace, the result carries a "trace"
+        dict of timed spans (see Tracer).
+        """
+        item = self._new_item(file_path, tenant, job)
+        with self.tracer.trace("process_file", force=trace, file_path=file_path) as recorded:
+            try:
+                for stage in (self._extract, self._prepare, self._embed):
+                    with span(stage.__name__.lstrip("_")):
+                        item = stage(item)
+                with span("write"):
+                    result = self._write(item)
+            except Exception as e:
+                result = self._failed(item, e)
+        if trace and recorded is not None:
+            result["trace"] = recorded.to_dict()
+        return result
+    
+    def _new_item(self, file_path: str, tenant: Optional[str], job: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """Per-file state passed between ingestion stages"""
+        return {"file_path": file_path, "tenant": tenant, "job": job}
+    
+    def _extract(self, item: Dict[str, Any]) -> Dict[str, Any]:
+        """Stage 1: parse, OCR and chunk the file"""
+        file_path = item["file_path"]
+        handle = self.tenants.get(item["tenant"])
+        logger.info("Processing file: %s", file_path)
+        
+        # Process document
+        item["extraction"] = {}
+        item["documents"] = self.document_processor.process_document_batch(file_path, item["extraction"])
+        
+        # Embed images visually, including ones without any text
+        item["images"] = []
+        if handle.vector_store.image_index is not None:
+            item["images"] = self.document_processor.extract_images(file_path)
+        
+        if not item["documents"] and not item["images"]:
+            raise ValueError("No content extracted")
+        return item
+    
+    def _prepare(self, item: Dict[str, Any]) -> Dict[str, Any]:
+        """Stage 2: replace earlier chunks of the file and drop near-duplicates"""
+        handle = self.tenants.get(item["tenant"])
+        job = item["job"]
+        with self._store_lock:
+            if job is not None:
+                if job["written"]:
+                    handle.vector_store.delete_file(item["file_path"])
+                self.jobs.start_embedding(job)
+            item["unique"] = handle.vector_store.prepare_documents(item["documents"])
+        return item
+    
+    def _embed(self, item: Dict[str, Any]) -> Dict[str, Any]:
+        """Stage 3: encode the chunks that are left"""
+        item["embeddings"] = None
+        if item["unique"]:
+            item["embeddings"] = self.tenants.get(item["tenant"]).vector_store.embed_documents(item["unique"])
+        return item
+    
+    def _write(self, item: Dict[str, Any]) -> Dict[str, Any]:
+        """Stage 4: store chunks and image vectors, complete the job and
+        return the file's result
+        
+        Only the small result leaves this stage; the chunks, embeddings and
+        images of the item are released with it.
+        """
+        file_path = item["file_path"]
+        handle = self.tenants.get(item["tenant"])
+        with self._store_lock:
+            images_embedded = handle.vector_store.image_index.add_images(item["images"]) if item["images"] else 0
+            stored = handle.vector_store.write_documents(item["unique"], item["embeddings"]) if item["unique"] else 0
+        handle.invalidate()
+        logger.info("Added %d chunks and %d images from %s", stored, images_embedded, file_path)
+        
+        result = {
+            "success": True,
+            "file_path": file_path,
+            "chunks_created": len(item["documents"]),
+            "duplicates_skipped": len(item["documents"]) - stored,
+            "images_embedded": images_embedded,
+            "extraction": item["extraction"],
+            "file_type": self._get_file_type(file_path)
+        }
+        if item["job"] is not None:
+            self.jobs.complete(item["job"], len(item["documents"]))
+        return result
+    
+    def _failed(self, item: Dict[str, Any], error: Exception) -> Dict[str, Any]:
+        """Result for a file that could not be ingested; queue jobs are retried"""
+        logger.error(f"Error processing file {item['file_path']}: {error}")
+        # Chunks that never reached the store must not shadow a retry
+        if item.get("unique"):
+            with self._store_lock:
+                self.tenants.get(item["tenant"]).vector_store.forget_chunks(item["unique"].ids)
+        job = item["job"]
+        if job is not None:
+            state = self.jobs.fail(job, str(error))
+            logger.warning(f"Job for {job['file_path']} {'failed' if state == 'failed' else 'will be retried'}")
+        return {
+            "success": False,
+            "file_path": item["file_path"],
+            "error": str(error)
+        }
+    
+    def remove_file(self, file_path: str, tenant: Optional[str] = None) -> int:
+        """Remove a file's chunks from the given tenant's collection"""
+        handle = self.tenants.get(tenant)
+        with self._store_lock:
+            deleted = handle.vector_store.delete_file(file_path)
+        if self.jobs is not None:
+            self.jobs.remove(file_path, tenant)
+        handle.invalidate()
+        return deleted
+    
+    def export_index(self, folder: str, tenant: Optional[str] = None, layout: Optional[str] = None) -> Dict[str, Any]:
+        """Stream the tenant's chunks and embeddings to columnar files for analysis"""
+        return self.tenants.get(tenant).vector_store.export_columnar(folder, layout=layout)
+    
+    def import_index(self, folder: str, tenant: Optional[str] = None) -> int:
+        """Load an export_index folder into the tenant's empty collection, reusing its embeddings"""
+        handle = self.tenants.get(tenant)
+        with self._store_lock:
+            imported = handle.vector_store.import_columnar(folder)
+        handle.invalidate()
+        return imported
+    
+    def watch(self, folder_path: Optional[str] = None, tenant: Optional[str] = None) -> FolderWatcher:
+        """Watcher keeping the tenant's collection in sync with a folder; call run() on it"""
+        return FolderWatcher(self, folder_path, tenant)
+    
+    def process_folder(self, folder_path: str, tenant: Optional[str] = None) -> Dict[str, Any]:
+        """Process all supported files in a folder
+        
+        With the ingestion queue enabled the files are queued and then
+        processed from the queue, so a rerun after a crash resumes where the
+        previous run stopped and skips files that are unchanged since they
+        were ingested. Files are queued as the folder is scanned and workers
+        start on them right away.
+        """
+        # Find all supported files in one pass
+        scanner = FileScanner(self.config)
+        files = scanner.scan(folder_path)
+        
+        if self.jobs is not None:
+            scanned = threading.Event()
+            
+            def feed():
+                try:
+                    self.jobs.enqueue(files, tenant)
+                finally:
+                    scanned.set()
+            
+            feeder = threading.Thread(target=feed, name="scan", daemon=True)
+            feeder.start()
+            results = self.run_jobs(until=scanned)
+            feeder.join()
+        else:
+            results = self._run_pipeline(self._new_item(file_path, tenant) for file_path in files)
+        
+        results["scan"] = scanner.stats
+        return results
+    
+    def run_jobs(self, workers: Optional[int] = None, throttle: Optional[float] = None,
+                 until: Optional[threading.Event] = None, paths: Optional[List[str]] = None,
+                 tenant: Optional[str] = None) -> Dict[str, Any]:
+        """Process queued files until the queue is drained
+        
+        workers overrides the number of extraction workers; throttle pauses
+        between files so ingestion can run in the background without
+        starving searches. With until, an empty queue only ends the run once
+        the event is set, i.e. once nothing more is being queued. With paths,
+        only the tenant's jobs for those files are run.
+        """
+        if self.jobs is None:
+            raise RuntimeError("Ingestion queue is disabled (ingestion.queue_enabled)")
+        if throttle is None:
+            throttle = self.config.get("ingestion.throttle_seconds", 0.0)
+        
+        self.jobs.recover()
+        
+        def claimed():
+            name = f"{os.getpid()}-ingest"
+            while True:
+                job = self.jobs.claim(name, paths, tenant)
+                if job is None:
+                    if until is not None and not until.wait(0.05):
+                        continue
+                    job = self.jobs.claim(name, paths, tenant)
+                    if job is None:
+                        return
+                yield self._new_item(job["file_path"], job["tenant"], job)
+                if throttle:
+                    time.sleep(throttle)
+        
+        results = self._run_pipeline(claimed(), workers)
+        results["jobs"] = self.jobs.counts()
+        return results
+    
+    def _run_pipeline(self, items, extract_workers: Optional[int] = None) -> Dict[str, Any]:
+        """Run files through the staged ingestion pipeline and summarize them
+        
+        Dedup and writes stay on one thread each: they own the dedup index
+        and the running-mean summary updates.
+        """
+        if extract_workers is None:
+            extract_workers = self.config.get("ingestion.stages.extract_workers", 2)
+        failures = []
+        
+        def on_error(item, stage, error):
+            failures.append(self._failed(item, error))
+        
+        pipeline = Pipeline([
+            Stage("extract", self._extract, extract_workers),
+            Stage("dedup", self._prepare, 1),
+            Stage("embed", self._embed, self.config.get("ingestion.stages.embed_workers", 1)),
+            Stage("write", self._write, 1)
+        ], queue_size=self.config.get("ingestion.stages.queue_size", 4), on_error=on_error)
+        
+        results = self._new_results()
+        pipeline.run(items, sink=lambda result: self._accumulate(results, result))
+        
+        self.ingestion_stats = pipeline.get_stats()
+        results["stages"] = self.ingestion_stats
+        for name, stage in self.ingestion_stats["stages"].items():
+            logger.info(f"Stage {name}: {stage['processed']} files, {stage['items_per_s']:.2f}/s, "
+                        f"utilization {stage['utilization']:.0%}, blocked {stage['blocked_seconds']:.1f}s, "
+                        f"queue depth max {stage['queue_depth_max']}")
+        if failures:
+            logger.warning(f"{len(failures)} files failed")
+        return self._finish_results(results)
+    
+    def _new_results(self) -> Dict[str, Any]:
+        """Empty folder processing summary"""
+        return {
+            "text": {"files_processed": 0, "chunks_created": 0},
+            "image": {"files_processed": 0, "chunks_created": 0},
+            "pdf": {"files_processed": 0, "chunks_created": 0},
+            "total_files": 0,
+            "total_chunks": 0,
+            "dedup": {"duplicates": 0, "ratio": 0.0},
+            "ocr": {"pages": 0, "seconds": 0.0}
+        }
+    
+    def _accumulate(self, results: Dict[str, Any], result: Dict[str, Any]):
+        """Add one process_file result to a folder summary"""
+        if result["success"]:
+            file_type = result["file_type"]
+            if file_type in results:
+                results[file_type]["files_processed"] += 1
+                results[file_type]["chunks_created"] += result["chunks_created"]
+            results["total_files"] += 1
+            results["total_chunks"] += result["chunks_created"]
+            results["dedup"]["duplicates"] += result["duplicates_skipped"]
+            results["ocr"]["pages"] += result["extraction"].get("ocr_pages", 0)
+            results["ocr"]["seconds"] += result["extraction"].get("ocr_seconds", 0.0)
+    
+    def _finish_results(self, results: Dict[str, Any]) -> Dict[str, Any]:
+        """Fill in derived figures of a folder summary"""
+        if results["total_chunks"]:
+            results["dedup"]["ratio"] = results["dedup"]["duplicates"] / results["total_chunks"]
+        
+        return results
+    
+    def search(self, query: str, top_k: int = None, threshold: float = None,
+               expand_context: int = None, tenant: Optional[str] = None, trace: bool = False):
+        """Search for relevant documents
+        
+        expand_context attaches the merged text of the hit and its
+        neighbouring chunks (chunk_index +/- expand_context) as "context".
+        tenant selects the collection; None searches the configured one.
+        With trace, returns (results, Trace) instead of the results alone;
+        Trace.to_chrome() gives the Chrome trace format.
+        """
+        with self.tracer.trace("search", force=trace, query=query, tenant=tenant) as recorded:
+            results = self.tenants.get(tenant).search(query, top_k, threshold, expand_context)
+        if trace:
+            return results, recorded
+        return results
+    
+    def get_stats(self, tenant: Optional[str] = None) -> Dict[str, Any]:
+        """Get system statistics"""
+        tenant_stats = self.tenants.get(tenant).get_stats()
+        
+        return {
+            "total_documents": tenant_stats["total_documents"],
+            "document_types": ["text", "image", "pdf"],
+            "collection_name": tenant_stats["collection_name"],
+            "embedding_model": self.config.get("embedding.model"),
+            "query_cache": tenant_stats["query_cache"],
+            "embedding_cache": tenant_stats["embedding_cache"],
+            "open_tenants": [name or "default" for name in self.tenants.names()],
+            "ingestion": self.ingestion_stats,
+            "metrics": self.metrics.snapshot()
+        }
+    
+    def export_metrics(self) -> str:
+        """Process-wide metrics in Prometheus text format, empty when disabled"""
+        return self.metrics.to_prometheus()
+    
+    def _get_file_type(self, file_path: str) -> str:
+        """Determine file type from extension"""
+        ext = Path(file_path).suffix.lower()
+        if ext == '.pdf':
+            return 'pdf'
+        elif ext in ['.png', '.jpg', '.jpeg']:
+            return 'image'
+        elif ext == '.txt':
+            return 'text'
+        else:
             return 'unknown'
\ No newline at end of file
@@ -1,81 +1,142 @@
-"""
-Retrieval Engine for handling different query types
-"""
-
-from typing import List, Dict, Any, Optional
-from src.utils.logger import setup_logger
-
-logger = setup_logger(__name__)
-
-class RetrievalEngine:
-    """Handles different query types and retrieval strategies"""
-    
-    def __init__(self, vector_store, config):
-        self.vector_store = vector_store
-        self.config = config
-    
-    def search(self, query: str, top_k: Optional[int] = None, threshold: Optional[float] = None) -> List[Dict[str, Any]]:
-        """Main search method with query analysis"""
-        if top_k is None:
-            top_k = self.config.get("retrieval.default_top_k", 5)
-        if threshold is None:
-            threshold = self.config.get("retrieval.similarity_threshold", 0.5)
-        
-        # Analyze query type
-        query_type = self._analyze_query_type(query)
-        logger.info(f"Query type: {query_type} - '{query}'")
-        
-        # Perform search
-        results = self.vector_store.search(query, top_k, threshold)
-        
-        # Apply query-type specific filtering if needed
-        if query_type == "factual":
-            results = self._filter_factual_results(results)
-        elif query_type == "exploratory":
-            results = self._boost_exploratory_results(results)
-        elif query_type == "cross_modal":
-            results = self._boost_cross_modal_results(results)
-        
-        return results
-    
-    def _analyze_query_type(self, query: str) -> str:
-        """Analyze query to determine type"""
-        query_lower = query.lower()
-        
-        # Factual queries (specific questions)
-        factual_indicators = ["what is", "who is", "when did", "where is", "how many", "how much", "which"]
-        if any(indicator in query_lower for indicator in factual_indicators):
-            return "factual"
-        
-        # Exploratory queries (vague, broad)
-        exploratory_indicators = ["find", "show me", "tell me about", "explain", "summary", "information about"]
-        if any(indicator in query_lower for indicator in exploratory_indicators):
-            return "exploratory"
-        
-        # Cross-modal queries (mentioning visual elements)
-        cross_modal_indicators = ["chart", "graph", "image", "picture", "diagram", "photo", "visual", "figure"]
-        if any(indicator in query_lower for indicator in cross_modal_indicators):
-            return "cross_modal"
-        
-        return "general"
-    
-    def _filter_factual_results(self, results: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
-        """Filter results for factual queries - prefer text content"""
-        # Boost text documents for factual queries
-        text_results = [r for r in results if r.get('document_type') in ['text', 'pdf_text']]
-        other_results = [r for r in results if r not in text_results]
-        
-        return text_results + other_results
-    
-    def _boost_exploratory_results(self, results: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
-        """Boost diverse content types for exploratory queries"""
-        # For exploratory queries, maintain diversity
-        return results
-    
-    def _boost_cross_modal_results(self, results: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
-        """Boost image-related content for cross-modal queries"""
-        # Boost image-related content
-        image_results = [r for r in results if r.get('document_type') in ['image', 'pdf_image']]
-        other_results = [r for r in results if r not in image_results]
-        
-        return image_results + other_results
\ No newline at end of file
+"""
+Retrieval Engine for handling different query types
+"""
+
+from typing import List, Dict, Any, Optional
+from src.core.vector_store import chunk_group
+from src.utils.logger import setup_logger
+from src.utils.metrics import get_metrics
+from src.utils.tracing import span
+
+logger = setup_logger(__name__)
+
+class RetrievalEngine:
+    """Handles different query types and retrieval strategies"""
+    
+    def __init__(self, vector_store, config):
+        self.vector_store = vector_store
+        self.config = config
+        self.metrics = get_metrics(config)
+    
+    def search(self, query: str, top_k: Optional[int] = None, threshold: Optional[float] = None,
+               expand_context: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Main search method with query analysis"""
+        if top_k is None:
+            top_k = self.config.get("retrieval.default_top_k", 5)
+        if threshold is None:
+            threshold = self.config.get("retrieval.similarity_threshold", 0.5)
+        if expand_context is None:
+            expand_context = self.config.get("retrieval.expand_context", 0)
+        
+        # Analyze query type
+        query_type = self._analyze_query_type(query)
+        logger.info("Query type: %s - '%s'", query_type, query)
+        
+        # Perform search
+        with span("vector_search", top_k=top_k, query_type=query_type):
+            results = self.vector_store.search(query, top_k, threshold)
+        
+        with self.metrics.timer("rag_search_postprocess_seconds"), span("postprocess", results=len(results)):
+            # Apply query-type specific filtering if needed
+            if query_type == "factual":
+                results = self._filter_factual_results(results)
+            elif query_type == "exploratory":
+                results = self._boost_exploratory_results(results)
+            elif query_type == "cross_modal":
+                results = self._boost_cross_modal_results(self._add_image_results(query, results, top_k))
+            
+            if expand_context > 0 and results:
+                with span("expand_context", window=expand_context):
+                    results = self._expand_context(results, expand_context)
+        
+        return results
+    
+    def _expand_context(self, results: List[Dict[str, Any]], window: int) -> List[Dict[str, Any]]:
+        """Attach neighbouring chunks (chunk_index +/- window) to each hit"""
+        neighbors = self.vector_store.get_neighbors(results, window)
+        
+        for result in results:
+            key = chunk_group(result["metadata"])
+            chunks = neighbors.get(key)
+            if not chunks:
+                result["context"] = result["content"]
+                continue
+            
+            index = result["metadata"]["chunk_index"]
+            indexes = [i for i in range(index - window, index + window + 1) if i in chunks]
+            context = chunks[indexes[0]]
+            for previous, i in zip(indexes, indexes[1:]):
+                if i == previous + 1:
+                    context = merge_overlap(context, chunks[i])
+                else:
+                    context = context + "\n...\n" + chunks[i]
+            
+            result["context"] = context
+            result["context_chunks"] = indexes
+        
+        return results
+    
+    def _analyze_query_type(self, query: str) -> str:
+        """Analyze query to determine type"""
+        query_lower = query.lower()
+        
+        # Factual queries (specific questions)
+        factual_indicators = ["what is", "who is", "when did", "where is", "how many", "how much", "which"]
+        if any(indicator in query_lower for indicator in factual_indicators):
+            return "factual"
+        
+        # Exploratory queries (vague, broad)
+        exploratory_indicators = ["find", "show me", "tell me about", "explain", "summary", "information about"]
+        if any(indicator in query_lower for indicator in exploratory_indicators):
+            return "exploratory"
+        
+        # Cross-modal queries (mentioning visual elements)
+        cross_modal_indicators = ["chart", "graph", "image", "picture", "diagram", "photo", "visual", "figure"]
+        if any(indicator in query_lower for indicator in cross_modal_indicators):
+            return "cross_modal"
+        
+        return "general"
+    
+    def _filter_factual_results(self, results: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Filter results for factual queries - prefer text content"""
+        # Boost text documents for factual queries
+        text_results = [r for r in results if r.get('document_type') in ['text', 'pdf_text']]
+        other_results = [r for r in results if r not in text_results]
+        
+        return text_results + other_results
+    
+    def _boost_exploratory_results(self, results: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Boost diverse content types for exploratory queries"""
+        # For exploratory queries, maintain diversity
+        return results
+    
+    def _add_image_results(self, query: str, results: List[Dict[str, Any]], top_k: int) -> List[Dict[str, Any]]:
+        """Search image vectors with the text query and merge the hits"""
+        image_index = getattr(self.vector_store, "image_index", None)
+        if image_index is None:
+            return results
+        
+        image_results = image_index.search(query, top_k)
+        # CLIP and text similarities are not on the same scale, so image
+        # hits are kept in their own order rather than interleaved by score
+        return image_results + results
+    
+    def _boost_cross_modal_results(self, results: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Boost image-related content for cross-modal queries"""
+        # Boost image-related content
+        image_results = [r for r in results if r.get('document_type') in ['image', 'pdf_image']]
+        other_results = [r for r in results if r not in image_results]
+        
+        return image_results + other_results
+
+
+def merge_overlap(left: str, right: str, min_anchor: int = 16) -> str:
+    """Join two consecutive chunks, dropping the text their overlap window repeats"""
+    anchor = right[:min_anchor]
+    position = left.find(anchor)
+    while position != -1:
+        tail = left[position:]
+        if right.startswith(tail):
+            return left + right[len(tail):]
+        position = left.find(anchor, position + 1)
+    return left + "\n" + right
\ No newline at end of file
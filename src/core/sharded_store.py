@@ -0,0 +1,148 @@
+"""
+Sharded vector store with parallel fan-out queries
+"""
+
+import hashlib
+import heapq
+import re
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Dict, Any, Optional
+
+from src.core.vector_store import VectorStore
+from src.models.schemas import source_key
+from src.utils.logger import setup_logger
+from src.utils.tracing import in_current_trace, span
+
+logger = setup_logger(__name__)
+
+
+class ShardedVectorStore(VectorStore):
+    """VectorStore that spreads chunks over several Chroma collections.
+
+    Shard 0 is the regular collection, so an existing unsharded store keeps
+    working as the first shard. Chunks are routed by rendezvous hashing of
+    their source file (keeping a file's chunks together) or, when
+    ``sharding.route_key`` is set, by that metadata value, one shard per
+    distinct value. Queries run on every shard in parallel and the per-shard
+    top-k lists are merged with a heap. Shards can be added at any time:
+    only about 1/n of the files then route to the new shard, the rest keep
+    their shard. Existing chunks stay where they are and remain searchable.
+    """
+
+    def __init__(self, config, collection_name: Optional[str] = None, query_cache_size: Optional[int] = None):
+        super().__init__(config, collection_name, query_cache_size)
+        self.route_key = config.get("sharding.route_key", None)
+
+        self.shards = {0: self.collection}
+        self.keyed_shards: Dict[str, Any] = {}
+        self._discover_shards()
+        for index in range(len(self.shards), config.get("sharding.shards", 4)):
+            self.add_shard(index)
+
+        self.executor = ThreadPoolExecutor(
+            max_workers=config.get("sharding.max_workers", 4),
+            thread_name_prefix="shard-query"
+        )
+        logger.info(f"Sharded store ready with {len(self._collections())} shards")
+
+    def _discover_shards(self):
+        """Open shards created by earlier runs"""
+        prefix = f"{self.collection_name}_shard"
+        key_prefix = f"{self.collection_name}_key_"
+        for collection in self.client.list_collections():
+            name = collection if isinstance(collection, str) else collection.name
+            if name.startswith(prefix) and name[len(prefix):].isdigit():
+                self.shards[int(name[len(prefix):])] = self.client.get_collection(name)
+            elif name.startswith(key_prefix):
+                self.keyed_shards[name[len(key_prefix):]] = self.client.get_collection(name)
+
+    @staticmethod
+    def _shard_weight(key: str, index: int) -> bytes:
+        return hashlib.blake2b(f"{index}:{key}".encode("utf-8"), digest_size=8).digest()
+
+    def _hash_shard(self, key: str) -> int:
+        """Shard index with the highest weight for key (rendezvous hashing)"""
+        return max(self.shards, key=lambda index: self._shard_weight(key, index))
+
+    def add_shard(self, index: Optional[int] = None) -> Any:
+        """Create a new hash shard; new chunks start routing to it immediately"""
+        if index is None:
+            index = max(self.shards) + 1
+        collection = self.client.get_or_create_collection(
+            name=f"{self.collection_name}_shard{index}",
+            metadata={"description": "Multimodal document embeddings shard"}
+        )
+        self.shards[index] = collection
+        return collection
+
+    @staticmethod
+    def _key_suffix(value: str) -> str:
+        """Collection name suffix for a route_key value
+        
+        Chroma names only allow [a-zA-Z0-9._-] and must end alphanumeric,
+        so other characters become "_"; the hash keeps values that map to
+        the same text (e.g. "a.b" and "a_b") apart.
+        """
+        text = re.sub(r"[^a-zA-Z0-9_-]", "_", value)[:64].strip("_-")
+        digest = hashlib.sha1(value.encode("utf-8")).hexdigest()[:8]
+        return f"{text}_{digest}" if text else digest
+
+    def _keyed_shard(self, value: str) -> Any:
+        """Shard for a route_key value, created on first use"""
+        suffix = self._key_suffix(value)
+        collection = self.keyed_shards.get(suffix)
+        if collection is None:
+            collection = self.client.get_or_create_collection(
+                name=f"{self.collection_name}_key_{suffix}",
+                metadata={"description": f"Multimodal document embeddings for {self.route_key}={value}"}
+            )
+            self.keyed_shards[suffix] = collection
+        return collection
+
+    def _collections(self) -> List[Any]:
+        return [self.shards[i] for i in sorted(self.shards)] + list(self.keyed_shards.values())
+
+    def _route(self, metadatas: List[Dict[str, Any]]) -> List[Any]:
+        targets = []
+        # A batch is mostly the chunks of one file
+        shard_of: Dict[str, int] = {}
+        for metadata in metadatas:
+            if self.route_key and metadata.get(self.route_key) is not None:
+                targets.append(self._keyed_shard(str(metadata[self.route_key])))
+            else:
+                key = source_key(metadata)
+                if key not in shard_of:
+                    shard_of[key] = self._hash_shard(key)
+                targets.append(self.shards[shard_of[key]])
+        return targets
+
+    def _query(self, query_embedding: List[List[float]], top_k: int, where: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+        collections = self._collections()
+
+        def query_shard(collection):
+            with span("shard_query", shard=collection.name):
+                return collection.query(
+                    query_embeddings=query_embedding,
+                    n_results=top_k,
+                    where=where,
+                    include=["metadatas", "documents", "distances"]
+                )
+
+        shard_results = list(self.executor.map(in_current_trace(query_shard), collections))
+
+        candidates = []
+        for results in shard_results:
+            candidates.extend(zip(
+                results["distances"][0],
+                results["ids"][0],
+                results["documents"][0],
+                results["metadatas"][0]
+            ))
+        best = heapq.nsmallest(top_k, candidates, key=lambda c: c[0])
+
+        return {
+            "ids": [[c[1] for c in best]],
+            "documents": [[c[2] for c in best]],
+            "metadatas": [[c[3] for c in best]],
+            "distances": [[c[0] for c in best]]
+        }
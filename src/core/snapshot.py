@@ -0,0 +1,401 @@
+"""
+Compaction, snapshot export and snapshot import of the vector store
+
+Run it with ``python -m src.core.snapshot compact|export|import``. All
+three work on the Chroma database under vector_db.path directly and never
+load an embedding model. Stop ingestion, the watcher and any RAG process
+using the store while they run: Chroma has no read snapshots, so a write
+during export or compaction would be missed or copied twice.
+
+A snapshot is a folder with, per collection, a .npy file of the vectors
+and a gzipped JSONL file of ids, texts and metadata, plus manifest.json
+(written last) with the collection settings, row counts and checksums.
+Importing it only inserts stored vectors, which is far faster than
+parsing and embedding the documents again.
+"""
+
+import argparse
+import hashlib
+import os
+import re
+import shutil
+import sqlite3
+import sys
+import time
+from contextlib import closing
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Set
+
+import numpy as np
+
+from src.core.deduplicator import provenance
+from src.core.hierarchical_index import HierarchicalIndex
+from src.core.vector_store import collection_pages, shared_client
+from src.models.schemas import source_key
+from src.utils.columnar import NumpyWriter, numpy_pages, read_manifest, write_manifest
+from src.utils.config import Config
+from src.utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+SNAPSHOT_FORMAT = "multimodal-rag-snapshot"
+# Version 2 records hold "text" where version 1 held "document"
+SNAPSHOT_VERSION = 2
+# Collections derived from the chunk collection name
+_SUFFIX_RE = r"(_shard\d+|_key_.+|_documents|_pages|_images)"
+_UUID_RE = re.compile(r"^[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}$")
+_TEMP = "__compact"
+
+
+def _name(collection) -> str:
+    return collection if isinstance(collection, str) else collection.name
+
+
+def store_collections(client, collection_name: str) -> Dict[str, Any]:
+    """{suffix: collection} for the chunk collection and everything derived from it"""
+    pattern = re.compile(f"^{re.escape(collection_name)}({_SUFFIX_RE})?$")
+    found = {}
+    for entry in client.list_collections():
+        name = _name(entry)
+        match = pattern.match(name)
+        if match and not name.endswith(_TEMP):
+            found[match.group(1) or ""] = client.get_collection(name)
+    return dict(sorted(found.items()))
+
+
+def disk_usage(path: str) -> int:
+    return sum(item.stat().st_size for item in Path(path).rglob("*") if item.is_file())
+
+
+def _batch_limit(client, batch_size: int) -> int:
+    try:
+        return min(batch_size, client.get_max_batch_size())
+    except AttributeError:
+        return batch_size
+
+
+def _recover(client, name: str):
+    """Finish or roll back a compaction that was interrupted"""
+    temp = name + _TEMP
+    names = {_name(entry) for entry in client.list_collections()}
+    if temp not in names:
+        return
+    if name in names:
+        # Interrupted while copying: the original is intact
+        client.delete_collection(temp)
+    else:
+        # Interrupted between delete and rename: the copy is complete
+        client.get_collection(temp).modify(name=name)
+        logger.warning(f"Restored {name} from an interrupted compaction")
+
+
+def compact_collection(client, name: str, keep_files: Optional[Set[str]] = None,
+                       batch_size: int = 1000) -> Dict[str, int]:
+    """Copy the live chunks of one collection into a fresh one.
+
+    Chunks carry the ingest that wrote them (ingested_at). Only the
+    latest ingest of each file (source_key) is kept: chunks of older
+    ingests are stale, left behind when the file was ingested again
+    without its old chunks being deleted. Chunks stored before ingests
+    were recorded count as the oldest one. With keep_files, a set of
+    absolute paths and file names, chunks none of whose source files
+    (source_key, or any duplicate recorded in sources) are in that set
+    are orphans and dropped too. Ingests are compared within a
+    collection, so a file re-ingested into another shard keeps its older
+    chunks.
+
+    A first read of the metadata finds each file's latest ingest; the
+    copy then judges every row on its own metadata, so it does not rely
+    on the two reads returning rows in the same order. Copying into a
+    new collection also rebuilds the HNSW index without the entries
+    deleted chunks leave behind.
+    """
+    _recover(client, name)
+    collection = client.get_collection(name)
+    total = collection.count()
+
+    def live(metadata: Dict[str, Any]) -> bool:
+        return keep_files is None or bool(keep_files.intersection(provenance(metadata)))
+
+    latest: Dict[str, float] = {}
+    rows = 0
+    for page in collection_pages(collection, batch_size, ["metadatas"]):
+        for metadata in page["metadatas"]:
+            metadata = metadata or {}
+            if live(metadata):
+                source = source_key(metadata)
+                latest[source] = max(latest.get(source, 0.0), metadata.get("ingested_at", 0.0))
+        rows += len(page["ids"])
+    if rows != total:
+        raise RuntimeError(f"{name} changed while it was read ({total} rows, then {rows})")
+
+    limit = _batch_limit(client, batch_size)
+    temp = client.create_collection(name + _TEMP, metadata=collection.metadata)
+    kept = orphans = 0
+    for page in collection_pages(collection, limit, ["embeddings", "documents", "metadatas"]):
+        keep = []
+        for i, metadata in enumerate(page["metadatas"]):
+            metadata = metadata or {}
+            if not live(metadata):
+                orphans += 1
+            elif metadata.get("ingested_at", 0.0) == latest.get(source_key(metadata)):
+                keep.append(i)
+        if keep:
+            temp.add(
+                ids=[page["ids"][i] for i in keep],
+                embeddings=np.asarray(page["embeddings"], dtype=np.float32)[keep],
+                documents=[page["documents"][i] for i in keep],
+                metadatas=[page["metadatas"][i] for i in keep]
+            )
+            kept += len(keep)
+    if temp.count() != kept:
+        client.delete_collection(temp.name)
+        raise RuntimeError(f"Copy of {name} holds {temp.count()} rows, expected {kept}")
+
+    client.delete_collection(name)
+    temp.modify(name=name)
+    return {"rows": total, "kept": kept, "stale": total - orphans - kept, "orphans": orphans}
+
+
+def prune_segments(path: str) -> int:
+    """Delete segment folders of collections Chroma no longer lists"""
+    with closing(sqlite3.connect(str(Path(path) / "chroma.sqlite3"))) as db:
+        live = {row[0] for row in db.execute("SELECT id FROM segments")}
+    removed = 0
+    for folder in Path(path).iterdir():
+        if folder.is_dir() and _UUID_RE.match(folder.name) and folder.name not in live:
+            shutil.rmtree(folder)
+            removed += 1
+    return removed
+
+
+def vacuum(path: str) -> bool:
+    """Give free SQLite pages back to the file system"""
+    try:
+        with closing(sqlite3.connect(str(Path(path) / "chroma.sqlite3"))) as db:
+            db.execute("VACUUM")
+        return True
+    except sqlite3.OperationalError as e:
+        logger.warning(f"Could not vacuum the Chroma database: {e}")
+        return False
+
+
+def compact(config, collection_name: Optional[str] = None, sources: Optional[List[str]] = None,
+            batch_size: int = 1000, run_vacuum: bool = True) -> Dict[str, Any]:
+    """Compact the chunk, shard and image collections of a store.
+
+    sources are the folders the store indexes; when given, chunks of
+    files no longer in them are dropped. Summaries are rebuilt from the
+    remaining chunks.
+    """
+    path = config.get("vector_db.path", "./data/vector_db")
+    collection_name = collection_name or config.get("vector_db.collection_name", "multimodal_docs")
+    client = shared_client(path)
+    keep_files = None
+    if sources:
+        # Paths as the ingestion queue records them; names for chunks
+        # stored before source paths were
+        found = [item for source in sources for item in Path(source).rglob("*") if item.is_file()]
+        keep_files = {os.path.abspath(item) for item in found} | {item.name for item in found}
+
+    size_before = disk_usage(path)
+    _recover(client, collection_name)
+    collections = store_collections(client, collection_name)
+    if "" not in collections:
+        raise ValueError(f"No collection named {collection_name} in {path}")
+
+    report: Dict[str, Any] = {"collections": {}}
+    for suffix, collection in collections.items():
+        if suffix in ("_documents", "_pages"):
+            continue
+        counts = compact_collection(client, collection.name, keep_files, batch_size)
+        report["collections"][collection.name] = counts
+        logger.info(f"Compacted {collection.name}: kept {counts['kept']} of {counts['rows']} "
+                    f"({counts['stale']} stale, {counts['orphans']} orphaned)")
+
+    if "_documents" in collections:
+        chunk_collections = [client.get_collection(collection.name) for suffix, collection in collections.items()
+                             if suffix not in ("_documents", "_pages", "_images")]
+        pages = (page for collection in chunk_collections
+                 for page in collection_pages(collection, batch_size, ["embeddings", "metadatas"]))
+        HierarchicalIndex(client, collection_name, config).rebuild(pages)
+
+    report["segments_removed"] = prune_segments(path)
+    report["vacuumed"] = run_vacuum and vacuum(path)
+    report["bytes_before"] = size_before
+    report["bytes_after"] = disk_usage(path)
+    return report
+
+
+def _sha256(path: Path) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _file_stem(suffix: str) -> str:
+    return suffix.lstrip("_") or "chunks"
+
+
+def export_snapshot(config, folder: str, collection_name: Optional[str] = None, dtype: Optional[str] = None,
+                    batch_size: int = 1000) -> Dict[str, Any]:
+    """Write every collection of the store to a snapshot folder.
+
+    dtype float16 halves the vector files. By default it is used when the
+    collection already stores float16-rounded vectors (embedding.reduction
+    .dtype), where it loses nothing.
+    """
+    path = config.get("vector_db.path", "./data/vector_db")
+    collection_name = collection_name or config.get("vector_db.collection_name", "multimodal_docs")
+    client = shared_client(path)
+    collections = store_collections(client, collection_name)
+    if "" not in collections:
+        raise ValueError(f"No collection named {collection_name} in {path}")
+    if dtype is None:
+        projection = (collections[""].metadata or {}).get("embedding_projection", "none")
+        dtype = "float16" if projection.endswith("-float16") else "float32"
+
+    target = Path(folder)
+    target.mkdir(parents=True, exist_ok=True)
+    manifest_path = target / "manifest.json"
+    if manifest_path.exists():
+        manifest_path.unlink()
+
+    entries = []
+    for suffix, collection in collections.items():
+        stem = _file_stem(suffix)
+        count = collection.count()
+        first = collection.get(limit=1, include=["embeddings"])["embeddings"]
+        dimension = len(first[0]) if count and first is not None and len(first) else 0
+        writer = NumpyWriter(str(target), count, dimension, f"{stem}.npy", f"{stem}.jsonl.gz", dtype)
+        row = 0
+        try:
+            for page in collection_pages(collection, batch_size, ["embeddings", "documents", "metadatas"]):
+                row += len(page["ids"])
+                if row > count:
+                    raise RuntimeError(f"{collection.name} grew during export")
+                writer.write(page["ids"], page["documents"], page["metadatas"],
+                             np.asarray(page["embeddings"], dtype=np.float32))
+        finally:
+            files = writer.close()
+        if row != count or collection.count() != count:
+            raise RuntimeError(f"{collection.name} changed during export")
+
+        entries.append({
+            "suffix": suffix,
+            "metadata": collection.metadata,
+            "count": count,
+            "dimension": dimension,
+            "dtype": dtype,
+            "files": {file.name: {"bytes": file.stat().st_size, "sha256": _sha256(file)} for file in files}
+        })
+        logger.info(f"Exported {count} rows of {collection.name}")
+
+    write_manifest(
+        str(target), SNAPSHOT_FORMAT, SNAPSHOT_VERSION,
+        collection_name=collection_name,
+        embedding_model=config.get("embedding.model", "sentence-transformers/all-MiniLM-L6-v2"),
+        image_model=config.get("image_embedding.model", "clip-ViT-B-32"),
+        collections=entries
+    )
+
+    return {
+        "collections": len(entries),
+        "rows": sum(entry["count"] for entry in entries),
+        "bytes": sum(file["bytes"] for entry in entries for file in entry["files"].values()),
+        "store_bytes": disk_usage(path)
+    }
+
+
+def import_snapshot(config, folder: str, collection_name: Optional[str] = None, replace: bool = False,
+                    force: bool = False, batch_size: int = 1000) -> Dict[str, Any]:
+    """Load a snapshot into the configured store without embedding anything.
+
+    Files are checked against the manifest checksums, and the snapshot's
+    embedding model must match embedding.model unless force is set.
+    Existing collections are only overwritten with replace.
+    """
+    manifest = read_manifest(folder, SNAPSHOT_FORMAT, SNAPSHOT_VERSION)
+    model = config.get("embedding.model", "sentence-transformers/all-MiniLM-L6-v2")
+    if manifest["embedding_model"] != model and not force:
+        raise ValueError(f"Snapshot vectors come from {manifest['embedding_model']}, "
+                         f"but embedding.model is {model}")
+    for entry in manifest["collections"]:
+        for name, file in entry["files"].items():
+            if _sha256(Path(folder) / name) != file["sha256"]:
+                raise ValueError(f"{name} does not match the snapshot manifest")
+
+    path = config.get("vector_db.path", "./data/vector_db")
+    collection_name = collection_name or manifest["collection_name"]
+    client = shared_client(path)
+    existing = {_name(entry) for entry in client.list_collections()}
+    names = [collection_name + entry["suffix"] for entry in manifest["collections"]]
+    clashes = [name for name in names if name in existing]
+    if clashes and not replace:
+        raise ValueError(f"Collections already exist: {', '.join(clashes)}; import with --replace")
+
+    start = time.perf_counter()
+    limit = _batch_limit(client, batch_size)
+    rows = 0
+    for entry, name in zip(manifest["collections"], names):
+        if name in existing:
+            client.delete_collection(name)
+        collection = client.create_collection(name, metadata=entry["metadata"])
+        stem = _file_stem(entry["suffix"])
+        for ids, documents, metadatas, embeddings in numpy_pages(Path(folder) / f"{stem}.npy",
+                                                                 Path(folder) / f"{stem}.jsonl.gz", limit):
+            collection.add(ids=ids, embeddings=embeddings, documents=documents, metadatas=metadatas)
+        rows += entry["count"]
+        logger.info(f"Imported {entry['count']} rows into {name}")
+    seconds = time.perf_counter() - start
+    return {"collections": len(names), "rows": rows, "seconds": seconds,
+            "rows_per_s": rows / seconds if seconds else 0.0}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compact the vector store, or export and import snapshots of it")
+    parser.add_argument("command", choices=["compact", "export", "import"])
+    parser.add_argument("folder", nargs="?", help="Snapshot folder for export and import")
+    parser.add_argument("--config", default=None, help="Config file, config.yaml by default")
+    parser.add_argument("--collection", default=None, help="Collection name, vector_db.collection_name by default")
+    parser.add_argument("--batch-size", type=int, default=1000, help="Rows read or written per Chroma call")
+    parser.add_argument("--source", action="append", default=None,
+                        help="compact: indexed folder; chunks of files not found in any --source are dropped")
+    parser.add_argument("--no-vacuum", action="store_true", help="compact: skip VACUUM of the SQLite file")
+    parser.add_argument("--float16", action="store_true", help="export: store vectors as float16")
+    parser.add_argument("--replace", action="store_true", help="import: overwrite existing collections")
+    parser.add_argument("--force", action="store_true", help="import: accept vectors of another embedding model")
+    args = parser.parse_args()
+
+    config = Config(args.config)
+    if args.command != "compact" and not args.folder:
+        parser.error(f"{args.command} needs a snapshot folder")
+
+    try:
+        if args.command == "compact":
+            report = compact(config, args.collection, args.source, args.batch_size, not args.no_vacuum)
+            for name, counts in report["collections"].items():
+                print(f"📊 {name}: kept {counts['kept']} of {counts['rows']} chunks, "
+                      f"{counts['stale']} stale, {counts['orphans']} orphaned")
+            print(f"💾 {report['bytes_before'] / 2 ** 20:.2f} MiB -> {report['bytes_after'] / 2 ** 20:.2f} MiB, "
+                  f"{report['segments_removed']} dead segment folders removed")
+        elif args.command == "export":
+            report = export_snapshot(config, args.folder, args.collection,
+                                     "float16" if args.float16 else None, args.batch_size)
+            print(f"💾 {report['rows']} rows of {report['collections']} collections, "
+                  f"{report['bytes'] / 2 ** 20:.2f} MiB snapshot (store {report['store_bytes'] / 2 ** 20:.2f} MiB) "
+                  f"in {args.folder}")
+        else:
+            report = import_snapshot(config, args.folder, args.collection, args.replace, args.force, args.batch_size)
+            print(f"📄 Loaded {report['rows']} rows into {report['collections']} collections in "
+                  f"{report['seconds']:.2f}s ({report['rows_per_s']:.0f} rows/s)")
+    except (ValueError, RuntimeError, FileNotFoundError) as e:
+        print(f"❌ {e}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,121 @@
+"""
+Multi-tenant collection routing
+"""
+
+import copy
+import re
+import threading
+from typing import List, Dict, Any, Optional
+
+from src.core.vector_store import VectorStore
+from src.core.sharded_store import ShardedVectorStore
+from src.core.retrieval_engine import RetrievalEngine
+from src.utils.lru_cache import LRUCache
+from src.utils.logger import setup_logger
+from src.utils.tracing import span
+
+logger = setup_logger(__name__)
+
+
+def tenant_settings(config, name: Optional[str]) -> Dict[str, Any]:
+    """tenancy.tenants entry of a tenant
+
+    Looked up by name rather than through a dotted config key, which
+    would split names such as "acme.eu".
+    """
+    if not name:
+        return {}
+    return (config.get("tenancy.tenants", {}) or {}).get(name) or {}
+
+
+class Tenant:
+    """Handle on one tenant's collection with its own caches"""
+
+    def __init__(self, name: Optional[str], collection_name: str, config):
+        self.name = name
+        self.collection_name = collection_name
+        settings = tenant_settings(config, name)
+
+        query_cache_size = settings.get("query_cache_size", config.get("tenancy.query_cache_size", 256))
+        # None falls back to embedding.query_cache_size
+        embedding_cache_size = settings.get("embedding_cache_size")
+        ttl = config.get("tenancy.cache_ttl_seconds", 60)
+
+        if config.get("sharding.enabled", False):
+            self.vector_store = ShardedVectorStore(config, collection_name, embedding_cache_size)
+        else:
+            self.vector_store = VectorStore(config, collection_name, embedding_cache_size)
+        self.retrieval_engine = RetrievalEngine(self.vector_store, config)
+        self.results = LRUCache(query_cache_size, ttl)
+
+    def search(self, query: str, top_k: Optional[int] = None, threshold: Optional[float] = None,
+               expand_context: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Search this tenant's collection, serving repeats from the result cache"""
+        key = (query, top_k, threshold, expand_context)
+        with span("result_cache") as lookup:
+            cached = self.results.get(key)
+            lookup.set(hit=cached is not None)
+        if cached is None:
+            with span("retrieval", tenant=self.name):
+                cached = self.retrieval_engine.search(query, top_k, threshold, expand_context)
+            self.results.put(key, cached)
+        # Results hold nested metadata; callers get their own copy of it
+        return copy.deepcopy(cached)
+
+    def invalidate(self):
+        """Drop cached results after the collection changed"""
+        self.results.clear()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get collection size and cache counters"""
+        return {
+            "collection_name": self.collection_name,
+            "total_documents": self.vector_store.get_collection_stats(),
+            "query_cache": self.results.get_stats(),
+            "embedding_cache": self.vector_store.query_embeddings.get_stats()
+        }
+
+
+class TenantRegistry:
+    """Opens tenant handles on first use.
+
+    All tenants share one embedding model and one Chroma client per
+    database path (see VectorStore), so an extra tenant only costs its
+    collection handle and its caches.
+    """
+
+    def __init__(self, config):
+        self.config = config
+        self.default_collection = config.get("vector_db.collection_name", "multimodal_docs")
+        self._tenants: Dict[Optional[str], Tenant] = {}
+        self._lock = threading.Lock()
+
+    def get(self, name: Optional[str] = None) -> Tenant:
+        """Get the handle for a tenant; None is the configured collection"""
+        tenant = self._tenants.get(name)
+        if tenant is not None:
+            return tenant
+
+        with self._lock:
+            tenant = self._tenants.get(name)
+            if tenant is None:
+                tenant = Tenant(name, self.collection_for(name), self.config)
+                self._tenants[name] = tenant
+                logger.info(f"Opened tenant {name or 'default'} on collection {tenant.collection_name}")
+            return tenant
+
+    def collection_for(self, name: Optional[str]) -> str:
+        """Collection name backing a tenant"""
+        if name is None:
+            return self.default_collection
+
+        configured = tenant_settings(self.config, name).get("collection_name")
+        if configured:
+            return configured
+        if not self.config.get("tenancy.allow_unknown", True):
+            raise ValueError(f"Unknown tenant: {name}")
+        return f"{self.default_collection}_tenant_{re.sub(r'[^a-zA-Z0-9_-]', '_', name)}"
+
+    def names(self) -> List[Optional[str]]:
+        """Tenants opened so far"""
+        return list(self._tenants.keys())
@@ -1,94 +1,573 @@
-"""
-Vector Store Management using ChromaDB
-"""
-
-import chromadb
-from chromadb.config import Settings
-from sentence_transformers import SentenceTransformer
-import numpy as np
-from typing import List, Dict, Any
-from src.utils.logger import setup_logger
-
-logger = setup_logger(__name__)
-
-class VectorStore:
-    def __init__(self, config):
-        self.config = config
-        self.client = chromadb.PersistentClient(
-            path=config.get("vector_db.path", "./data/vector_db")
-        )
-        
-        # Initialize embedding model
-        model_name = config.get("embedding.model", "sentence-transformers/all-MiniLM-L6-v2")
-        logger.info(f"Loading embedding model: {model_name}")
-        self.embedding_model = SentenceTransformer(model_name)
-        
-        # Create or get collection
-        self.collection = self.client.get_or_create_collection(
-            name=config.get("vector_db.collection_name", "multimodal_docs"),
-            metadata={"description": "Multimodal document embeddings"}
-        )
-        
-        logger.info("Vector store initialized successfully")
-    
-    def add_documents(self, documents: List[Dict[str, Any]]):
-        """Add documents to vector store"""
-        if not documents:
-            logger.warning("No documents to add")
-            return
-        
-        ids = [doc["id"] for doc in documents]
-        contents = [doc["content"] for doc in documents]
-        metadatas = [doc["metadata"] for doc in documents]
-        
-        # Generate embeddings
-        logger.info(f"Generating embeddings for {len(contents)} documents...")
-        embeddings = self.embedding_model.encode(contents).tolist()
-        
-        # Add to collection
-        self.collection.add(
-            embeddings=embeddings,
-            documents=contents,
-            metadatas=metadatas,
-            ids=ids
-        )
-        
-        logger.info(f"Successfully added {len(documents)} documents to vector store")
-    
-    def search(self, query: str, top_k: int = 5, threshold: float = 0.5) -> List[Dict[str, Any]]:
-        """Search for similar documents"""
-        # Generate query embedding
-        query_embedding = self.embedding_model.encode([query]).tolist()
-        
-        # Search in vector database
-        results = self.collection.query(
-            query_embeddings=query_embedding,
-            n_results=top_k,
-            include=["metadatas", "documents", "distances"]
-        )
-        
-        # Format results
-        search_results = []
-        if results['documents'] and results['documents'][0]:
-            for i, (doc, metadata, distance) in enumerate(zip(
-                results['documents'][0],
-                results['metadatas'][0],
-                results['distances'][0]
-            )):
-                # Convert distance to similarity score
-                score = 1 - distance
-                
-                if score >= threshold:
-                    search_results.append({
-                        "content": doc,
-                        "metadata": metadata,
-                        "score": score,
-                        "document_type": metadata.get("file_type", "unknown")
-                    })
-        
-        logger.info(f"Search returned {len(search_results)} results for query: {query}")
-        return search_results
-    
-    def get_collection_stats(self) -> int:
-        """Get number of documents in collection"""
-        return self.collection.count()
\ No newline at end of file
+"""
+Vector Store Management using ChromaDB
+"""
+
+import os
+import threading
+import time
+from pathlib import Path
+import chromadb
+from chromadb.config import Settings
+import numpy as np
+from typing import List, Dict, Any, Iterator, Tuple, Optional
+from src.core.deduplicator import ChunkDeduplicator, add_provenance, remove_provenance
+from src.core.embedding_server import connect_embedding_server
+from src.core.hierarchical_index import HierarchicalIndex
+from src.core.image_index import ImageIndex
+from src.models.schemas import ChunkBatch, source_key
+from src.utils.columnar import create_columnar_writer, read_columnar, read_manifest, write_manifest
+from src.utils.embedding_backends import create_embedding_backend
+from src.utils.hashing_embedder import is_hashing_model
+from src.utils.config import Config
+from src.utils.dimension_reduction import load_projection
+from src.utils.lru_cache import LRUCache
+from src.utils.metrics import get_metrics
+from src.utils.token_batching import create_token_batcher
+from src.utils.tracing import span
+from src.utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+# Models and clients are shared by every VectorStore in the process
+_models: Dict[Tuple[str, str], Any] = {}
+_clients: Dict[str, Any] = {}
+_pool_lock = threading.Lock()
+_last_ingest = 0.0
+
+
+def shared_model(model_name: str, config=None, backend: Optional[str] = None):
+    """Load an embedding model once per process
+    
+    The backend (embedding.backend unless given) picks ONNX Runtime or
+    SentenceTransformer; "hashing" and "hashing-<dimension>" select the
+    deterministic offline embedder. See create_embedding_backend.
+    
+    Without an explicit backend, a running embedding server
+    (src/core/embedding_server.py) serving the same model is used instead
+    of a local copy.
+    """
+    if config is None:
+        config = Config()
+    use_server = backend is None and not is_hashing_model(model_name)
+    if backend is None:
+        backend = config.get("embedding.backend", "sentence_transformers")
+    key = (model_name, backend)
+    with _pool_lock:
+        if key not in _models:
+            load = lambda: create_embedding_backend(config, model_name, backend)
+            model = connect_embedding_server(config, model_name, fallback=load) if use_server else None
+            if model is None:
+                logger.info(f"Loading embedding model: {model_name} ({backend})")
+                model = load()
+            _models[key] = model
+            logger.info(f"Embedding backend: {model.name}")
+        return _models[key]
+
+
+def ingest_stamp() -> float:
+    """ingested_at of a new ingest: epoch seconds, unique and increasing within the process"""
+    global _last_ingest
+    with _pool_lock:
+        _last_ingest = max(time.time(), _last_ingest + 1e-6)
+        return _last_ingest
+
+
+def collection_pages(collection, batch_size: int = 1000, include: Optional[List[str]] = None,
+                     offset: int = 0) -> Iterator[Dict[str, Any]]:
+    """Successive get() pages of one collection in store order, from offset on"""
+    if include is None:
+        include = ["documents", "metadatas"]
+    while True:
+        page = collection.get(limit=batch_size, offset=offset, include=include)
+        if not page["ids"]:
+            return
+        yield page
+        offset += len(page["ids"])
+
+
+def shared_client(path: str):
+    """Open one Chroma client per database path"""
+    with _pool_lock:
+        if path not in _clients:
+            _clients[path] = chromadb.PersistentClient(path=path)
+        return _clients[path]
+
+
+class VectorStore:
+    def __init__(self, config, collection_name: Optional[str] = None, query_cache_size: Optional[int] = None):
+        self.config = config
+        self.client = shared_client(config.get("vector_db.path", "./data/vector_db"))
+        
+        # Initialize embedding model
+        model_name = config.get("embedding.model", "sentence-transformers/all-MiniLM-L6-v2")
+        self.embedding_model = shared_model(model_name, config)
+        # Length-sorted batches sized by a token budget
+        self.batcher = create_token_batcher(config, self.embedding_model)
+        # Reduction and precision applied to stored and query vectors alike
+        self.projection = load_projection(config)
+        
+        # Recent query embeddings
+        if query_cache_size is None:
+            query_cache_size = config.get("embedding.query_cache_size", 1024)
+        self.query_embeddings = LRUCache(query_cache_size)
+        
+        # Create or get collection
+        if collection_name is None:
+            collection_name = config.get("vector_db.collection_name", "multimodal_docs")
+        self.collection_name = collection_name
+        self.collection = self.client.get_or_create_collection(
+            name=collection_name,
+            metadata={"description": "Multimodal document embeddings", "embedding_projection": self.projection.id}
+        )
+        stored = (self.collection.metadata or {}).get("embedding_projection", "none")
+        if stored != self.projection.id:
+            raise ValueError(f"Collection {collection_name} holds vectors reduced with {stored}, but "
+                             f"embedding.reduction gives {self.projection.id}; re-ingest or restore the setting")
+        
+        # Document/page summary vectors for two-stage search
+        self.hierarchy = None
+        if config.get("hierarchy.enabled", False):
+            self.hierarchy = HierarchicalIndex(self.client, collection_name, config)
+        
+        # CLIP vectors for cross-modal search
+        self.image_index = None
+        if config.get("image_embedding.enabled", False):
+            self.image_index = ImageIndex(self.client, collection_name, config)
+        
+        # Near-duplicate detection runs before embedding
+        self.deduplicator = None
+        if config.get("dedup.enabled", True):
+            self.deduplicator = ChunkDeduplicator(config)
+        self._dedup_seeded = not config.get("dedup.seed_from_store", True)
+        # Duplicates of chunks that passed dedup but are not written yet
+        self._pending_provenance: Dict[str, List[Dict[str, Any]]] = {}
+        
+        self.metrics = get_metrics(config)
+        
+        logger.info("Vector store initialized successfully")
+    
+    def add_documents(self, documents: List[Dict[str, Any]]) -> int:
+        """Add documents to vector store, returning the number of chunks stored"""
+        if not documents:
+            logger.warning("No documents to add")
+            return 0
+        
+        batch = self.prepare_documents(ChunkBatch.from_documents(documents))
+        if not len(batch):
+            return 0
+        
+        embeddings = self.embed_documents(batch)
+        return self.write_documents(batch, embeddings)
+    
+    def prepare_documents(self, batch: ChunkBatch) -> ChunkBatch:
+        """Stamp the chunks with a new ingest and drop near-duplicates,
+        recording them on the stored chunks they match"""
+        batch.set_ingested_at(ingest_stamp())
+        if self.deduplicator is None:
+            return batch
+        if not self._dedup_seeded:
+            self._seed_deduplicator()
+        
+        with span("dedup", chunks=len(batch)):
+            batch, stored_matches = self.deduplicator.deduplicate_batch(batch)
+        if stored_matches:
+            self._merge_provenance(stored_matches)
+        if not len(batch):
+            logger.info("All chunks were near-duplicates of stored chunks")
+        return batch
+    
+    def _seed_deduplicator(self):
+        """Index the chunks stored by earlier runs, so their duplicates are found too"""
+        self._dedup_seeded = True
+        start = time.perf_counter()
+        with span("dedup_seed"):
+            # Older chunks would be evicted from the bounded index anyway
+            for page in self.iter_chunks(embeddings=False, newest=self.deduplicator.max_entries):
+                self.deduplicator.seed(page["ids"], page["documents"])
+        indexed = self.deduplicator.get_stats()["indexed"]
+        if indexed:
+            logger.info(f"Dedup index seeded with {indexed} stored chunks in {time.perf_counter() - start:.1f}s")
+    
+    def embed_documents(self, batch: ChunkBatch) -> np.ndarray:
+        """Generate embeddings for chunk contents"""
+        logger.info("Generating embeddings for %d documents...", len(batch))
+        with self.metrics.timer("rag_embedding_batch_seconds"), span("embed_batch", chunks=len(batch)):
+            if self.batcher is None:
+                embeddings, overlong = self.embedding_model.encode(batch.contents()), {}
+            else:
+                embeddings, overlong = self.batcher.encode(batch.contents())
+            embeddings = self.projection.transform(embeddings)
+        
+        # Record on the chunk how its overflow was handled
+        for row, details in overlong.items():
+            batch.update_extra(row, **details)
+        if overlong:
+            self.metrics.inc("rag_overlong_chunks_total", len(overlong))
+        self.metrics.inc("rag_embedded_chunks_total", len(batch))
+        return embeddings
+    
+    def write_documents(self, batch: ChunkBatch, embeddings: np.ndarray) -> int:
+        """Store embedded chunks and fold them into the summaries"""
+        ids = batch.ids
+        if self._pending_provenance:
+            for row, doc_id in enumerate(ids):
+                duplicates = self._pending_provenance.pop(doc_id, None)
+                if duplicates:
+                    metadata = batch.metadata(row)
+                    for duplicate in duplicates:
+                        add_provenance(metadata, duplicate)
+                    provenance = {key: metadata[key] for key in ("sources", "duplicate_count", "ingested_at")
+                                  if key in metadata}
+                    batch.update_extra(row, **provenance)
+        
+        # Chroma takes parallel lists; this is where chunk dicts are built
+        contents = batch.contents()
+        metadatas = batch.metadatas()
+        
+        # Add to collection(s)
+        groups: Dict[int, List[int]] = {}
+        targets = self._route(metadatas)
+        for i, collection in enumerate(targets):
+            groups.setdefault(id(collection), []).append(i)
+        with self.metrics.timer("rag_chroma_write_seconds"), span("chroma_add", chunks=len(batch)):
+            for rows in groups.values():
+                targets[rows[0]].add(
+                    embeddings=embeddings[rows],
+                    documents=[contents[i] for i in rows],
+                    metadatas=[metadatas[i] for i in rows],
+                    ids=[ids[i] for i in rows]
+                )
+        self.metrics.inc("rag_chunks_written_total", len(batch))
+        
+        if self.hierarchy is not None:
+            self.hierarchy.update(metadatas, embeddings)
+        
+        logger.info("Successfully added %d documents to vector store", len(batch))
+        return len(batch)
+    
+    def delete_file(self, file_path: str) -> int:
+        """Remove every chunk, summary and image vector of a file
+        
+        Chunks are matched on their source_path, so files of the same name
+        in other folders are kept; chunks stored before source paths were
+        recorded are matched on the file name.
+        
+        A chunk that near-duplicates chunks of other files is the only
+        stored copy of all of them, so it is kept and handed over to the
+        first of its remaining sources; the file is also dropped from the
+        sources of chunks it duplicated.
+        """
+        file_path = os.path.abspath(file_path)
+        filename = Path(file_path).name
+        removed = (file_path, filename)
+        deleted = 0
+        handed_over = []
+        for collection in self._collections():
+            owned = collection.get(where={"filename": filename}, include=["metadatas"])
+            shared = collection.get(where={"sources": {"$contains": file_path}}, include=["metadatas"])
+            candidates = dict(zip(shared["ids"], shared["metadatas"]))
+            candidates.update((doc_id, metadata) for doc_id, metadata in zip(owned["ids"], owned["metadatas"])
+                              if source_key(metadata or {}) in removed)
+            
+            ids, update_ids, update_metadatas, moved = [], [], [], []
+            latest: Dict[str, Optional[float]] = {}
+            for doc_id, stored in candidates.items():
+                metadata = dict(stored or {})
+                if not remove_provenance(metadata, removed):
+                    ids.append(doc_id)
+                elif metadata != stored:
+                    update_ids.append(doc_id)
+                    update_metadatas.append(metadata)
+                    if source_key(stored or {}) in removed:
+                        moved.append(doc_id)
+                        # Joins the new file's latest ingest, or compaction
+                        # would take it for a leftover of an older one
+                        owner = source_key(metadata)
+                        if owner not in latest:
+                            latest[owner] = self._latest_ingest(collection, owner)
+                        if latest[owner] is not None:
+                            metadata["ingested_at"] = latest[owner]
+            
+            if update_ids:
+                collection.update(ids=update_ids, metadatas=update_metadatas)
+            if moved:
+                handed_over.append((collection, moved))
+            if ids:
+                collection.delete(ids=ids)
+                deleted += len(ids)
+                self.forget_chunks(ids)
+        
+        if self.hierarchy is not None:
+            self.hierarchy.remove(file_path)
+            # Kept chunks now count towards their new file's summaries
+            for collection, moved in handed_over:
+                kept = collection.get(ids=moved, include=["metadatas", "embeddings"])
+                self.hierarchy.update(kept["metadatas"], np.asarray(kept["embeddings"], dtype=np.float32))
+        if self.image_index is not None:
+            self.image_index.remove(file_path)
+        if handed_over:
+            logger.info(f"Kept {sum(len(moved) for _, moved in handed_over)} chunks of {file_path} "
+                        f"that other files duplicate")
+        
+        logger.info(f"Deleted {deleted} chunks of {file_path}")
+        return deleted
+    
+    def _latest_ingest(self, collection, source: str) -> Optional[float]:
+        """ingested_at of the newest ingest among a file's chunks in collection"""
+        found = collection.get(where={"source_path": source}, include=["metadatas"])
+        stamps = [metadata["ingested_at"] for metadata in found["metadatas"]
+                  if metadata and metadata.get("ingested_at") is not None]
+        return max(stamps) if stamps else None
+    
+    def forget_chunks(self, ids: List[str]):
+        """Drop dedup state of chunks that were deleted or never written"""
+        if self.deduplicator is not None:
+            self.deduplicator.forget(ids)
+        for doc_id in ids:
+            self._pending_provenance.pop(doc_id, None)
+    
+    def _merge_provenance(self, stored_matches: Dict[str, List[Dict[str, Any]]]):
+        """Record duplicate sources on chunks that are already stored"""
+        ids = list(stored_matches.keys())
+        for collection in self._collections():
+            existing = collection.get(ids=ids, include=["metadatas"])
+            
+            update_ids = []
+            update_metadatas = []
+            for doc_id, metadata in zip(existing["ids"], existing["metadatas"]):
+                metadata = dict(metadata or {})
+                for duplicate in stored_matches[doc_id]:
+                    add_provenance(metadata, duplicate)
+                update_ids.append(doc_id)
+                update_metadatas.append(metadata)
+            
+            if update_ids:
+                collection.update(ids=update_ids, metadatas=update_metadatas)
+            for doc_id in update_ids:
+                del stored_matches[doc_id]
+            if not stored_matches:
+                return
+        
+        # With pipelined ingestion the match may still be on its way to the
+        # store; write_documents applies these when it arrives
+        for doc_id, duplicates in stored_matches.items():
+            self._pending_provenance.setdefault(doc_id, []).extend(duplicates)
+    
+    def search(self, query: str, top_k: int = 5, threshold: float = 0.5,
+               hierarchical: Optional[bool] = None) -> List[Dict[str, Any]]:
+        """Search for similar documents
+        
+        With hierarchical search the chunk query is restricted to the
+        candidate documents and pages picked from the summary index.
+        """
+        if hierarchical is None:
+            hierarchical = self.config.get("hierarchy.search", True)
+        
+        self.metrics.inc("rag_searches_total")
+        
+        # Generate query embedding
+        query_embedding = self.encode_query(query)
+        
+        where = None
+        if hierarchical and self.hierarchy is not None:
+            with span("hierarchy_candidates"):
+                where = self.hierarchy.candidate_filter(query_embedding)
+        
+        # Search in vector database
+        with self.metrics.timer("rag_index_query_seconds"), span("chroma_query", filtered=where is not None):
+            results = self._query(query_embedding, top_k, where)
+        
+        # Format results
+        search_results = []
+        if results['documents'] and results['documents'][0]:
+            for i, (doc_id, doc, metadata, distance) in enumerate(zip(
+                results['ids'][0],
+                results['documents'][0],
+                results['metadatas'][0],
+                results['distances'][0]
+            )):
+                # Convert distance to similarity score
+                score = 1 - distance
+                
+                if score >= threshold:
+                    search_results.append({
+                        "id": doc_id,
+                        "content": doc,
+                        "metadata": metadata,
+                        "score": score,
+                        "document_type": metadata.get("file_type", "unknown")
+                    })
+        
+        logger.info("Search returned %d results for query: %s", len(search_results), query)
+        return search_results
+    
+    def encode_query(self, query: str) -> List[List[float]]:
+        """Embed a query, reusing recent embeddings"""
+        with self.metrics.timer("rag_query_encode_seconds"), span("encode_query") as encoding:
+            query_embedding = self.query_embeddings.get(query)
+            encoding.set(cached=query_embedding is not None)
+            if query_embedding is None:
+                query_embedding = self.projection.transform(self.embedding_model.encode([query]))
+                # Cached at embedding.reduction.dtype, half the size with float16
+                self.query_embeddings.put(query, query_embedding.astype(self.projection.dtype))
+            else:
+                self.metrics.inc("rag_query_cache_hits_total")
+        return query_embedding.astype(np.float32).tolist()
+    
+    def get_neighbors(self, results: List[Dict[str, Any]], window: int = 1) -> Dict[Tuple[str, str, Optional[int]], Dict[int, str]]:
+        """Fetch chunks adjacent to each search hit in a single lookup.
+        
+        Neighbours are matched on source file, file type, page and
+        chunk_index through a metadata filter, so no extra vector search is
+        needed. Returns chunk contents keyed by chunk_group().
+        """
+        wanted: Dict[Tuple[str, str, Optional[int]], set] = {}
+        for result in results:
+            key = chunk_group(result["metadata"])
+            if key is None:
+                continue
+            index = result["metadata"]["chunk_index"]
+            wanted.setdefault(key, set()).update(
+                i for i in range(index - window, index + window + 1) if i >= 0
+            )
+        
+        if not wanted:
+            return {}
+        
+        conditions = []
+        for (source, file_type, page_number), indexes in wanted.items():
+            # Same-named files of other folders are fetched too and sorted
+            # out by their chunk_group below
+            clauses = [
+                {"filename": Path(source).name},
+                {"file_type": file_type},
+                {"chunk_index": {"$in": sorted(indexes)}}
+            ]
+            if page_number is not None:
+                clauses.append({"page_number": page_number})
+            conditions.append({"$and": clauses})
+        where = conditions[0] if len(conditions) == 1 else {"$or": conditions}
+        
+        neighbors: Dict[Tuple[str, str, Optional[int]], Dict[int, str]] = {}
+        for collection in self._collections():
+            fetched = collection.get(where=where, include=["metadatas", "documents"])
+            for doc, metadata in zip(fetched["documents"], fetched["metadatas"]):
+                key = chunk_group(metadata)
+                if key is not None:
+                    neighbors.setdefault(key, {})[metadata["chunk_index"]] = doc
+        
+        return neighbors
+    
+    def get_collection_stats(self) -> int:
+        """Get number of documents in collection"""
+        return sum(collection.count() for collection in self._collections())
+    
+    def iter_chunks(self, batch_size: int = 1000, embeddings: bool = True, newest: Optional[int] = None):
+        """Stored chunks as Chroma get() pages of at most batch_size, shard by shard
+        
+        With newest, only the last that many chunks of each collection in
+        store order, which is the order they were added in.
+        """
+        include = ["documents", "metadatas"] + (["embeddings"] if embeddings else [])
+        for collection in self._collections():
+            offset = 0 if newest is None else max(collection.count() - newest, 0)
+            yield from collection_pages(collection, batch_size, include, offset)
+    
+    def export_columnar(self, folder: str, batch_size: Optional[int] = None,
+                        layout: Optional[str] = None) -> Dict[str, Any]:
+        """Stream every chunk with its embedding to columnar files.
+        
+        Writes Parquet (or Arrow IPC) when pyarrow is installed, else
+        embeddings.npy plus chunks.jsonl, one page of batch_size chunks
+        at a time, so memory does not grow with the collection.
+        manifest.json is written last and records the model and
+        projection the vectors come from.
+        """
+        if batch_size is None:
+            batch_size = self.config.get("vector_db.export.batch_size", 1000)
+        manifest_path = Path(folder) / "manifest.json"
+        if manifest_path.exists():
+            manifest_path.unlink()
+        
+        start = time.perf_counter()
+        total = self.get_collection_stats()
+        dimension = self.projection.dimension or self.embedding_model.get_sentence_embedding_dimension()
+        writer = create_columnar_writer(self.config, folder, total, dimension, layout)
+        rows = 0
+        try:
+            for page in self.iter_chunks(batch_size):
+                rows += len(page["ids"])
+                if rows > total:
+                    raise RuntimeError(f"Collection {self.collection_name} grew during export")
+                writer.write(page["ids"], page["documents"], page["metadatas"],
+                             np.asarray(page["embeddings"], dtype=np.float32))
+        finally:
+            files = writer.close()
+        if rows != total:
+            raise RuntimeError(f"Collection {self.collection_name} changed during export ({total} chunks, read {rows})")
+        
+        manifest = write_manifest(
+            folder,
+            layout=writer.name,
+            files={path.name: path.stat().st_size for path in files},
+            rows=rows,
+            dimension=dimension,
+            collection_name=self.collection_name,
+            embedding_model=self.config.get("embedding.model", "sentence-transformers/all-MiniLM-L6-v2"),
+            embedding_projection=self.projection.id
+        )
+        seconds = time.perf_counter() - start
+        logger.info(f"Exported {rows} chunks to {folder} ({writer.name}) in {seconds:.2f}s")
+        return {"rows": rows, "layout": writer.name, "bytes": sum(manifest["files"].values()), "seconds": seconds}
+    
+    def import_columnar(self, folder: str, batch_size: Optional[int] = None) -> int:
+        """Rebuild the collection from export_columnar files without embedding.
+        
+        Chunks go through write_documents, so they are routed to shards
+        and summarized like freshly embedded ones. The export must come
+        from the same model and projection, and the collection must be
+        empty.
+        """
+        if batch_size is None:
+            batch_size = self.config.get("vector_db.export.batch_size", 1000)
+        manifest = read_manifest(folder)
+        model = self.config.get("embedding.model", "sentence-transformers/all-MiniLM-L6-v2")
+        if manifest["embedding_model"] != model or manifest["embedding_projection"] != self.projection.id:
+            raise ValueError(f"Export holds {manifest['embedding_model']} vectors reduced with "
+                             f"{manifest['embedding_projection']}, the store uses {model} with {self.projection.id}")
+        if self.get_collection_stats():
+            raise ValueError(f"Collection {self.collection_name} is not empty")
+        
+        imported = 0
+        for ids, texts, metadatas, embeddings in read_columnar(folder, batch_size):
+            batch = ChunkBatch.from_documents([
+                {"id": doc_id, "content": text or "", "metadata": metadata}
+                for doc_id, text, metadata in zip(ids, texts, metadatas)
+            ])
+            imported += self.write_documents(batch, embeddings)
+        logger.info(f"Imported {imported} chunks from {folder}")
+        return imported
+    
+    def _collections(self) -> List[Any]:
+        """All collections holding chunks"""
+        return [self.collection]
+    
+    def _route(self, metadatas: List[Dict[str, Any]]) -> List[Any]:
+        """Collection each new chunk is written to"""
+        return [self.collection] * len(metadatas)
+    
+    def _query(self, query_embedding: List[List[float]], top_k: int, where: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+        """Nearest-neighbour query in Chroma's result format"""
+        return self.collection.query(
+            query_embeddings=query_embedding,
+            n_results=top_k,
+            where=where,
+            include=["metadatas", "documents", "distances"]
+        )
+
+
+def chunk_group(metadata: Dict[str, Any]) -> Optional[Tuple[str, str, Optional[int]]]:
+    """Key identifying the sequence of chunks a chunk belongs to"""
+    if metadata.get("chunk_index") is None:
+        return None
+    return (source_key(metadata), metadata.get("file_type"), metadata.get("page_number"))
\ No newline at end of file
@@ -0,0 +1,310 @@
+"""
+Folder watching for continuous indexing
+"""
+
+import ctypes
+import ctypes.util
+import os
+import select
+import struct
+import sys
+import threading
+import time
+from collections import deque
+from typing import List, Dict, Any, Optional, Tuple
+
+import numpy as np
+from src.core.job_queue import DONE
+from src.utils.file_handlers import FileScanner
+from src.utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+# inotify(7) event flags
+IN_MODIFY = 0x00000002
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_ISDIR = 0x40000000
+_WATCH_MASK = IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE | IN_MODIFY
+_EVENT = struct.Struct("iIII")
+
+MODIFIED = "modified"
+DELETED = "deleted"
+RESCAN = "rescan"
+
+
+class InotifySource:
+    """Change events for a directory tree from Linux inotify"""
+
+    name = "inotify"
+
+    def __init__(self, root: str):
+        if not sys.platform.startswith("linux"):
+            raise OSError("inotify is only available on Linux")
+        self._libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+        self.root = root
+        self.fd = self._libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        self._dirs: Dict[int, str] = {}
+        for dirpath, _, _ in os.walk(root):
+            self._watch(dirpath)
+
+    def _watch(self, path: str):
+        wd = self._libc.inotify_add_watch(self.fd, os.fsencode(path), _WATCH_MASK)
+        if wd < 0:
+            # Usually fs.inotify.max_user_watches; changes below go unnoticed
+            logger.warning(f"Cannot watch {path}: {os.strerror(ctypes.get_errno())}")
+            return
+        self._dirs[wd] = path
+
+    def _unwatch(self, path: str):
+        """Stop watching a directory tree that was moved away"""
+        prefix = os.path.join(path, "")
+        for wd, directory in list(self._dirs.items()):
+            if directory == path or directory.startswith(prefix):
+                # Watches follow the moved inode, their events would carry stale paths
+                self._libc.inotify_rm_watch(self.fd, wd)
+                del self._dirs[wd]
+
+    def read(self, timeout: float) -> List[Tuple[str, str]]:
+        """Wait up to timeout seconds and return (path, kind) events"""
+        ready, _, _ = select.select([self.fd], [], [], timeout)
+        if not ready:
+            return []
+
+        events = []
+        try:
+            data = os.read(self.fd, 1 << 16)
+        except BlockingIOError:
+            return []
+
+        offset = 0
+        while offset < len(data):
+            wd, mask, _, length = _EVENT.unpack_from(data, offset)
+            name = data[offset + _EVENT.size:offset + _EVENT.size + length].rstrip(b"\0")
+            offset += _EVENT.size + length
+
+            if mask & IN_Q_OVERFLOW:
+                events.append((self.root, RESCAN))
+                continue
+            if mask & IN_IGNORED:
+                self._dirs.pop(wd, None)
+                continue
+            directory = self._dirs.get(wd)
+            if directory is None:
+                continue
+            path = os.path.join(directory, os.fsdecode(name))
+
+            if mask & IN_ISDIR:
+                if mask & (IN_CREATE | IN_MOVED_TO):
+                    # Files may land in a new directory before its watch exists
+                    for dirpath, _, filenames in os.walk(path):
+                        self._watch(dirpath)
+                        events.extend((os.path.join(dirpath, f), MODIFIED) for f in filenames)
+                elif mask & IN_MOVED_FROM:
+                    # The files below are not listed; the rescan removes them
+                    self._unwatch(path)
+                    events.append((self.root, RESCAN))
+            elif mask & (IN_DELETE | IN_MOVED_FROM):
+                events.append((path, DELETED))
+            else:
+                events.append((path, MODIFIED))
+        return events
+
+    def close(self):
+        os.close(self.fd)
+
+
+class PollingSource:
+    """Change events from periodic directory snapshots"""
+
+    name = "polling"
+
+    def __init__(self, root: str, interval: float):
+        self.root = root
+        self.interval = interval
+        self._snapshot = self._scan()
+        self._next = time.monotonic() + interval
+
+    def _scan(self) -> Dict[str, Tuple[int, int]]:
+        snapshot = {}
+        for dirpath, _, filenames in os.walk(self.root):
+            for filename in filenames:
+                path = os.path.join(dirpath, filename)
+                try:
+                    stat = os.stat(path)
+                except OSError:
+                    continue
+                snapshot[path] = (stat.st_mtime_ns, stat.st_size)
+        return snapshot
+
+    def read(self, timeout: float) -> List[Tuple[str, str]]:
+        """Wait up to timeout seconds and return (path, kind) events"""
+        wait = self._next - time.monotonic()
+        if wait > timeout:
+            time.sleep(timeout)
+            return []
+        if wait > 0:
+            time.sleep(wait)
+        self._next = time.monotonic() + self.interval
+
+        snapshot = self._scan()
+        events = [(path, MODIFIED) for path, state in snapshot.items() if self._snapshot.get(path) != state]
+        events.extend((path, DELETED) for path in self._snapshot if path not in snapshot)
+        self._snapshot = snapshot
+        return events
+
+    def close(self):
+        pass
+
+
+class FolderWatcher:
+    """Keeps a collection in sync with a folder.
+
+    Created and modified files are indexed once they have been quiet for
+    ``watch.debounce_seconds``, deleted files are removed from the
+    collection. Freshness lag is measured from a file's last write (its
+    mtime) to the moment its chunks are searchable, for files that were
+    indexed successfully. Removals are timed separately, from the delete
+    event to the moment the file's chunks are gone.
+
+    When events were lost or a directory was moved out of the folder, the
+    folder is scanned again and, with the ingestion queue, files it still
+    lists that are gone from disk are removed from the collection.
+    """
+
+    def __init__(self, rag_system, folder: Optional[str] = None, tenant: Optional[str] = None):
+        config = rag_system.config
+        self.rag_system = rag_system
+        self.folder = os.path.abspath(folder or config.get("watch.folder", "./data/input"))
+        self.tenant = tenant
+        self.backend = config.get("watch.backend", "auto")
+        self.debounce = config.get("watch.debounce_seconds", 0.5)
+        self.poll_interval = config.get("watch.poll_interval_seconds", 1.0)
+        self.scanner = FileScanner(config)
+
+        self.source = None
+        self.files_indexed = 0
+        self.files_removed = 0
+        self.lags = deque(maxlen=config.get("watch.lag_samples", 1000))
+        self.removal_lags = deque(maxlen=self.lags.maxlen)
+        self._stop = threading.Event()
+
+    def _open_source(self):
+        if self.backend in ("auto", "inotify"):
+            try:
+                return InotifySource(self.folder)
+            except OSError as e:
+                if self.backend == "inotify":
+                    raise
+                logger.info(f"inotify unavailable ({e}), polling every {self.poll_interval}s")
+        return PollingSource(self.folder, self.poll_interval)
+
+    def run(self, initial_scan: bool = True):
+        """Watch until stop() is called; blocks the calling thread"""
+        os.makedirs(self.folder, exist_ok=True)
+        self.source = self._open_source()
+        logger.info(f"Watching {self.folder} ({self.source.name})")
+        if initial_scan:
+            self.rescan()
+
+        # path -> (kind, first event, last event)
+        pending: Dict[str, Tuple[str, float, float]] = {}
+        try:
+            while not self._stop.is_set():
+                for path, kind in self.source.read(self.debounce if pending else 0.5):
+                    now = time.time()
+                    if kind == RESCAN:
+                        logger.warning("Watch events were lost or a directory moved away, rescanning folder")
+                        self.rescan()
+                        continue
+                    if not self.scanner.accepts(path, self.folder):
+                        continue
+                    first = pending[path][1] if path in pending else now
+                    pending[path] = (kind, first, now)
+
+                now = time.time()
+                due = [path for path, (_, _, last) in pending.items() if now - last >= self.debounce]
+                if due:
+                    self._apply({path: pending.pop(path) for path in due})
+        finally:
+            self.source.close()
+
+    def stop(self):
+        self._stop.set()
+
+    def rescan(self):
+        """Remove queued files that are no longer on disk, then index the folder"""
+        jobs = self.rag_system.jobs
+        if jobs is not None:
+            prefix = os.path.join(self.folder, "")
+            gone = [path for path in jobs.paths(self.tenant) if path.startswith(prefix) and not os.path.exists(path)]
+            for path in gone:
+                self.rag_system.remove_file(path, self.tenant)
+            self.files_removed += len(gone)
+            if gone:
+                logger.info(f"Removed {len(gone)} files that left {self.folder}")
+        self.rag_system.process_folder(self.folder, self.tenant)
+
+    def _apply(self, events: Dict[str, Tuple[str, float, float]]):
+        """Index or remove a settled batch of files"""
+        changed = {}
+        for path, (kind, first, _) in events.items():
+            if kind == MODIFIED:
+                try:
+                    stat = os.stat(path)
+                except OSError:
+                    kind = DELETED
+                else:
+                    if self.scanner.accepts(path, self.folder, stat.st_size):
+                        changed[path] = stat.st_mtime
+            if kind == DELETED:
+                self.rag_system.remove_file(path, self.tenant)
+                self.files_removed += 1
+                self.removal_lags.append(time.time() - first)
+
+        if not changed:
+            return
+        paths = list(changed)
+        if self.rag_system.jobs is not None:
+            self.rag_system.jobs.enqueue(paths, self.tenant)
+            self.rag_system.run_jobs(paths=paths, tenant=self.tenant)
+            states = self.rag_system.jobs.states(paths, self.tenant)
+            indexed = [path for path in paths if states.get(path) == DONE]
+        else:
+            indexed = []
+            for path in paths:
+                self.rag_system.remove_file(path, self.tenant)
+                if self.rag_system.process_file(path, self.tenant)["success"]:
+                    indexed.append(path)
+
+        # Failed files are not searchable, their lag is not known yet
+        now = time.time()
+        for path in indexed:
+            lag = now - changed[path]
+            self.lags.append(lag)
+            logger.info(f"Indexed {path} {lag:.2f}s after it was written")
+        self.files_indexed += len(indexed)
+        if len(indexed) < len(paths):
+            logger.warning(f"{len(paths) - len(indexed)} changed files could not be indexed")
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Files handled and freshness lag percentiles in seconds"""
+        stats = {
+            "backend": self.source.name if self.source else None,
+            "files_indexed": self.files_indexed,
+            "files_removed": self.files_removed
+        }
+        for prefix, samples in (("lag", self.lags), ("removal_lag", self.removal_lags)):
+            if samples:
+                lags = np.array(samples)
+                stats[f"{prefix}_p50"] = float(np.percentile(lags, 50))
+                stats[f"{prefix}_p95"] = float(np.percentile(lags, 95))
+                stats[f"{prefix}_max"] = float(lags.max())
+        return stats
@@ -0,0 +1,223 @@
+"""
+Compact chunk batches for the ingestion path
+"""
+
+import sys
+import uuid
+from array import array
+from typing import List, Dict, Any, Iterable, Optional
+
+
+class ChunkBatch:
+    """Struct-of-arrays container for the chunks of one or more files.
+
+    Chunk text is not copied per chunk: each chunk is a (start, end) span
+    into a shared source buffer (a text file or a PDF page), so
+    overlapping chunks share their characters. Numeric metadata lives in
+    ``array`` columns, filenames, source paths and the few label values
+    (file_type, content_type, source, id kind) are interned once per batch, and rare
+    per-chunk metadata (layout boxes, table cells, provenance) goes into a
+    sparse ``extra`` dict. ``ingested_at`` stamps the chunks of one ingest
+    of a file, so compaction can tell a re-ingested file's chunks from
+    the ones it left behind.
+
+    ``to_documents``/``from_documents`` convert from and to the
+    ``{"id", "content", "metadata"}`` dicts used at the API boundary;
+    ``contents``, ``ids`` and ``metadatas`` produce the parallel lists
+    Chroma and the embedding model take.
+    """
+
+    __slots__ = ("buffers", "buffer_index", "starts", "ends", "names", "_name_codes",
+                 "file_code", "path_code", "file_type", "content_type", "source", "id_kind",
+                 "chunk_index", "page_number", "total_chunks", "ingested_at", "extra", "_ids")
+
+    def __init__(self):
+        self.buffers: List[str] = []
+        self.buffer_index = array("i")
+        self.starts = array("q")
+        self.ends = array("q")
+        # Interned strings; every string column stores codes into this table
+        self.names: List[str] = []
+        self._name_codes: Dict[str, int] = {}
+        self.file_code = array("i")
+        # Absolute path of the ingested file; file names repeat across folders
+        self.path_code = array("i")
+        self.file_type = array("i")
+        self.content_type = array("i")
+        self.source = array("i")
+        self.id_kind = array("i")
+        # -1 where the value does not apply
+        self.chunk_index = array("i")
+        self.page_number = array("i")
+        self.total_chunks = array("i")
+        # Epoch seconds of the ingest the chunk was written by, -1 before that
+        self.ingested_at = array("d")
+        self.extra: Dict[int, Dict[str, Any]] = {}
+        self._ids: Optional[List[str]] = None
+
+    def __len__(self) -> int:
+        return len(self.starts)
+
+    def code(self, value: Optional[str]) -> int:
+        """Intern a string, -1 for None"""
+        if value is None:
+            return -1
+        code = self._name_codes.get(value)
+        if code is None:
+            code = len(self.names)
+            self.names.append(sys.intern(value))
+            self._name_codes[value] = code
+        return code
+
+    def add_buffer(self, text: str) -> int:
+        """Register source text that chunks will point into"""
+        self.buffers.append(text)
+        return len(self.buffers) - 1
+
+    def append(self, buffer: int, start: int, end: int, filename: str, file_type: str,
+               content_type: Optional[str] = None, source: Optional[str] = None,
+               chunk_index: Optional[int] = None, page_number: Optional[int] = None,
+               total_chunks: Optional[int] = None, id_kind: str = "",
+               extra: Optional[Dict[str, Any]] = None, source_path: Optional[str] = None,
+               ingested_at: Optional[float] = None):
+        """Add a chunk spanning buffers[buffer][start:end]"""
+        self.buffer_index.append(buffer)
+        self.starts.append(start)
+        self.ends.append(end)
+        self.file_code.append(self.code(filename))
+        self.path_code.append(self.code(source_path))
+        self.file_type.append(self.code(file_type))
+        self.content_type.append(self.code(content_type))
+        self.source.append(self.code(source))
+        self.id_kind.append(self.code(id_kind))
+        self.chunk_index.append(-1 if chunk_index is None else chunk_index)
+        self.page_number.append(-1 if page_number is None else page_number)
+        self.total_chunks.append(-1 if total_chunks is None else total_chunks)
+        self.ingested_at.append(-1.0 if ingested_at is None else ingested_at)
+        if extra:
+            self.extra[len(self.starts) - 1] = extra
+        self._ids = None
+
+    def append_content(self, content: str, filename: str, file_type: str, **kwargs):
+        """Add a chunk whose text is its own buffer"""
+        self.append(self.add_buffer(content), 0, len(content), filename, file_type, **kwargs)
+
+    def set_source_path(self, source_path: str):
+        """Record the path every chunk was read from"""
+        self.path_code = array("i", [self.code(source_path)] * len(self))
+
+    def set_ingested_at(self, ingested_at: float):
+        """Stamp every chunk with the ingest that writes it"""
+        self.ingested_at = array("d", [ingested_at] * len(self))
+
+    def update_extra(self, row: int, **values):
+        """Set metadata values of one chunk"""
+        extra = dict(self.extra.get(row, {}))
+        extra.update(values)
+        self.extra[row] = extra
+
+    def content(self, row: int) -> str:
+        return self.buffers[self.buffer_index[row]][self.starts[row]:self.ends[row]]
+
+    def contents(self) -> List[str]:
+        return [self.content(row) for row in range(len(self))]
+
+    def filename(self, row: int) -> str:
+        return self.names[self.file_code[row]]
+
+    def metadata(self, row: int) -> Dict[str, Any]:
+        """Chunk metadata in the dict layout the processors used to build"""
+        metadata = {"filename": self.filename(row), "file_type": self.names[self.file_type[row]]}
+        if self.path_code[row] >= 0:
+            metadata["source_path"] = self.names[self.path_code[row]]
+        if self.page_number[row] >= 0:
+            metadata["page_number"] = self.page_number[row]
+        if self.chunk_index[row] >= 0:
+            metadata["chunk_index"] = self.chunk_index[row]
+        if self.total_chunks[row] >= 0:
+            metadata["total_chunks"] = self.total_chunks[row]
+        if self.ingested_at[row] >= 0:
+            metadata["ingested_at"] = self.ingested_at[row]
+        for key, column in (("content_type", self.content_type), ("source", self.source)):
+            if column[row] >= 0:
+                metadata[key] = self.names[column[row]]
+        if row in self.extra:
+            metadata.update(self.extra[row])
+        return metadata
+
+    def metadatas(self) -> List[Dict[str, Any]]:
+        return [self.metadata(row) for row in range(len(self))]
+
+    @property
+    def ids(self) -> List[str]:
+        """Chunk ids, generated on first use in the processors' id format"""
+        if self._ids is None:
+            ids = []
+            for row in range(len(self)):
+                kind = self.names[self.id_kind[row]]
+                index = self.chunk_index[row]
+                if index < 0:
+                    index = self.extra.get(row, {}).get("image_index", row)
+                page = self.page_number[row]
+                middle = f"page{page}_{kind}{index}" if page >= 0 else f"{index}"
+                ids.append(f"{self.filename(row)}_{middle}_{str(uuid.uuid4())[:8]}")
+            self._ids = ids
+        return self._ids
+
+    def set_ids(self, ids: List[str]):
+        if len(ids) != len(self):
+            raise ValueError("One id per chunk is required")
+        self._ids = list(ids)
+
+    def select(self, rows: Iterable[int]) -> "ChunkBatch":
+        """New batch with the given rows, sharing buffers and interned names"""
+        rows = list(rows)
+        batch = ChunkBatch()
+        batch.buffers = self.buffers
+        batch.names = self.names
+        batch._name_codes = self._name_codes
+        for name in ("buffer_index", "starts", "ends", "file_code", "path_code", "file_type", "content_type",
+                     "source", "id_kind", "chunk_index", "page_number", "total_chunks", "ingested_at"):
+            column = getattr(self, name)
+            setattr(batch, name, array(column.typecode, (column[row] for row in rows)))
+        batch.extra = {i: self.extra[row] for i, row in enumerate(rows) if row in self.extra}
+        if self._ids is not None:
+            batch._ids = [self._ids[row] for row in rows]
+        return batch
+
+    def sort_by_page(self) -> "ChunkBatch":
+        """Stable reorder by page number"""
+        return self.select(sorted(range(len(self)), key=lambda row: self.page_number[row]))
+
+    def to_documents(self) -> List[Dict[str, Any]]:
+        """Convert to the list of chunk dicts used at the API boundary"""
+        return [{"id": doc_id, "content": self.content(row), "metadata": self.metadata(row)}
+                for row, doc_id in enumerate(self.ids)]
+
+    @classmethod
+    def from_documents(cls, documents: List[Dict[str, Any]]) -> "ChunkBatch":
+        """Build a batch from chunk dicts, keeping their ids and metadata"""
+        batch = cls()
+        known = ("filename", "source_path", "file_type", "page_number", "chunk_index", "total_chunks",
+                 "content_type", "source", "ingested_at")
+        for doc in documents:
+            metadata = doc.get("metadata", {})
+            extra = {key: value for key, value in metadata.items() if key not in known}
+            batch.append_content(
+                doc["content"], metadata.get("filename", ""), metadata.get("file_type", "unknown"),
+                content_type=metadata.get("content_type"), source=metadata.get("source"),
+                chunk_index=metadata.get("chunk_index"), page_number=metadata.get("page_number"),
+                total_chunks=metadata.get("total_chunks"), extra=extra,
+                source_path=metadata.get("source_path"), ingested_at=metadata.get("ingested_at")
+            )
+        batch.set_ids([doc["id"] for doc in documents])
+        return batch
+
+
+def source_key(metadata: Dict[str, Any]) -> str:
+    """The file a chunk, summary or image came from.
+
+    Its absolute source path, or the bare file name for entries stored
+    before source paths were recorded.
+    """
+    return metadata.get("source_path") or metadata.get("filename", "")
@@ -0,0 +1,238 @@
+"""
+Columnar export files of stored chunks for offline analysis
+"""
+
+import gzip
+import json
+from abc import ABC, abstractmethod
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+from src.utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+EXPORT_FORMAT = "multimodal-rag-columnar"
+EXPORT_VERSION = 1
+# Metadata keys written as their own columns next to the full metadata JSON
+STRING_COLUMNS = ("filename", "file_type", "content_type", "source")
+INT_COLUMNS = ("page_number", "chunk_index", "total_chunks")
+
+Page = Tuple[List[str], List[Optional[str]], List[Dict[str, Any]], np.ndarray]
+
+
+class ColumnarWriter(ABC):
+    """Appends pages of chunks to export files"""
+
+    name = "base"
+
+    @abstractmethod
+    def write(self, ids: List[str], texts: List[Optional[str]], metadatas: List[Dict[str, Any]],
+              embeddings: np.ndarray):
+        """Append one page of chunks"""
+
+    @abstractmethod
+    def close(self) -> List[Path]:
+        """Finish the files and return their paths"""
+
+
+class _ArrowBase(ColumnarWriter):
+    """Shared schema of the Parquet and Arrow IPC writers.
+
+    One row per chunk: id, text, the common metadata keys as typed
+    columns, the full metadata as a JSON string and the embedding as a
+    fixed-size float32 list. Each page becomes one row group or record
+    batch, so memory stays at one page.
+    """
+
+    def __init__(self, dimension: int):
+        import pyarrow as pa
+        self._pa = pa
+        fields = [pa.field("id", pa.string()), pa.field("text", pa.string())]
+        fields += [pa.field(key, pa.string()) for key in STRING_COLUMNS]
+        fields += [pa.field(key, pa.int32()) for key in INT_COLUMNS]
+        fields += [pa.field("metadata", pa.string()),
+                   pa.field("embedding", pa.list_(pa.float32(), dimension))]
+        self.schema = pa.schema(fields)
+        self.dimension = dimension
+
+    def _record_batch(self, ids, texts, metadatas, embeddings):
+        pa = self._pa
+        arrays = [pa.array(ids, pa.string()), pa.array(texts, pa.string())]
+        arrays += [pa.array([metadata.get(key) for metadata in metadatas], pa.string()) for key in STRING_COLUMNS]
+        arrays += [pa.array([metadata.get(key) for metadata in metadatas], pa.int32()) for key in INT_COLUMNS]
+        arrays.append(pa.array([json.dumps(metadata) for metadata in metadatas], pa.string()))
+        values = pa.array(np.ascontiguousarray(embeddings, dtype=np.float32).ravel(), pa.float32())
+        arrays.append(pa.FixedSizeListArray.from_arrays(values, self.dimension))
+        return pa.RecordBatch.from_arrays(arrays, schema=self.schema)
+
+
+class ParquetWriter(_ArrowBase):
+    name = "parquet"
+
+    def __init__(self, folder: str, dimension: int, compression: Optional[str] = "zstd"):
+        super().__init__(dimension)
+        import pyarrow.parquet as pq
+        self.path = Path(folder) / "chunks.parquet"
+        self._writer = pq.ParquetWriter(str(self.path), self.schema, compression=compression or "none")
+
+    def write(self, ids, texts, metadatas, embeddings):
+        self._writer.write_batch(self._record_batch(ids, texts, metadatas, embeddings))
+
+    def close(self) -> List[Path]:
+        self._writer.close()
+        return [self.path]
+
+
+class ArrowWriter(_ArrowBase):
+    """Arrow IPC file; it can be memory-mapped without decoding"""
+
+    name = "arrow"
+
+    def __init__(self, folder: str, dimension: int, compression: Optional[str] = "zstd"):
+        super().__init__(dimension)
+        pa = self._pa
+        self.path = Path(folder) / "chunks.arrow"
+        self._sink = pa.OSFile(str(self.path), "wb")
+        options = pa.ipc.IpcWriteOptions(compression=compression if compression in ("zstd", "lz4") else None)
+        self._writer = pa.ipc.new_file(self._sink, self.schema, options=options)
+
+    def write(self, ids, texts, metadatas, embeddings):
+        self._writer.write_batch(self._record_batch(ids, texts, metadatas, embeddings))
+
+    def close(self) -> List[Path]:
+        self._writer.close()
+        self._sink.close()
+        return [self.path]
+
+
+class NumpyWriter(ColumnarWriter):
+    """embeddings.npy, written through a memory map, and chunks.jsonl.
+
+    Row i of the array belongs to line i of the JSONL file, which holds
+    the id, text and metadata. Needs the row count up front. Snapshots
+    use it with other file names, gzipped records (a records name ending
+    in .gz) and optionally float16 vectors; numpy_pages reads it back.
+    """
+
+    name = "npy"
+
+    def __init__(self, folder: str, rows: int, dimension: int, vectors_name: str = "embeddings.npy",
+                 records_name: str = "chunks.jsonl", dtype: str = "float32"):
+        self.vectors_path = Path(folder) / vectors_name
+        self.records_path = Path(folder) / records_name
+        self._vectors = np.lib.format.open_memmap(self.vectors_path, mode="w+", dtype=dtype,
+                                                  shape=(rows, dimension))
+        self._records = _open_records(self.records_path, "wt")
+        self._row = 0
+
+    def write(self, ids, texts, metadatas, embeddings):
+        end = self._row + len(ids)
+        if end > len(self._vectors):
+            raise RuntimeError(f"More than the expected {len(self._vectors)} rows were written")
+        self._vectors[self._row:end] = embeddings
+        for doc_id, text, metadata in zip(ids, texts, metadatas):
+            self._records.write(json.dumps({"id": doc_id, "text": text, "metadata": metadata}) + "\n")
+        self._row = end
+
+    def close(self) -> List[Path]:
+        self._vectors.flush()
+        del self._vectors
+        self._records.close()
+        return [self.vectors_path, self.records_path]
+
+
+def _open_records(path: Path, mode: str):
+    if path.suffix == ".gz":
+        return gzip.open(path, mode, encoding="utf-8", compresslevel=6)
+    return open(path, mode[0], encoding="utf-8")
+
+
+def create_columnar_writer(config, folder: str, rows: int, dimension: int,
+                           layout: Optional[str] = None) -> ColumnarWriter:
+    """Writer for vector_db.export.format; "auto" prefers Parquet and falls back to .npy + JSONL"""
+    if layout is None:
+        layout = config.get("vector_db.export.format", "auto")
+    compression = config.get("vector_db.export.compression", "zstd")
+    Path(folder).mkdir(parents=True, exist_ok=True)
+
+    if layout in ("auto", "parquet"):
+        try:
+            return ParquetWriter(folder, dimension, compression)
+        except ImportError as e:
+            if layout == "parquet":
+                raise
+            logger.info(f"pyarrow unavailable ({e}), exporting .npy and JSONL")
+    elif layout == "arrow":
+        return ArrowWriter(folder, dimension, compression)
+
+    if layout not in ("auto", "npy"):
+        raise ValueError(f"Unknown export format: {layout}")
+    return NumpyWriter(folder, rows, dimension)
+
+
+def write_manifest(folder: str, manifest_format: str = EXPORT_FORMAT, version: int = EXPORT_VERSION,
+                   **info) -> Dict[str, Any]:
+    """Write manifest.json, the marker of a finished export or snapshot"""
+    manifest = {"format": manifest_format, "version": version, "created_at": datetime.now().isoformat()}
+    manifest.update(info)
+    with open(Path(folder) / "manifest.json", "w") as f:
+        json.dump(manifest, f, indent=2)
+    return manifest
+
+
+def read_manifest(folder: str, manifest_format: str = EXPORT_FORMAT, version: int = EXPORT_VERSION) -> Dict[str, Any]:
+    """Manifest of a finished export (or snapshot, with its format and version)"""
+    path = Path(folder) / "manifest.json"
+    if not path.exists():
+        raise FileNotFoundError(f"{folder} holds no manifest; the export may not have finished")
+    with open(path) as f:
+        manifest = json.load(f)
+    if manifest.get("format") != manifest_format or manifest.get("version", 0) > version:
+        raise ValueError(f"Unsupported export format in {folder}")
+    return manifest
+
+
+def _arrow_page(batch) -> Page:
+    metadatas = [json.loads(value) for value in batch.column("metadata").to_pylist()]
+    column = batch.column("embedding")
+    embeddings = column.flatten().to_numpy(zero_copy_only=False).reshape(len(batch), column.type.list_size)
+    return batch.column("id").to_pylist(), batch.column("text").to_pylist(), metadatas, embeddings
+
+
+def read_columnar(folder: str, batch_size: int = 1000) -> Iterator[Page]:
+    """Pages of (ids, texts, metadatas, embeddings) from an export folder"""
+    manifest = read_manifest(folder)
+    layout = manifest["layout"]
+    if layout == "parquet":
+        import pyarrow.parquet as pq
+        for batch in pq.ParquetFile(str(Path(folder) / "chunks.parquet")).iter_batches(batch_size=batch_size):
+            yield _arrow_page(batch)
+    elif layout == "arrow":
+        import pyarrow as pa
+        with pa.memory_map(str(Path(folder) / "chunks.arrow")) as source:
+            reader = pa.ipc.open_file(source)
+            for index in range(reader.num_record_batches):
+                yield _arrow_page(reader.get_batch(index))
+    elif layout == "npy":
+        yield from numpy_pages(Path(folder) / "embeddings.npy", Path(folder) / "chunks.jsonl", batch_size)
+    else:
+        raise ValueError(f"Unknown export layout: {layout}")
+
+
+def numpy_pages(vectors_path: Path, records_path: Path, batch_size: int = 1000) -> Iterator[Page]:
+    """Pages of the files a NumpyWriter wrote, with float32 vectors"""
+    vectors = np.load(vectors_path, mmap_mode="r")
+    with _open_records(records_path, "rt") as f:
+        records = (json.loads(line) for line in f)
+        for start in range(0, len(vectors), batch_size):
+            page = [next(records) for _ in range(min(batch_size, len(vectors) - start))]
+            # Snapshots written before they shared this format used "document"
+            yield ([record["id"] for record in page],
+                   [record["text"] if "text" in record else record["document"] for record in page],
+                   [record["metadata"] for record in page],
+                   np.array(vectors[start:start + len(page)], dtype=np.float32))
+    del vectors
@@ -0,0 +1,131 @@
+"""
+Embedding dimension reduction and storage precision
+"""
+
+import zlib
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+import numpy as np
+
+from src.utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+METHODS = ("none", "pca", "truncate")
+
+
+class Projection:
+    """Maps model embeddings to the vectors the store keeps.
+
+    "pca" projects vectors on principal directions fitted from a corpus
+    sample (see fit_pca). "truncate" keeps the first dimensions, which
+    only works well for Matryoshka-trained models.
+    Reduced vectors are L2-normalized again. With dtype float16 they are
+    rounded to half precision as well, so stored and query vectors carry
+    the same precision. This is rounding only: Chroma keeps float32, so
+    the store is no smaller. The query cache holds half-size vectors and
+    snapshots of such a store are written as float16 without loss.
+
+    The same projection must be used for ingestion and queries; id names
+    it so a collection can record which one its vectors went through.
+    """
+
+    def __init__(self, method: str = "none", dimension: Optional[int] = None, dtype: str = "float32",
+                 components: Optional[np.ndarray] = None,
+                 info: Optional[Dict[str, Any]] = None):
+        if method not in METHODS:
+            raise ValueError(f"Unknown reduction method: {method}")
+        if dtype not in ("float32", "float16"):
+            raise ValueError(f"Unsupported embedding dtype: {dtype}")
+        if method == "pca" and components is None:
+            raise ValueError("PCA reduction needs fitted components")
+        if method == "truncate" and not dimension:
+            raise ValueError("Truncation needs a dimension")
+        self.method = method
+        self.dtype = np.dtype(dtype)
+        self.components = components
+        if components is not None:
+            dimension = components.shape[0]
+        self.dimension = dimension if method != "none" else None
+        self.info = info or {}
+
+    @property
+    def id(self) -> str:
+        if self.method == "none":
+            name = "none"
+        elif self.method == "truncate":
+            name = f"truncate-{self.dimension}"
+        else:
+            checksum = zlib.crc32(self.components.astype(np.float32).tobytes())
+            name = f"pca-{self.dimension}-{checksum:08x}"
+        return name if self.dtype == np.float32 else f"{name}-{self.dtype.name}"
+
+    def transform(self, embeddings) -> np.ndarray:
+        """Project and round a vector or a (rows, dimension) array; returns float32"""
+        vectors = np.asarray(embeddings, dtype=np.float32)
+        if self.method != "none":
+            single = vectors.ndim == 1
+            vectors = vectors[None, :] if single else vectors
+            if self.method == "pca":
+                vectors = vectors @ self.components.T
+            else:
+                vectors = vectors[:, :self.dimension]
+            vectors = vectors / np.clip(np.linalg.norm(vectors, axis=1, keepdims=True), 1e-12, None)
+            vectors = vectors[0] if single else vectors
+        if self.dtype != np.float32:
+            vectors = vectors.astype(self.dtype).astype(np.float32)
+        return vectors
+
+    def save(self, path: str):
+        """Write a fitted PCA projection as .npz"""
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        with open(path, "wb") as f:
+            np.savez(f, components=self.components,
+                     explained_variance=np.asarray(self.info.get("explained_variance", 0.0)),
+                     model=np.asarray(self.info.get("model", "")))
+
+    @classmethod
+    def load(cls, path: str, dtype: str = "float32") -> "Projection":
+        with np.load(path) as data:
+            info = {"explained_variance": float(data["explained_variance"]), "model": str(data["model"])}
+            return cls("pca", dtype=dtype, components=data["components"].astype(np.float32), info=info)
+
+
+def fit_pca(embeddings: np.ndarray, dimension: int, model: str = "") -> Projection:
+    """Principal directions of a sample of model embeddings.
+
+    The vectors are not centered: sentence embeddings share a large
+    common direction, and removing it before renormalizing reorders
+    cosine neighbours. Projecting on the top eigenvectors of the second
+    moment keeps the inner products up to the energy left out.
+    """
+    sample = np.asarray(embeddings, dtype=np.float64)
+    if dimension >= sample.shape[1]:
+        raise ValueError(f"Target dimension {dimension} is not below the model's {sample.shape[1]}")
+    if len(sample) < dimension:
+        raise ValueError(f"Need at least {dimension} sample vectors, got {len(sample)}")
+    # Largest eigenvalues first
+    eigenvalues, eigenvectors = np.linalg.eigh(sample.T @ sample / len(sample))
+    order = np.argsort(eigenvalues)[::-1][:dimension]
+    explained = float(eigenvalues[order].sum() / eigenvalues.sum())
+    return Projection("pca", components=eigenvectors[:, order].T.astype(np.float32),
+                      info={"explained_variance": explained, "model": model})
+
+
+def load_projection(config) -> Projection:
+    """Projection configured under embedding.reduction"""
+    method = config.get("embedding.reduction.method", "none")
+    dtype = config.get("embedding.reduction.dtype", "float32")
+    if method == "pca":
+        path = config.get("embedding.reduction.path", "./data/projection.npz")
+        if not Path(path).exists():
+            raise FileNotFoundError(f"No fitted projection at {path}; fit one with benchmarks/embedding_reduction.py --save")
+        projection = Projection.load(path, dtype)
+        model = config.get("embedding.model", "sentence-transformers/all-MiniLM-L6-v2")
+        if projection.info["model"] and projection.info["model"] != model:
+            raise ValueError(f"Projection {path} was fitted for {projection.info['model']}, not {model}")
+        logger.info(f"Reducing embeddings to {projection.dimension} dimensions "
+                    f"({projection.info['explained_variance']:.1%} of variance kept)")
+        return projection
+    return Projection(method, config.get("embedding.reduction.dimension", None), dtype)
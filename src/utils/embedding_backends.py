@@ -0,0 +1,299 @@
+"""
+Text embedding backends
+"""
+
+import inspect
+import json
+import os
+import re
+from pathlib import Path
+from typing import Any, List, Optional, Union
+
+import numpy as np
+from src.utils.hashing_embedder import is_hashing_model, hashing_embedder
+from src.utils.logger import setup_logger
+from src.utils.tracing import span, traced_methods
+
+logger = setup_logger(__name__)
+
+# Modules of a SentenceTransformer pipeline the ONNX backend reproduces
+_EXPORTABLE = ("Transformer", "Pooling", "Normalize")
+# Encoder architectures onnxruntime's BERT fusions apply to
+_FUSABLE = ("bert", "roberta", "xlm-roberta", "distilbert", "mpnet")
+
+
+class EmbeddingBackend:
+    """Interface shared by embedding engines, modelled on SentenceTransformer"""
+
+    name = "base"
+    max_seq_length = 512
+
+    def encode(self, sentences: Union[str, List[str]], batch_size: int = 32, **kwargs) -> np.ndarray:
+        raise NotImplementedError
+
+    def get_sentence_embedding_dimension(self) -> int:
+        raise NotImplementedError
+
+    def count_tokens(self, texts: List[str]) -> List[int]:
+        """Untruncated token counts, special tokens included"""
+        # About four characters per token for English wordpieces
+        return [len(text) // 4 + 2 for text in texts]
+
+    def close(self):
+        """Release engine resources"""
+
+
+class SentenceTransformerBackend(EmbeddingBackend):
+    """The PyTorch SentenceTransformer, also used for CLIP image embeddings"""
+
+    name = "sentence_transformers"
+
+    def __init__(self, model_name: str, threads: Optional[int] = None):
+        if threads:
+            import torch
+            torch.set_num_threads(threads)
+        from sentence_transformers import SentenceTransformer
+        self.model = SentenceTransformer(model_name)
+        # Traces split encode into tokenization and the forward pass
+        traced_methods(self.model, "tokenize", "forward")
+        self.max_seq_length = self.model.max_seq_length
+        self.tokenizer = getattr(self.model, "tokenizer", None)
+
+    def encode(self, sentences, batch_size: int = 32, **kwargs) -> np.ndarray:
+        return self.model.encode(sentences, batch_size=batch_size, **kwargs)
+
+    def count_tokens(self, texts: List[str]) -> List[int]:
+        if self.tokenizer is None:
+            return super().count_tokens(texts)
+        encoded = self.tokenizer(list(texts), add_special_tokens=True, truncation=False, verbose=False)
+        return [len(ids) for ids in encoded["input_ids"]]
+
+    def get_sentence_embedding_dimension(self) -> int:
+        return self.model.get_sentence_embedding_dimension()
+
+
+class OnnxBackend(EmbeddingBackend):
+    """ONNX Runtime inference of an exported SentenceTransformer.
+
+    The transformer is exported once to embedding.onnx.cache_dir along
+    with its fast tokenizer, and pooling/normalization are redone in
+    NumPy. With quantize, weights are converted to int8 by dynamic
+    quantization (also cached). Only Transformer -> Pooling -> Normalize
+    pipelines are exported; anything else falls back to PyTorch.
+    """
+
+    name = "onnx"
+
+    def __init__(self, model_name: str, cache_dir: str, quantize: bool = False, threads: Optional[int] = None):
+        import onnxruntime as ort
+        from tokenizers import Tokenizer
+
+        folder = export_onnx(model_name, Path(cache_dir) / _folder_name(model_name))
+        with open(folder / "embedding.json") as f:
+            self.settings = json.load(f)
+        model_path = folder / "model.onnx"
+        if quantize:
+            model_path = quantize_onnx(folder)
+            self.name = "onnx-int8"
+
+        options = ort.SessionOptions()
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        if threads:
+            options.intra_op_num_threads = threads
+            options.inter_op_num_threads = 1
+        self.session = ort.InferenceSession(str(model_path), options, providers=["CPUExecutionProvider"])
+        self.inputs = [i.name for i in self.session.get_inputs()]
+
+        self.max_seq_length = self.settings["max_seq_length"]
+        self.tokenizer = Tokenizer.from_file(str(folder / "tokenizer.json"))
+        self.tokenizer.enable_truncation(max_length=self.max_seq_length)
+        self.tokenizer.enable_padding(pad_id=self.settings["pad_id"], pad_token=self.settings["pad_token"])
+        # Same tokenizer without truncation or padding, to measure texts
+        self.counter = Tokenizer.from_file(str(folder / "tokenizer.json"))
+        self.counter.no_truncation()
+        self.counter.no_padding()
+
+    def get_sentence_embedding_dimension(self) -> int:
+        return self.settings["dimension"]
+
+    def encode(self, sentences, batch_size: int = 32, **kwargs) -> np.ndarray:
+        single = isinstance(sentences, str)
+        texts = [sentences] if single else list(sentences)
+        embeddings = np.zeros((len(texts), self.settings["dimension"]), dtype=np.float32)
+        # Batch texts of similar length to limit padding, as SentenceTransformer does
+        order = np.argsort([-len(text) for text in texts], kind="stable")
+        for start in range(0, len(texts), batch_size):
+            rows = order[start:start + batch_size]
+            embeddings[rows] = self._encode_batch([texts[i] for i in rows])
+        return embeddings[0] if single else embeddings
+
+    def count_tokens(self, texts: List[str]) -> List[int]:
+        return [len(encoding.ids) for encoding in self.counter.encode_batch(list(texts))]
+
+    def _encode_batch(self, texts: List[str]) -> np.ndarray:
+        with span("OnnxBackend.tokenize", texts=len(texts)):
+            encoded = self.tokenizer.encode_batch(texts)
+            columns = {
+                "input_ids": np.array([e.ids for e in encoded], dtype=np.int64),
+                "attention_mask": np.array([e.attention_mask for e in encoded], dtype=np.int64),
+                "token_type_ids": np.array([e.type_ids for e in encoded], dtype=np.int64)
+            }
+        with span("OnnxBackend.forward"):
+            tokens = self.session.run(None, {name: columns[name] for name in self.inputs})[0]
+
+        mask = columns["attention_mask"][:, :, None].astype(np.float32)
+        pooling = self.settings["pooling"]
+        if pooling == "cls":
+            pooled = tokens[:, 0]
+        elif pooling == "max":
+            pooled = np.where(mask > 0, tokens, -1e9).max(axis=1)
+        else:
+            pooled = (tokens * mask).sum(axis=1) / np.clip(mask.sum(axis=1), 1e-9, None)
+        if self.settings["normalize"]:
+            pooled = pooled / np.clip(np.linalg.norm(pooled, axis=1, keepdims=True), 1e-12, None)
+        return pooled
+
+
+def _folder_name(model_name: str) -> str:
+    return re.sub(r"[^A-Za-z0-9_.-]+", "__", model_name.strip("/"))
+
+
+def _pooling_mode(module) -> str:
+    """Pooling of a sentence_transformers Pooling module, across library versions"""
+    if hasattr(module, "get_pooling_mode_str"):
+        return module.get_pooling_mode_str()
+    mode = module.get_config_dict().get("pooling_mode")
+    if isinstance(mode, (list, tuple)):
+        mode = "+".join(mode)
+    return str(mode)
+
+
+def export_onnx(model_name: str, folder: Path) -> Path:
+    """Export the model's transformer and tokenizer to folder, once"""
+    if (folder / "model.onnx").exists() and (folder / "embedding.json").exists():
+        return folder
+
+    import torch
+    from sentence_transformers import SentenceTransformer
+
+    model = SentenceTransformer(model_name, device="cpu")
+    modules = list(model)
+    kinds = [type(module).__name__ for module in modules]
+    if kinds[:2] != ["Transformer", "Pooling"] or any(kind not in _EXPORTABLE for kind in kinds):
+        raise ValueError(f"Unsupported module layout for ONNX export: {kinds}")
+    pooling = _pooling_mode(modules[1])
+    if pooling not in ("mean", "cls", "max"):
+        raise ValueError(f"Unsupported pooling for ONNX export: {pooling}")
+    tokenizer = model.tokenizer
+    if not getattr(tokenizer, "is_fast", False):
+        raise ValueError("ONNX export needs a fast (tokenizers) tokenizer")
+
+    logger.info(f"Exporting {model_name} to ONNX in {folder}")
+    folder.mkdir(parents=True, exist_ok=True)
+    tokenizer.save_pretrained(str(folder))
+
+    encoded = tokenizer(["An example sentence to trace the model with"], return_tensors="pt")
+    names = [name for name in ("input_ids", "attention_mask", "token_type_ids") if name in encoded]
+    transformer = modules[0].auto_model.eval()
+    # Plain attention exports to a graph ONNX Runtime can fuse
+    if hasattr(transformer, "set_attn_implementation"):
+        try:
+            transformer.set_attn_implementation("eager")
+        except Exception as e:
+            logger.debug("Keeping attention implementation: %s", e)
+
+    class TokenEmbeddings(torch.nn.Module):
+        def __init__(self):
+            super().__init__()
+            self.transformer = transformer
+
+        def forward(self, *inputs):
+            return self.transformer(**dict(zip(names, inputs)), return_dict=False)[0]
+
+    options = {
+        "input_names": names,
+        "output_names": ["token_embeddings"],
+        "dynamic_axes": {name: {0: "batch", 1: "sequence"} for name in names + ["token_embeddings"]},
+        "opset_version": 17,
+        "do_constant_folding": True
+    }
+    # Newer torch defaults to the dynamo exporter, which needs onnxscript
+    if "dynamo" in inspect.signature(torch.onnx.export).parameters:
+        options["dynamo"] = False
+    partial = folder / "model.onnx.partial"
+    with torch.no_grad():
+        torch.onnx.export(TokenEmbeddings(), tuple(encoded[name] for name in names), str(partial), **options)
+    _optimize(partial, transformer.config)
+    os.replace(partial, folder / "model.onnx")
+
+    settings = {
+        "model": model_name,
+        "pooling": pooling,
+        "normalize": "Normalize" in kinds,
+        "max_seq_length": model.max_seq_length,
+        "dimension": transformer.config.hidden_size,
+        "pad_id": tokenizer.pad_token_id,
+        "pad_token": tokenizer.pad_token
+    }
+    with open(folder / "embedding.json", "w") as f:
+        json.dump(settings, f, indent=2)
+    return folder
+
+
+def _optimize(path: Path, model_config):
+    """Fuse attention, GELU and layer norms of BERT-style encoders in place"""
+    if model_config.model_type not in _FUSABLE:
+        return
+    try:
+        from onnxruntime.transformers import optimizer
+        optimized = optimizer.optimize_model(str(path), model_type="bert",
+                                             num_heads=model_config.num_attention_heads,
+                                             hidden_size=model_config.hidden_size)
+        optimized.save_model_to_file(str(path))
+        logger.info(f"Fused operators: {optimized.get_fused_operator_statistics()}")
+    except Exception as e:
+        logger.warning(f"Skipping ONNX graph fusion: {e}")
+
+
+def quantize_onnx(folder: Path) -> Path:
+    """int8 dynamic quantization of folder/model.onnx, cached next to it"""
+    target = folder / "model_int8.onnx"
+    if not target.exists():
+        from onnx import TensorProto
+        from onnxruntime.quantization import QuantType, quantize_dynamic
+        logger.info(f"Quantizing {folder / 'model.onnx'} to int8")
+        partial = folder / "model_int8.onnx.partial"
+        # Shape inference cannot type the outputs of fused contrib operators
+        quantize_dynamic(str(folder / "model.onnx"), str(partial), weight_type=QuantType.QInt8,
+                         extra_options={"DefaultTensorType": TensorProto.FLOAT})
+        os.replace(partial, target)
+    return target
+
+
+def create_embedding_backend(config, model_name: Optional[str] = None, backend: Optional[str] = None) -> Any:
+    """Build the configured backend, SentenceTransformer by default.
+
+    "onnx" and "auto" are opt-in: they export the model to ONNX on first
+    use, whose vectors differ slightly from PyTorch's. "auto" prefers ONNX
+    and falls back to SentenceTransformer.
+    """
+    if model_name is None:
+        model_name = config.get("embedding.model", "sentence-transformers/all-MiniLM-L6-v2")
+    if backend is None:
+        backend = config.get("embedding.backend", "sentence_transformers")
+    if is_hashing_model(model_name):
+        return hashing_embedder(model_name)
+    threads = config.get("embedding.threads", None)
+
+    if backend in ("auto", "onnx"):
+        try:
+            return OnnxBackend(model_name, config.get("embedding.onnx.cache_dir", "./data/onnx_models"),
+                               config.get("embedding.onnx.quantize", False), threads)
+        except Exception as e:
+            if backend == "onnx":
+                raise
+            logger.info(f"ONNX backend unavailable ({e}), using SentenceTransformer")
+
+    if backend not in ("auto", "sentence_transformers"):
+        raise ValueError(f"Unknown embedding backend: {backend}")
+    return SentenceTransformerBackend(model_name, threads)
@@ -0,0 +1,120 @@
+"""
+File discovery for ingestion
+"""
+
+import fnmatch
+import os
+import re
+from typing import Dict, Any, Iterator, List, Optional
+
+from src.utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+
+class FileScanner:
+    """Single-pass directory walk that yields ingestible files.
+
+    Every directory is listed once with ``os.scandir``. Entries are
+    filtered by name first (hidden files, ``processing.ignore_patterns``,
+    extension), so only files that pass are stat'ed for the
+    ``processing.max_file_size_mb`` check, and nothing is opened.
+    """
+
+    def __init__(self, config):
+        self.extensions = {ext.lower() for ext in config.get(
+            "processing.supported_extensions", [".txt", ".pdf", ".png", ".jpg", ".jpeg"])}
+        max_size_mb = config.get("processing.max_file_size_mb", 10)
+        self.max_size = int(max_size_mb * 1024 * 1024) if max_size_mb else None
+        self.include_hidden = config.get("processing.include_hidden", False)
+        self.follow_symlinks = config.get("processing.follow_symlinks", False)
+
+        patterns = config.get("processing.ignore_patterns", []) or []
+        # One compiled regex instead of an fnmatch call per pattern and entry
+        self._ignore = re.compile("|".join(fnmatch.translate(p) for p in patterns)) if patterns else None
+        self.stats = self._new_stats()
+
+    @staticmethod
+    def _new_stats() -> Dict[str, Any]:
+        return {
+            "directories": 0,
+            "entries": 0,
+            "matched": 0,
+            "skipped_hidden": 0,
+            "skipped_ignored": 0,
+            "skipped_extension": 0,
+            "skipped_size": 0,
+            "errors": 0,
+            "by_extension": {}
+        }
+
+    def scan(self, root: str) -> Iterator[str]:
+        """Yield paths of files under root that should be ingested"""
+        self.stats = self._new_stats()
+        stack: List[str] = [root]
+
+        while stack:
+            directory = stack.pop()
+            try:
+                with os.scandir(directory) as entries:
+                    subdirectories = []
+                    for entry in entries:
+                        self.stats["entries"] += 1
+                        if not self._name_ok(entry.name):
+                            continue
+                        try:
+                            if entry.is_dir(follow_symlinks=self.follow_symlinks):
+                                subdirectories.append(entry.path)
+                                continue
+                            if not entry.is_file(follow_symlinks=self.follow_symlinks):
+                                continue
+                            ext = os.path.splitext(entry.name)[1].lower()
+                            if ext not in self.extensions:
+                                self.stats["skipped_extension"] += 1
+                                continue
+                            if self.max_size is not None and entry.stat().st_size > self.max_size:
+                                self.stats["skipped_size"] += 1
+                                logger.debug(f"Skipping {entry.path}: larger than the size limit")
+                                continue
+                        except OSError as e:
+                            self.stats["errors"] += 1
+                            logger.warning(f"Cannot read {entry.path}: {e}")
+                            continue
+
+                        self.stats["matched"] += 1
+                        self.stats["by_extension"][ext] = self.stats["by_extension"].get(ext, 0) + 1
+                        yield entry.path
+            except OSError as e:
+                self.stats["errors"] += 1
+                logger.warning(f"Cannot list {directory}: {e}")
+                continue
+
+            self.stats["directories"] += 1
+            # Reversed so directories are visited in listing order
+            stack.extend(reversed(subdirectories))
+
+    def accepts(self, path: str, root: Optional[str] = None, size: Optional[int] = None) -> bool:
+        """Apply the scan filters to a single path, e.g. from a watch event.
+
+        With root, every directory between root and the file is checked as
+        well, as scan() would never have descended into a filtered one.
+        """
+        relative = os.path.relpath(path, root) if root else os.path.basename(path)
+        for part in relative.split(os.sep):
+            if not self._name_ok(part, count=False):
+                return False
+        if os.path.splitext(path)[1].lower() not in self.extensions:
+            return False
+        return size is None or self.max_size is None or size <= self.max_size
+
+    def _name_ok(self, name: str, count: bool = True) -> bool:
+        """Hidden and ignore-pattern checks on a bare file or directory name"""
+        if not self.include_hidden and name.startswith("."):
+            if count:
+                self.stats["skipped_hidden"] += 1
+            return False
+        if self._ignore is not None and self._ignore.match(name):
+            if count:
+                self.stats["skipped_ignored"] += 1
+            return False
+        return True
@@ -0,0 +1,68 @@
+"""
+Deterministic hashing embedder for offline runs
+"""
+
+import re
+import zlib
+from typing import List, Union
+
+import numpy as np
+
+_TOKEN = re.compile(r"\w+")
+
+
+class HashingEmbedder:
+    """Stand-in for a SentenceTransformer that needs no weights or network.
+
+    Words and word bigrams are hashed into a fixed number of signed
+    buckets with sublinear term frequency, then L2-normalized. Vectors
+    only capture lexical overlap, but they are identical on every machine
+    and every run, which is what benchmarks and offline checks need.
+    Select it with ``embedding.model: hashing`` or ``hashing-<dimension>``.
+    """
+
+    name = "hashing"
+
+    def __init__(self, dimension: int = 384):
+        self.dimension = dimension
+        # Texts of any length are hashed in full
+        self.max_seq_length = None
+
+    def get_sentence_embedding_dimension(self) -> int:
+        return self.dimension
+
+    def count_tokens(self, texts: List[str]) -> List[int]:
+        return [len(_TOKEN.findall(text)) for text in texts]
+
+    def _embed(self, text: str, out: np.ndarray):
+        tokens = _TOKEN.findall(text.lower())
+        features = tokens + [f"{a} {b}" for a, b in zip(tokens, tokens[1:])]
+        counts = {}
+        for feature in features:
+            counts[feature] = counts.get(feature, 0) + 1
+        for feature, count in counts.items():
+            h = zlib.crc32(feature.encode("utf-8"))
+            sign = 1.0 if h & 0x80000000 else -1.0
+            out[h % self.dimension] += sign * (1.0 + np.log(count))
+        norm = np.linalg.norm(out)
+        if norm:
+            out /= norm
+
+    def encode(self, sentences: Union[str, List[str]], batch_size: int = 32, **kwargs) -> np.ndarray:
+        """Embed one string or a list of strings, like SentenceTransformer.encode"""
+        single = isinstance(sentences, str)
+        texts = [sentences] if single else list(sentences)
+        embeddings = np.zeros((len(texts), self.dimension), dtype=np.float32)
+        for i, text in enumerate(texts):
+            self._embed(str(text), embeddings[i])
+        return embeddings[0] if single else embeddings
+
+
+def is_hashing_model(model_name: str) -> bool:
+    return model_name == "hashing" or model_name.startswith("hashing-")
+
+
+def hashing_embedder(model_name: str) -> HashingEmbedder:
+    """Embedder for a "hashing" or "hashing-<dimension>" model name"""
+    _, _, dimension = model_name.partition("-")
+    return HashingEmbedder(int(dimension) if dimension else 384)
@@ -0,0 +1,158 @@
+"""
+Image preprocessing ahead of OCR
+"""
+
+from typing import Optional, Tuple
+
+import numpy as np
+from PIL import Image
+from src.utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+
+class ImagePreprocessor:
+    """Prepares images for Tesseract.
+
+    Steps, all driven by ``ocr.preprocessing.*``: skip images that look
+    text-free, crop to the text-bearing region, resample to a target DPI,
+    deskew and binarize. Analysis runs on a small grayscale preview, so
+    the cost is independent of the input resolution.
+    """
+
+    def __init__(self, config):
+        self.enabled = config.get("ocr.preprocessing.enabled", True)
+        self.target_dpi = config.get("ocr.preprocessing.target_dpi", 300)
+        self.assumed_dpi = config.get("ocr.preprocessing.assumed_dpi", 150)
+        self.max_side = config.get("ocr.preprocessing.max_side", 4000)
+        self.preview_side = config.get("ocr.preprocessing.preview_side", 512)
+        self.skip_blank = config.get("ocr.preprocessing.skip_blank", True)
+        self.min_variance = config.get("ocr.preprocessing.min_variance", 100.0)
+        self.min_edge_density = config.get("ocr.preprocessing.min_edge_density", 0.005)
+        self.edge_threshold = config.get("ocr.preprocessing.edge_threshold", 40)
+        self.crop = config.get("ocr.preprocessing.crop", True)
+        self.deskew = config.get("ocr.preprocessing.deskew", True)
+        self.max_skew = config.get("ocr.preprocessing.max_skew_degrees", 5.0)
+        self.binarize = config.get("ocr.preprocessing.binarize", True)
+
+    def prepare(self, image: Image.Image) -> Optional[Image.Image]:
+        """Return the image to OCR, or None if it carries no text"""
+        if image.mode != 'L':
+            image = image.convert('L')
+        if not self.enabled:
+            return image
+
+        preview, preview_scale = self._preview(image)
+        edges = self._edge_map(preview)
+
+        if self.skip_blank and not self.has_text(preview, edges):
+            return None
+
+        if self.crop:
+            box = self._text_box(edges, preview_scale, image.size)
+            if box is not None:
+                image = image.crop(box)
+                preview, preview_scale = self._preview(image)
+
+        image = self._resample(image)
+
+        if self.deskew:
+            angle = self._skew_angle(preview)
+            if abs(angle) >= 0.25:
+                image = image.rotate(angle, resample=Image.BILINEAR, expand=True, fillcolor=255)
+
+        if self.binarize:
+            image = self._binarize(image)
+
+        return image
+
+    def has_text(self, preview: np.ndarray, edges: Optional[np.ndarray] = None) -> bool:
+        """Cheap variance/edge-density test for text-free images"""
+        if preview.var() < self.min_variance:
+            return False
+        if edges is None:
+            edges = self._edge_map(preview)
+        return edges.mean() >= self.min_edge_density
+
+    def _preview(self, image: Image.Image) -> Tuple[np.ndarray, float]:
+        """Downscaled grayscale array and its scale relative to the image"""
+        scale = min(1.0, self.preview_side / max(image.size))
+        if scale < 1.0:
+            size = (max(1, int(image.width * scale)), max(1, int(image.height * scale)))
+            image = image.resize(size, Image.BOX)
+        return np.asarray(image, dtype=np.float32), scale
+
+    def _edge_map(self, preview: np.ndarray) -> np.ndarray:
+        """Boolean map of strong horizontal or vertical intensity changes"""
+        edges = np.zeros(preview.shape, dtype=bool)
+        edges[:, 1:] |= np.abs(np.diff(preview, axis=1)) > self.edge_threshold
+        edges[1:, :] |= np.abs(np.diff(preview, axis=0)) > self.edge_threshold
+        return edges
+
+    def _text_box(self, edges: np.ndarray, scale: float, size: Tuple[int, int],
+                  block: int = 8, margin: int = 2) -> Optional[Tuple[int, int, int, int]]:
+        """Bounding box (in image pixels) of blocks dense in edges"""
+        h, w = edges.shape
+        bh, bw = h // block, w // block
+        if bh == 0 or bw == 0:
+            return None
+        density = edges[:bh * block, :bw * block].reshape(bh, block, bw, block).mean(axis=(1, 3))
+        rows = np.flatnonzero((density > self.min_edge_density * 4).any(axis=1))
+        cols = np.flatnonzero((density > self.min_edge_density * 4).any(axis=0))
+        if rows.size == 0 or cols.size == 0:
+            return None
+
+        top = max(0, rows[0] - margin) * block / scale
+        bottom = min(bh, rows[-1] + 1 + margin) * block / scale
+        left = max(0, cols[0] - margin) * block / scale
+        right = min(bw, cols[-1] + 1 + margin) * block / scale
+        # Keep whatever lies beyond the last full preview block
+        if rows[-1] + 1 + margin >= bh:
+            bottom = size[1]
+        if cols[-1] + 1 + margin >= bw:
+            right = size[0]
+        return int(left), int(top), int(min(right, size[0])), int(min(bottom, size[1]))
+
+    def _resample(self, image: Image.Image) -> Image.Image:
+        """Scale the image towards the target DPI"""
+        dpi = image.info.get("dpi", (self.assumed_dpi,))[0] or self.assumed_dpi
+        scale = self.target_dpi / float(dpi)
+        scale = min(scale, self.max_side / max(image.size))
+        if abs(scale - 1.0) < 0.1:
+            return image
+        size = (max(1, int(image.width * scale)), max(1, int(image.height * scale)))
+        return image.resize(size, Image.LANCZOS if scale > 1 else Image.BOX)
+
+    def _skew_angle(self, preview: np.ndarray, step: float = 0.5) -> float:
+        """Projection-profile skew estimate: the angle whose row sums are sharpest"""
+        ink = Image.fromarray((preview < self._otsu(preview)).astype(np.uint8) * 255)
+        best_angle, best_score = 0.0, -1.0
+        for angle in np.arange(-self.max_skew, self.max_skew + step, step):
+            profile = np.asarray(ink.rotate(angle, resample=Image.NEAREST), dtype=np.float32).sum(axis=1)
+            score = float(np.square(np.diff(profile)).sum())
+            if score > best_score:
+                best_angle, best_score = float(angle), score
+        return best_angle
+
+    def _binarize(self, image: Image.Image) -> Image.Image:
+        """Global Otsu threshold to black text on white"""
+        pixels = np.asarray(image)
+        threshold = self._otsu(pixels)
+        return Image.fromarray(np.where(pixels > threshold, 255, 0).astype(np.uint8))
+
+    @staticmethod
+    def _otsu(pixels: np.ndarray) -> float:
+        """Otsu's threshold from a 256-bin histogram"""
+        hist = np.bincount(np.clip(pixels, 0, 255).astype(np.uint8).ravel(), minlength=256).astype(np.float64)
+        total = hist.sum()
+        if total == 0:
+            return 127.0
+        levels = np.arange(256)
+        weight_bg = np.cumsum(hist)
+        weight_fg = total - weight_bg
+        mean_bg = np.cumsum(hist * levels)
+        mean_total = mean_bg[-1]
+        with np.errstate(divide="ignore", invalid="ignore"):
+            between = (mean_total * weight_bg / total - mean_bg) ** 2 / (weight_bg * weight_fg)
+        between = np.nan_to_num(between)
+        return float(np.argmax(between))
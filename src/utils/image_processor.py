@@ -1,81 +1,101 @@
-"""
-Image Processing with OCR
-"""
-
-import pytesseract
-from PIL import Image
-import io
-import uuid
-from typing import List, Dict, Any
-from pathlib import Path
-from src.utils.logger import setup_logger
-
-# Configure tesseract path for Windows
-pytesseract.pytesseract.tesseract_cmd = r'C:\Program Files\Tesseract-OCR\tesseract.exe'
-
-logger = setup_logger(__name__)
-
-class ImageProcessor:
-    def __init__(self, config):
-        self.config = config
-    
-    def process_image(self, file_path: str, filename: str) -> List[Dict[str, Any]]:
-        """Process image files using OCR"""
-        try:
-            extracted_text = self.extract_text_from_image(file_path)
-            
-            if not extracted_text.strip():
-                logger.warning(f"No text extracted from image: {filename}")
-                return []
-            
-            documents = [{
-                "id": f"{filename}_{str(uuid.uuid4())[:8]}",
-                "content": extracted_text,
-                "metadata": {
-                    "filename": filename,
-                    "file_type": "image",
-                    "content_type": "ocr_text",
-                    "source": "image_file"
-                }
-            }]
-            
-            logger.info(f"Processed image {filename}, extracted {len(extracted_text)} characters")
-            return documents
-            
-        except Exception as e:
-            logger.error(f"Error processing image {filename}: {e}")
-            return []
-    
-    def extract_text_from_image(self, image_path: str) -> str:
-        """Extract text from image file using OCR"""
-        try:
-            image = Image.open(image_path)
-            
-            # Preprocess image for better OCR
-            # Convert to grayscale if needed
-            if image.mode != 'L':
-                image = image.convert('L')
-            
-            # Use pytesseract to extract text
-            text = pytesseract.image_to_string(image)
-            return text.strip()
-            
-        except Exception as e:
-            logger.error(f"Error extracting text from image {image_path}: {e}")
-            return ""
-    
-    def extract_text_from_image_bytes(self, image_data: bytes) -> str:
-        """Extract text from image bytes using OCR"""
-        try:
-            image = Image.open(io.BytesIO(image_data))
-            
-            # Preprocess image for better OCR
-            if image.mode != 'L':
-                image = image.convert('L')
-            
-            text = pytesseract.image_to_string(image)
-            return text.strip()
-            
-        except Exception as e:
-            logger.error(f"Error extracting text from image bytes: {e}")
-            return ""
\ No newline at end of file
+"""
+Image Processing with OCR
+"""
+
+from PIL import Image
+import io
+import uuid
+from typing import List, Dict, Any
+from pathlib import Path
+from src.utils.image_preprocessing import ImagePreprocessor
+from src.utils.ocr_backends import get_ocr_backend
+from src.utils.logger import setup_logger
+from src.utils.metrics import get_metrics
+from src.utils.tracing import span
+
+logger = setup_logger(__name__)
+
+class ImageProcessor:
+    def __init__(self, config):
+        self.config = config
+        self.preprocessor = ImagePreprocessor(config)
+        self._ocr_backend = None
+        self.metrics = get_metrics(config)
+    
+    @property
+    def ocr_backend(self):
+        """Shared OCR engine, created on first use"""
+        if self._ocr_backend is None:
+            self._ocr_backend = get_ocr_backend(self.config)
+        return self._ocr_backend
+    
+    def process_image(self, file_path: str, filename: str) -> List[Dict[str, Any]]:
+        """Process image files using OCR"""
+        try:
+            extracted_text = self.extract_text_from_image(file_path)
+            
+            if not extracted_text.strip():
+                logger.warning(f"No text extracted from image: {filename}")
+                return []
+            
+            documents = [{
+                "id": f"{filename}_{str(uuid.uuid4())[:8]}",
+                "content": extracted_text,
+                "metadata": {
+                    "filename": filename,
+                    "file_type": "image",
+                    "content_type": "ocr_text",
+                    "source": "image_file"
+                }
+            }]
+            
+            logger.info("Processed image %s, extracted %d characters", filename, len(extracted_text))
+            return documents
+            
+        except Exception as e:
+            logger.error(f"Error processing image {filename}: {e}")
+            return []
+    
+    def extract_text_from_image(self, image_path: str) -> str:
+        """Extract text from image file using OCR"""
+        try:
+            image = Image.open(image_path)
+            return self._ocr(image)
+            
+        except Exception as e:
+            logger.error(f"Error extracting text from image {image_path}: {e}")
+            return ""
+    
+    def extract_text_from_image_bytes(self, image_data: bytes) -> str:
+        """Extract text from image bytes using OCR"""
+        try:
+            image = Image.open(io.BytesIO(image_data))
+            return self._ocr(image)
+            
+        except Exception as e:
+            logger.error(f"Error extracting text from image bytes: {e}")
+            return ""
+    
+    def extract_text_from_pil_image(self, image: Image.Image) -> str:
+        """Extract text from an already decoded image using OCR"""
+        try:
+            return self._ocr(image)
+            
+        except Exception as e:
+            logger.error(f"Error extracting text from image: {e}")
+            return ""
+    
+    def _ocr(self, image: Image.Image) -> str:
+        """Preprocess an image and run Tesseract on it"""
+        self.metrics.inc("rag_ocr_images_total")
+        with self.metrics.timer("rag_ocr_image_seconds"):
+            # Grayscale, text-free check, crop, DPI, deskew, binarize
+            with span("ocr_preprocess"):
+                image = self.preprocessor.prepare(image)
+            if image is None:
+                logger.debug("Skipping OCR for image without text")
+                return ""
+            
+            with span("ocr_engine", backend=self.ocr_backend.name):
+                text = self.ocr_backend.image_to_string(image)
+        return text.strip()
\ No newline at end of file
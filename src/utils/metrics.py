@@ -0,0 +1,210 @@
+"""
+Counters and latency histograms for the hot paths
+"""
+
+import bisect
+import threading
+import time
+from typing import Any, Dict, List, Optional, Sequence
+
+# Upper bounds in seconds, from sub-millisecond cache hits to slow OCR
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+# Metric names and help text; everything exported is declared here
+METRICS = {
+    "rag_searches_total": ("counter", "Searches run against the vector store"),
+    "rag_query_encode_seconds": ("histogram", "Query embedding time, including cache hits"),
+    "rag_query_cache_hits_total": ("counter", "Query embeddings served from the cache"),
+    "rag_index_query_seconds": ("histogram", "Nearest-neighbour query time in Chroma"),
+    "rag_search_postprocess_seconds": ("histogram", "Result filtering, boosting and context expansion time"),
+    "rag_ocr_image_seconds": ("histogram", "Preprocessing and OCR time per image"),
+    "rag_ocr_images_total": ("counter", "Images passed to OCR"),
+    "rag_pdf_page_extract_seconds": ("histogram", "Text extraction and chunking time per PDF page"),
+    "rag_pdf_pages_total": ("counter", "PDF pages extracted"),
+    "rag_embedding_batch_seconds": ("histogram", "Encode time per chunk batch"),
+    "rag_embedded_chunks_total": ("counter", "Chunks embedded"),
+    "rag_overlong_chunks_total": ("counter", "Chunks longer than the model's max sequence length"),
+    "rag_chroma_write_seconds": ("histogram", "Chroma add time per chunk batch"),
+    "rag_chunks_written_total": ("counter", "Chunks written to Chroma"),
+}
+
+
+class Histogram:
+    """Cumulative-bucket histogram in the Prometheus layout"""
+
+    __slots__ = ("buckets", "counts", "count", "sum", "_lock")
+
+    def __init__(self, buckets: Sequence[float] = DEFAULT_BUCKETS):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+        self._lock = threading.Lock()
+
+    def observe(self, value: float):
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            self.counts[index] += 1
+            self.count += 1
+            self.sum += value
+
+    def quantile(self, q: float) -> float:
+        """Estimate by linear interpolation inside the bucket, like histogram_quantile"""
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        seen = 0
+        lower = 0.0
+        for bound, count in zip(self.buckets, self.counts):
+            if seen + count >= rank and count:
+                return lower + (bound - lower) * (rank - seen) / count
+            seen += count
+            lower = bound
+        return self.buckets[-1]
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "count": self.count,
+            "sum": self.sum,
+            "mean": self.sum / self.count if self.count else 0.0,
+            "p50": self.quantile(0.5),
+            "p95": self.quantile(0.95),
+            "p99": self.quantile(0.99)
+        }
+
+
+class _Timer:
+    """Context manager observing its elapsed time into a histogram"""
+
+    __slots__ = ("histogram", "start")
+
+    def __init__(self, histogram: Histogram):
+        self.histogram = histogram
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.histogram.observe(time.perf_counter() - self.start)
+        return False
+
+
+class _NullTimer:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NULL_TIMER = _NullTimer()
+
+
+class Metrics:
+    """Process-wide counters and histograms for the names in METRICS"""
+
+    enabled = True
+
+    def __init__(self, buckets: Sequence[float] = DEFAULT_BUCKETS):
+        self.counters: Dict[str, int] = {}
+        self.histograms: Dict[str, Histogram] = {}
+        self._lock = threading.Lock()
+        for name, (kind, _) in METRICS.items():
+            if kind == "counter":
+                self.counters[name] = 0
+            else:
+                self.histograms[name] = Histogram(buckets)
+
+    def inc(self, name: str, value: int = 1):
+        with self._lock:
+            self.counters[name] += value
+
+    def observe(self, name: str, seconds: float):
+        self.histograms[name].observe(seconds)
+
+    def timer(self, name: str) -> _Timer:
+        """with metrics.timer("rag_index_query_seconds"): ..."""
+        return _Timer(self.histograms[name])
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Counter values and histogram summaries (seconds)"""
+        with self._lock:
+            counters = dict(self.counters)
+        return {
+            "counters": counters,
+            "histograms": {name: histogram.snapshot() for name, histogram in self.histograms.items()}
+        }
+
+    def to_prometheus(self) -> str:
+        """Prometheus text exposition format"""
+        lines: List[str] = []
+        for name, (kind, help_text) in METRICS.items():
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {kind}")
+            if kind == "counter":
+                lines.append(f"{name} {self.counters[name]}")
+                continue
+            histogram = self.histograms[name]
+            with histogram._lock:
+                counts = list(histogram.counts)
+                total, count = histogram.sum, histogram.count
+            cumulative = 0
+            for bound, bucket in zip(histogram.buckets, counts):
+                cumulative += bucket
+                lines.append(f'{name}_bucket{{le="{bound}"}} {cumulative}')
+            lines.append(f'{name}_bucket{{le="+Inf"}} {count}')
+            lines.append(f"{name}_sum {total}")
+            lines.append(f"{name}_count {count}")
+        return "\n".join(lines) + "\n"
+
+    def reset(self):
+        """Zero every counter and histogram"""
+        with self._lock:
+            for name in self.counters:
+                self.counters[name] = 0
+        for name, histogram in self.histograms.items():
+            self.histograms[name] = Histogram(histogram.buckets)
+
+
+class NullMetrics:
+    """Stand-in when metrics are disabled; every call is a no-op"""
+
+    enabled = False
+
+    def inc(self, name: str, value: int = 1):
+        pass
+
+    def observe(self, name: str, seconds: float):
+        pass
+
+    def timer(self, name: str) -> _NullTimer:
+        return _NULL_TIMER
+
+    def snapshot(self) -> Optional[Dict[str, Any]]:
+        return None
+
+    def to_prometheus(self) -> str:
+        return ""
+
+    def reset(self):
+        pass
+
+
+_metrics: Dict[bool, Any] = {}
+_metrics_lock = threading.Lock()
+
+
+def get_metrics(config) -> Any:
+    """Process-wide registry, or the no-op stand-in with metrics.enabled false
+
+    Bucket bounds come from the first config that enables metrics.
+    """
+    enabled = bool(config.get("metrics.enabled", True))
+    with _metrics_lock:
+        if enabled not in _metrics:
+            buckets = config.get("metrics.buckets", None) or DEFAULT_BUCKETS
+            _metrics[enabled] = Metrics(sorted(buckets)) if enabled else NullMetrics()
+        return _metrics[enabled]
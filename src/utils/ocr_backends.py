@@ -0,0 +1,162 @@
+"""
+OCR engine backends
+"""
+
+import os
+import shutil
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Optional
+
+from PIL import Image
+from src.utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+# Default install location of the Windows Tesseract installer
+WINDOWS_TESSERACT = r'C:\Program Files\Tesseract-OCR\tesseract.exe'
+
+
+class OCRBackend:
+    """Interface shared by OCR engines"""
+
+    name = "base"
+
+    def image_to_string(self, image: Image.Image) -> str:
+        raise NotImplementedError
+
+    def executor(self, workers: int) -> ThreadPoolExecutor:
+        """Long-lived thread pool for OCRing pages in parallel
+
+        Shared by every document, so engines that are set up per thread
+        are created once per worker rather than once per document. The
+        pool is sized by the first caller.
+        """
+        with _backends_lock:
+            if getattr(self, "_executor", None) is None:
+                self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix=f"{self.name}-ocr")
+            return self._executor
+
+    def close(self):
+        """Release engine resources"""
+        with _backends_lock:
+            executor, self._executor = getattr(self, "_executor", None), None
+        if executor is not None:
+            executor.shutdown(wait=True)
+
+
+class TesserocrBackend(OCRBackend):
+    """Tesseract C API through tesserocr, one long-lived engine per thread.
+
+    The language data is loaded once per thread instead of once per image,
+    which is what dominates the cost of the subprocess backend. Engines of
+    threads that have finished are ended when the next engine is created.
+    """
+
+    name = "tesserocr"
+
+    def __init__(self, lang: str = "eng", tessdata: Optional[str] = None, psm: Optional[int] = None):
+        import tesserocr
+        self._tesserocr = tesserocr
+        self.lang = lang
+        self.tessdata = tessdata
+        self.psm = psm
+        self._local = threading.local()
+        # Engine of each thread that has one
+        self._apis: Dict[threading.Thread, object] = {}
+        self._lock = threading.Lock()
+        # Fail early if the language data cannot be loaded
+        self._api()
+
+    def _api(self):
+        """Engine for the calling thread"""
+        api = getattr(self._local, "api", None)
+        if api is None:
+            kwargs = {"lang": self.lang}
+            if self.tessdata:
+                kwargs["path"] = self.tessdata
+            if self.psm is not None:
+                kwargs["psm"] = self.psm
+            api = self._tesserocr.PyTessBaseAPI(**kwargs)
+            self._local.api = api
+            with self._lock:
+                for thread in [thread for thread in self._apis if not thread.is_alive()]:
+                    self._apis.pop(thread).End()
+                self._apis[threading.current_thread()] = api
+        return api
+
+    def image_to_string(self, image: Image.Image) -> str:
+        api = self._api()
+        api.SetImage(image)
+        return api.GetUTF8Text()
+
+    def close(self):
+        super().close()
+        with self._lock:
+            for api in self._apis.values():
+                api.End()
+            self._apis = {}
+        self._local = threading.local()
+
+
+class SubprocessBackend(OCRBackend):
+    """pytesseract, which runs the tesseract binary once per image"""
+
+    name = "subprocess"
+
+    def __init__(self, lang: str = "eng", tessdata: Optional[str] = None, psm: Optional[int] = None,
+                 tesseract_cmd: Optional[str] = None):
+        import pytesseract
+        self._pytesseract = pytesseract
+        self.lang = lang
+
+        cmd = tesseract_cmd or shutil.which("tesseract")
+        if cmd is None and os.path.exists(WINDOWS_TESSERACT):
+            cmd = WINDOWS_TESSERACT
+        if cmd is not None:
+            pytesseract.pytesseract.tesseract_cmd = cmd
+
+        options = []
+        if tessdata:
+            options.append(f'--tessdata-dir "{tessdata}"')
+        if psm is not None:
+            options.append(f"--psm {psm}")
+        self.options = " ".join(options)
+
+    def image_to_string(self, image: Image.Image) -> str:
+        return self._pytesseract.image_to_string(image, lang=self.lang, config=self.options)
+
+
+def create_ocr_backend(config, backend: Optional[str] = None) -> OCRBackend:
+    """Build the configured backend; "auto" prefers tesserocr and falls back to subprocess"""
+    if backend is None:
+        backend = config.get("ocr.backend", "auto")
+    lang = config.get("ocr.lang", "eng")
+    tessdata = config.get("ocr.tessdata_path", None)
+    psm = config.get("ocr.psm", None)
+
+    if backend in ("auto", "tesserocr"):
+        try:
+            return TesserocrBackend(lang, tessdata, psm)
+        except Exception as e:
+            if backend == "tesserocr":
+                raise
+            logger.info(f"tesserocr unavailable ({e}), using tesseract subprocess")
+
+    if backend not in ("auto", "subprocess"):
+        raise ValueError(f"Unknown OCR backend: {backend}")
+    return SubprocessBackend(lang, tessdata, psm, config.get("ocr.tesseract_cmd", None))
+
+
+_backends: Dict[str, OCRBackend] = {}
+_backends_lock = threading.Lock()
+
+
+def get_ocr_backend(config) -> OCRBackend:
+    """Process-wide backend, so every ImageProcessor reuses the same engine"""
+    backend = config.get("ocr.backend", "auto")
+    with _backends_lock:
+        if backend not in _backends:
+            _backends[backend] = create_ocr_backend(config, backend)
+            logger.info(f"OCR backend: {_backends[backend].name}")
+        return _backends[backend]
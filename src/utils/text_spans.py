@@ -0,0 +1,14 @@
+"""
+Helpers for chunks kept as (start, end) spans into a source text
+"""
+
+from typing import Optional, Tuple
+
+
+def trim_span(text: str, start: int, end: int) -> Optional[Tuple[int, int]]:
+    """Span of text[start:end].strip(), None if only whitespace is left"""
+    while start < end and text[start].isspace():
+        start += 1
+    while end > start and text[end - 1].isspace():
+        end -= 1
+    return (start, end) if start < end else None
@@ -0,0 +1,159 @@
+"""
+Token-budget batching for embedding chunks of mixed length
+"""
+
+import math
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from src.utils.logger import setup_logger
+from src.utils.tracing import span
+
+logger = setup_logger(__name__)
+
+
+class TokenBatcher:
+    """Encodes texts in length-sorted batches sized by a token budget.
+
+    Every batch is padded to its longest text, so texts are ordered by
+    token count and each batch holds as many texts as fit in max_tokens
+    padded tokens (at most max_batch). A batch of OCR snippets can then
+    hold hundreds of texts while a batch of full chunks holds a few
+    dozen. Embeddings come back in the input order.
+
+    Texts longer than the model's max sequence length are handled
+    explicitly. With overflow "truncate" the model keeps their first
+    max_seq_length tokens. With "split" they are cut at word boundaries
+    into windows that fit, and the windows' embeddings are averaged,
+    weighted by token count. Either way the affected rows are reported.
+
+    Models that batch on their own and count tokens as they encode (the
+    embedding server client's encode_counted) get all texts in one call.
+    """
+
+    def __init__(self, model: Any, max_tokens: int = 2048, max_batch: int = 256, overflow: str = "truncate"):
+        if overflow not in ("truncate", "split"):
+            raise ValueError(f"Unknown overflow handling: {overflow}")
+        self.model = model
+        self.max_tokens = max_tokens
+        self.max_batch = max_batch
+        self.overflow = overflow
+        self.max_length = getattr(model, "max_seq_length", None)
+
+    def plan(self, counts: List[int]) -> List[List[int]]:
+        """Group row indices into batches, longest texts first"""
+        order = sorted(range(len(counts)), key=lambda row: -counts[row])
+        batches = []
+        start = 0
+        while start < len(order):
+            longest = counts[order[start]]
+            if self.max_length:
+                longest = min(longest, self.max_length)
+            size = min(self.max_batch, max(1, self.max_tokens // max(longest, 1)))
+            batches.append(order[start:start + size])
+            start += size
+        return batches
+
+    def encode(self, texts: List[str]) -> Tuple[np.ndarray, Dict[int, Dict[str, int]]]:
+        """Embeddings in input order, and {row: details} for overlong texts"""
+        encode_counted = getattr(self.model, "encode_counted", None)
+        if encode_counted is not None and texts:
+            with span("embed_counted", texts=len(texts)):
+                embeddings, counts = encode_counted(texts)
+            overlong, pieces = self._overlong(texts, counts)
+            for row, windows in pieces.items():
+                vectors, window_counts = encode_counted(windows)
+                embeddings[row] = self._combine(vectors, window_counts)
+            return embeddings, overlong
+
+        with span("count_tokens", texts=len(texts)):
+            counts = self.model.count_tokens(texts)
+        overlong, pieces = self._overlong(texts, counts)
+
+        # Windows of split texts are encoded alongside the other texts
+        inputs = list(texts)
+        input_counts = list(counts)
+        owners: Dict[int, List[int]] = {}
+        for row, windows in pieces.items():
+            window_counts = self.model.count_tokens(windows)
+            inputs[row] = windows[0]
+            input_counts[row] = window_counts[0]
+            owners[row] = [row]
+            for window, count in zip(windows[1:], window_counts[1:]):
+                owners[row].append(len(inputs))
+                inputs.append(window)
+                input_counts.append(count)
+
+        embeddings = None
+        for rows in self.plan(input_counts):
+            with span("embed_tokens_batch", texts=len(rows), longest=input_counts[rows[0]]):
+                vectors = np.asarray(self.model.encode([inputs[row] for row in rows], batch_size=len(rows)))
+            if embeddings is None:
+                embeddings = np.zeros((len(inputs), vectors.shape[1]), dtype=vectors.dtype)
+            embeddings[rows] = vectors
+        if embeddings is None:
+            return np.zeros((0, self.model.get_sentence_embedding_dimension()), dtype=np.float32), overlong
+
+        for row, window_rows in owners.items():
+            embeddings[row] = self._combine(embeddings[window_rows], [input_counts[i] for i in window_rows])
+        return embeddings[:len(texts)], overlong
+
+    def _overlong(self, texts: List[str], counts: List[int]) -> Tuple[Dict[int, Dict[str, int]], Dict[int, List[str]]]:
+        """Details of texts over max_seq_length, and the windows of those to split"""
+        overlong: Dict[int, Dict[str, int]] = {}
+        pieces: Dict[int, List[str]] = {}
+        if self.max_length:
+            for row, count in enumerate(counts):
+                if count <= self.max_length:
+                    continue
+                overlong[row] = {"token_count": count}
+                if self.overflow == "split":
+                    pieces[row] = self._split(texts[row], count)
+                    overlong[row]["split_windows"] = len(pieces[row])
+                else:
+                    overlong[row]["truncated_tokens"] = count - self.max_length
+        if overlong:
+            logger.warning("%d of %d chunks exceed %d tokens (%s)", len(overlong), len(texts),
+                           self.max_length, "split" if self.overflow == "split" else "truncated")
+        return overlong, pieces
+
+    def _split(self, text: str, count: int) -> List[str]:
+        """Cut text at word boundaries into windows of at most max_seq_length tokens"""
+        windows = [text.split()]
+        counts = [count]
+        for _ in range(4):
+            refined = []
+            for window, window_count in zip(windows, counts):
+                if window_count <= self.max_length or len(window) < 2:
+                    refined.append(window)
+                    continue
+                # Aim a little under the limit since tokens per word vary
+                parts = min(len(window), math.ceil(window_count / (self.max_length * 0.9)))
+                step = math.ceil(len(window) / parts)
+                refined.extend(window[i:i + step] for i in range(0, len(window), step))
+            windows = refined
+            counts = self.model.count_tokens([" ".join(window) for window in windows])
+            if max(counts) <= self.max_length:
+                break
+        # Whatever still does not fit is truncated by the model
+        return [" ".join(window) for window in windows]
+
+    @staticmethod
+    def _combine(vectors: np.ndarray, weights: List[int]) -> np.ndarray:
+        """Token-weighted mean of window embeddings, renormalized for unit-length models"""
+        combined = np.average(vectors, axis=0, weights=weights)
+        norms = np.linalg.norm(vectors, axis=1)
+        if np.allclose(norms, 1.0, atol=1e-3):
+            combined = combined / max(np.linalg.norm(combined), 1e-12)
+        return combined
+
+
+def create_token_batcher(config, model: Any) -> Optional[TokenBatcher]:
+    """Batcher from embedding.batching, None when disabled"""
+    if not config.get("embedding.batching.enabled", True):
+        return None
+    return TokenBatcher(model,
+                        max_tokens=config.get("embedding.batching.max_tokens", 2048),
+                        max_batch=config.get("embedding.batching.max_batch", 256),
+                        overflow=config.get("embedding.batching.overflow", "truncate"))
@@ -0,0 +1,250 @@
+"""
+Per-call tracing with nested spans and optional cProfile sampling
+"""
+
+import cProfile
+import json
+import os
+import pstats
+import random
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+from src.utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+# The trace being recorded on the current thread, if any, and the
+# nesting depth of the spans open on this thread
+_local = threading.local()
+
+
+class Trace:
+    """Timed spans of one traced call, in the order they started"""
+
+    def __init__(self, name: str, args: Dict[str, Any]):
+        self.name = name
+        self.args = args
+        self.id = str(uuid.uuid4())[:8]
+        self.started_at = time.time()
+        self.origin = time.perf_counter()
+        self.duration = 0.0
+        self.spans: List[Dict[str, Any]] = []
+        self.profile: Optional[List[Dict[str, Any]]] = None
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Spans with millisecond offsets from the start of the call"""
+        return {
+            "name": self.name,
+            "id": self.id,
+            "args": self.args,
+            "duration_ms": self.duration * 1000,
+            "spans": [{
+                "name": s["name"],
+                "depth": s["depth"],
+                "start_ms": s["start"] * 1000,
+                "duration_ms": s["duration"] * 1000,
+                "args": s["args"]
+            } for s in self.spans],
+            "profile": self.profile
+        }
+
+    def to_chrome(self) -> Dict[str, Any]:
+        """Chrome trace event format, for chrome://tracing or Perfetto"""
+        pid = os.getpid()
+        base = self.started_at * 1e6
+        events = [{
+            "name": s["name"], "ph": "X", "pid": pid, "tid": s["tid"],
+            "ts": base + s["start"] * 1e6, "dur": s["duration"] * 1e6, "args": s["args"]
+        } for s in self.spans]
+        return {"traceEvents": events, "displayTimeUnit": "ms",
+                "otherData": {"trace": self.name, "id": self.id, "profile": self.profile}}
+
+    def summary(self) -> Dict[str, float]:
+        """Total milliseconds per span name"""
+        totals: Dict[str, float] = {}
+        for s in self.spans:
+            totals[s["name"]] = totals.get(s["name"], 0.0) + s["duration"] * 1000
+        return totals
+
+    def write(self, path: str):
+        with open(path, "w") as f:
+            json.dump(self.to_chrome(), f)
+
+
+class _Span:
+    __slots__ = ("trace", "record", "start")
+
+    def __init__(self, trace: Trace, name: str, args: Dict[str, Any]):
+        self.trace = trace
+        self.record = {"name": name, "args": args, "tid": threading.get_ident()}
+
+    def set(self, **args):
+        """Attach values learned inside the span, e.g. a cache hit"""
+        self.record["args"].update(args)
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        depth = getattr(_local, "depth", 0)
+        self.record["depth"] = depth
+        self.record["start"] = self.start - self.trace.origin
+        self.trace.spans.append(self.record)
+        _local.depth = depth + 1
+        return self
+
+    def __exit__(self, *exc):
+        self.record["duration"] = time.perf_counter() - self.start
+        _local.depth -= 1
+        return False
+
+
+class _NullSpan:
+    __slots__ = ()
+
+    def set(self, **args):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NULL_SPAN = _NullSpan()
+
+
+def span(name: str, **args):
+    """Timed span in the current thread's trace; a shared no-op when not tracing"""
+    trace = getattr(_local, "trace", None)
+    if trace is None:
+        return _NULL_SPAN
+    return _Span(trace, name, args)
+
+
+def in_current_trace(fn: Callable) -> Callable:
+    """Wrap fn so its spans join the calling thread's trace wherever it runs
+
+    Spans are thread-local, so work handed to a thread pool is missing
+    from the trace unless it is wrapped on the submitting thread. The
+    wrapper nests under the span open at that point; fn is returned
+    unchanged when not tracing.
+    """
+    trace = getattr(_local, "trace", None)
+    if trace is None:
+        return fn
+    depth = getattr(_local, "depth", 0)
+
+    def run(*args, **kwargs):
+        saved = getattr(_local, "trace", None), getattr(_local, "depth", 0)
+        _local.trace, _local.depth = trace, depth
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            _local.trace, _local.depth = saved
+
+    return run
+
+
+def traced_methods(obj: Any, *names: str):
+    """Wrap methods of obj so each call is a span named <class>.<method>"""
+    for name in names:
+        method = getattr(obj, name, None)
+        if method is None:
+            continue
+        label = f"{type(obj).__name__}.{name}"
+
+        def wrapper(*args, _method=method, _label=label, **kwargs):
+            with span(_label):
+                return _method(*args, **kwargs)
+
+        setattr(obj, name, wrapper)
+
+
+class Tracer:
+    """Decides which calls are traced and where their traces go.
+
+    A call is traced when the caller asks for it, or, with
+    tracing.enabled, for a tracing.sample_rate share of calls so tracing
+    can stay on in production. tracing.profile_rate of the traced calls
+    also run under cProfile, whose top functions are kept with the trace.
+    Traces at least tracing.min_duration_ms long are written to
+    tracing.output_dir as Chrome trace files.
+    """
+
+    def __init__(self, config):
+        self.enabled = config.get("tracing.enabled", False)
+        self.sample_rate = config.get("tracing.sample_rate", 0.01)
+        self.profile_rate = config.get("tracing.profile_rate", 0.0)
+        self.profile_top = config.get("tracing.profile_top", 25)
+        self.output_dir = config.get("tracing.output_dir", None)
+        self.min_duration_ms = config.get("tracing.min_duration_ms", 0)
+        if self.output_dir:
+            Path(self.output_dir).mkdir(parents=True, exist_ok=True)
+
+    def _sampled(self, rate: float) -> bool:
+        return rate >= 1.0 or (rate > 0 and random.random() < rate)
+
+    @contextmanager
+    def trace(self, name: str, force: bool = False, **args) -> Iterator[Optional[Trace]]:
+        """Trace the enclosed call; yields the Trace, or None when not sampled
+
+        Inside an already traced call this only adds a span.
+        """
+        if getattr(_local, "trace", None) is not None:
+            with span(name, **args):
+                yield None
+            return
+        if not force and not (self.enabled and self._sampled(self.sample_rate)):
+            yield None
+            return
+
+        trace = Trace(name, args)
+        profiler = None
+        if self._sampled(self.profile_rate):
+            profiler = cProfile.Profile()
+            try:
+                profiler.enable()
+            except ValueError:
+                # Another profiler is running, e.g. a concurrent traced call
+                profiler = None
+
+        _local.trace, _local.depth = trace, 0
+        try:
+            with _Span(trace, name, dict(args)):
+                yield trace
+        finally:
+            _local.trace = None
+            trace.duration = time.perf_counter() - trace.origin
+            if profiler is not None:
+                profiler.disable()
+                trace.profile = self._top_functions(profiler)
+            self._export(trace)
+
+    def _top_functions(self, profiler: cProfile.Profile) -> List[Dict[str, Any]]:
+        """Functions with the most cumulative time"""
+        stats = pstats.Stats(profiler)
+        rows = []
+        for (filename, line, function), (_, calls, total, cumulative, _) in stats.stats.items():
+            rows.append({
+                "function": f"{Path(filename).name}:{line}({function})",
+                "calls": calls,
+                "total_ms": total * 1000,
+                "cumulative_ms": cumulative * 1000
+            })
+        rows.sort(key=lambda row: row["cumulative_ms"], reverse=True)
+        return rows[:self.profile_top]
+
+    def _export(self, trace: Trace):
+        if not self.output_dir or trace.duration * 1000 < self.min_duration_ms:
+            return
+        path = Path(self.output_dir) / f"{trace.name}-{time.strftime('%Y%m%d-%H%M%S')}-{trace.id}.json"
+        try:
+            trace.write(str(path))
+            logger.debug("Wrote trace %s (%.1f ms)", path, trace.duration * 1000)
+        except OSError as e:
+            logger.warning(f"Could not write trace {path}: {e}")
@@ -0,0 +1,53 @@
+"""
+Shared fixtures: a private store per test with the offline hashing embedder
+"""
+
+from typing import Any, Dict, Optional
+
+import pytest
+import yaml
+
+from src.utils.config import Config
+
+
+@pytest.fixture
+def make_config(tmp_path):
+    """Config factory; overrides are dotted keys, e.g. {"dedup.enabled": False}"""
+
+    def make(overrides: Optional[Dict[str, Any]] = None) -> Config:
+        settings = {
+            "vector_db": {"path": str(tmp_path / "db"), "collection_name": "test_docs"},
+            "embedding": {"model": "hashing-64", "backend": "sentence_transformers"},
+            "processing": {"chunk_size": 200, "chunk_overlap": 40},
+            "ingestion": {"queue_path": str(tmp_path / "ingest.db"), "max_attempts": 2},
+            "hierarchy": {"enabled": True},
+            "image_embedding": {"enabled": False},
+            "sharding": {"enabled": False},
+            "metrics": {"enabled": False}
+        }
+        path = tmp_path / "config.yaml"
+        with open(path, "w") as f:
+            yaml.dump(settings, f, default_flow_style=False)
+        config = Config(str(path))
+        for key, value in (overrides or {}).items():
+            config.set(key, value)
+        # Saved again so MultimodalRAG(str(config.config_path)) sees the overrides
+        with open(path, "w") as f:
+            yaml.dump(config._config, f, default_flow_style=False)
+        return config
+
+    return make
+
+
+@pytest.fixture
+def write_text():
+    """Writes a text file of distinct paragraphs, several chunks long"""
+
+    def write(path, paragraphs: int = 8, seed: str = "") -> str:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        lines = [f"Paragraph {i} {seed} covers topic {i * 7 % 13} with detail number {i * 31 % 97}. "
+                 f"It continues about item {i} {seed} and closes the section." for i in range(paragraphs)]
+        path.write_text("\n\n".join(lines))
+        return str(path)
+
+    return write
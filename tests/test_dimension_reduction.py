@@ -0,0 +1,92 @@
+"""
+Tests for embedding dimension reduction and float16 rounding
+"""
+
+import numpy as np
+import pytest
+
+from src.core.vector_store import VectorStore
+from src.utils.dimension_reduction import Projection, fit_pca, load_projection
+
+
+def low_rank_sample(rows: int = 400, dimension: int = 64, rank: int = 8, seed: int = 0) -> np.ndarray:
+    """Unit vectors that mostly live in a rank-dimensional subspace"""
+    rng = np.random.default_rng(seed)
+    vectors = rng.normal(size=(rows, rank)) @ rng.normal(size=(rank, dimension))
+    vectors += 0.01 * rng.normal(size=vectors.shape)
+    return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+
+def test_pca_keeps_neighbours():
+    sample = low_rank_sample()
+    projection = fit_pca(sample, 8, model="hashing-64")
+    assert projection.dimension == 8
+    assert projection.info["explained_variance"] > 0.99
+
+    reduced = projection.transform(sample)
+    assert reduced.shape == (400, 8) and reduced.dtype == np.float32
+    np.testing.assert_allclose(np.linalg.norm(reduced, axis=1), 1.0, atol=1e-5)
+    full_neighbours = np.argsort(-(sample[:20] @ sample.T), axis=1)[:, 1]
+    reduced_neighbours = np.argsort(-(reduced[:20] @ reduced.T), axis=1)[:, 1]
+    assert (full_neighbours == reduced_neighbours).mean() >= 0.9
+    assert projection.transform(sample[0]).shape == (8,)
+
+    with pytest.raises(ValueError):
+        fit_pca(sample, 64)
+    with pytest.raises(ValueError):
+        fit_pca(sample[:4], 8)
+
+
+def test_projection_ids_and_validation():
+    assert Projection().id == "none"
+    assert Projection("truncate", 32, "float16").id == "truncate-32-float16"
+    for args in (("umap",), ("pca",), ("truncate",), ("none", None, "int8")):
+        with pytest.raises(ValueError):
+            Projection(*args)
+
+    vectors = low_rank_sample(4)
+    rounded = Projection(dtype="float16").transform(vectors)
+    assert rounded.dtype == np.float32
+    np.testing.assert_array_equal(rounded, rounded.astype(np.float16).astype(np.float32))
+    np.testing.assert_allclose(rounded, vectors, atol=1e-3)
+
+
+def test_saved_pca_is_checked_against_the_model(make_config, tmp_path):
+    path = str(tmp_path / "projection.npz")
+    projection = fit_pca(low_rank_sample(), 8, model="hashing-64")
+    projection.save(path)
+
+    config = make_config({"embedding.reduction.method": "pca", "embedding.reduction.path": path})
+    loaded = load_projection(config)
+    assert loaded.id == projection.id
+    np.testing.assert_array_equal(loaded.components, projection.components)
+
+    with pytest.raises(ValueError):
+        load_projection(make_config({"embedding.reduction.method": "pca", "embedding.reduction.path": path,
+                                     "embedding.model": "hashing-128"}))
+    with pytest.raises(FileNotFoundError):
+        load_projection(make_config({"embedding.reduction.method": "pca",
+                                     "embedding.reduction.path": str(tmp_path / "missing.npz")}))
+
+
+def test_store_uses_and_records_its_projection(make_config):
+    settings = {"embedding.reduction.method": "truncate", "embedding.reduction.dimension": 32,
+                "embedding.reduction.dtype": "float16", "hierarchy.enabled": False}
+    store = VectorStore(make_config(settings))
+    store.add_documents([{
+        "id": f"a.txt_{i}_0000000{i}",
+        "content": f"topic{i} " * 4 + f"paragraph {i} about subject {i}",
+        "metadata": {"filename": "a.txt", "source_path": "/data/a.txt", "file_type": "text", "chunk_index": i}
+    } for i in range(5)])
+
+    stored = np.array(store.collection.get(include=["embeddings"])["embeddings"])
+    assert stored.shape == (5, 32)
+    np.testing.assert_array_equal(stored, stored.astype(np.float16).astype(np.float32))
+    results = store.search("topic3 topic3", top_k=1, threshold=-1.0)
+    assert results[0]["metadata"]["chunk_index"] == 3
+    assert store.query_embeddings.get("topic3 topic3").dtype == np.float16
+
+    # Reopening the collection with another reduction is refused
+    settings["embedding.reduction.dtype"] = "float32"
+    with pytest.raises(ValueError, match="truncate-32-float16"):
+        VectorStore(make_config(settings))
@@ -0,0 +1,71 @@
+"""
+ONNX Runtime against PyTorch embeddings of the same model
+
+The model is a tiny randomly initialized BERT with its own WordPiece
+vocabulary, built in a temporary folder, so the tests need no download.
+"""
+
+import numpy as np
+import pytest
+
+from src.utils.embedding_backends import OnnxBackend, SentenceTransformerBackend
+
+TEXTS = [
+    "Quarterly revenue grew in every region.",
+    "The network was trained on scanned invoices and receipts for three days before evaluation.",
+    "short",
+    "Tables on page four list the cost of each component, the supplier and the delivery date. " * 6
+]
+
+
+def build_tiny_model(folder) -> str:
+    """SentenceTransformer folder: 2-layer BERT, mean pooling, normalization"""
+    import torch
+    from sentence_transformers import SentenceTransformer, models
+    from transformers import BertConfig, BertModel, BertTokenizerFast
+
+    words = sorted({word.strip(".,").lower() for text in TEXTS for word in text.split()} - {"short"})
+    letters = "abcdefghijklmnopqrstuvwxyz"
+    vocab = ["[PAD]", "[UNK]", "[CLS]", "[SEP]", "[MASK]", ".", ","] + list(letters) + \
+        [f"##{letter}" for letter in letters] + words
+    transformer_folder = folder / "bert"
+    transformer_folder.mkdir(parents=True)
+    (transformer_folder / "vocab.txt").write_text("\n".join(vocab) + "\n")
+    BertTokenizerFast(vocab_file=str(transformer_folder / "vocab.txt")).save_pretrained(str(transformer_folder))
+
+    torch.manual_seed(0)
+    config = BertConfig(vocab_size=len(vocab), hidden_size=32, num_hidden_layers=2, num_attention_heads=2,
+                        intermediate_size=64, max_position_embeddings=128)
+    BertModel(config).save_pretrained(str(transformer_folder))
+
+    transformer = models.Transformer(str(transformer_folder), max_seq_length=64)
+    pooling = models.Pooling(config.hidden_size, pooling_mode="mean")
+    path = folder / "tiny-st"
+    SentenceTransformer(modules=[transformer, pooling, models.Normalize()], device="cpu").save(str(path))
+    return str(path)
+
+
+@pytest.fixture(scope="module")
+def model_path(tmp_path_factory):
+    return build_tiny_model(tmp_path_factory.mktemp("model"))
+
+
+@pytest.fixture(scope="module")
+def pytorch_backend(model_path):
+    return SentenceTransformerBackend(model_path)
+
+
+def cosine(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    return (a * b).sum(axis=1) / (np.linalg.norm(a, axis=1) * np.linalg.norm(b, axis=1))
+
+
+@pytest.mark.parametrize("quantize, minimum", [(False, 0.999), (True, 0.95)])
+def test_onnx_matches_pytorch(model_path, pytorch_backend, tmp_path_factory, quantize, minimum):
+    onnx = OnnxBackend(model_path, str(tmp_path_factory.getbasetemp() / "onnx"), quantize=quantize)
+    expected = pytorch_backend.encode(TEXTS)
+    found = onnx.encode(TEXTS, batch_size=2)
+    assert found.shape == expected.shape == (4, 32)
+    assert cosine(found, expected).min() >= minimum
+    assert onnx.count_tokens(TEXTS) == pytorch_backend.count_tokens(TEXTS)
+    # The last text is longer than the model's 64 tokens and truncated alike
+    assert onnx.count_tokens(TEXTS)[-1] > onnx.max_seq_length == 64
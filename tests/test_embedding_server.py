@@ -0,0 +1,111 @@
+"""
+Tests for the shared embedding server and its client
+"""
+
+import socket
+import threading
+from multiprocessing import shared_memory
+
+import numpy as np
+import pytest
+
+from src.core.embedding_server import EmbeddingClient, EmbeddingServer, _receive, _send, server_running
+from src.utils.token_batching import TokenBatcher
+
+TEXTS = ["Quarterly revenue grew in every region.", "short", "Tables list the cost of each component."]
+
+
+@pytest.fixture
+def server(make_config, tmp_path):
+    server = EmbeddingServer(make_config(), str(tmp_path / "e.sock"))
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    for _ in range(100):
+        if server_running(server.socket_path):
+            break
+        thread.join(0.05)
+    yield server
+    server.stop()
+    thread.join(5)
+
+
+def request(sock, message):
+    _send(sock, message)
+    return _receive(sock)
+
+
+def raw_client(server):
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    sock.settimeout(10)
+    sock.connect(server.socket_path)
+    return sock
+
+
+def test_client_gets_vectors_and_token_counts(server):
+    client = EmbeddingClient(server.socket_path)
+    try:
+        embeddings, counts = client.encode_counted(TEXTS)
+        np.testing.assert_allclose(embeddings, server.backend.encode(TEXTS), atol=1e-6)
+        assert counts == server.backend.count_tokens(TEXTS)
+        assert client.encode(TEXTS[0]).shape == (64,)
+        assert client._buffer.name.startswith(server.buffer_prefix)
+    finally:
+        client.close()
+
+
+def test_batcher_uses_one_round_trip(server, monkeypatch):
+    client = EmbeddingClient(server.socket_path)
+    try:
+        monkeypatch.setattr(client, "count_tokens", lambda texts: pytest.fail("texts sent twice"))
+        embeddings, overlong = TokenBatcher(client).encode(TEXTS)
+        assert embeddings.shape == (3, 64) and overlong == {}
+
+        # Overlong texts are still split and recombined
+        client.max_seq_length = 4
+        monkeypatch.undo()
+        embeddings, overlong = TokenBatcher(client, overflow="split").encode(TEXTS)
+        assert overlong[0]["split_windows"] > 1 and 1 not in overlong
+        assert np.linalg.norm(embeddings[0]) == pytest.approx(1.0, abs=1e-5)
+    finally:
+        client.close()
+
+
+def test_foreign_and_small_buffers_are_refused(server):
+    sock = raw_client(server)
+    foreign = shared_memory.SharedMemory(create=True, size=1 << 16)
+    small = shared_memory.SharedMemory(name=server.buffer_prefix + "small", create=True, size=64)
+    try:
+        reply = request(sock, {"op": "encode", "texts": TEXTS, "buffer": foreign.name})
+        assert "not created for this server" in reply["error"]
+        assert not any(foreign.buf[:256])
+
+        reply = request(sock, {"op": "encode", "texts": TEXTS, "buffer": small.name})
+        assert "do not fit" in reply["error"]
+
+        # The connection keeps working after an error
+        assert request(sock, {"op": "hello"})["dimension"] == 64
+    finally:
+        sock.close()
+        for buffer in (foreign, small):
+            buffer.close()
+            buffer.unlink()
+
+
+def test_encode_errors_reach_the_client(server, monkeypatch):
+    def fail(texts, **kwargs):
+        raise MemoryError("model out of memory")
+
+    monkeypatch.setattr(server.backend, "encode", fail)
+    fallback_used = []
+    client = EmbeddingClient(server.socket_path, fallback=lambda: fallback_used.append(True))
+    try:
+        with pytest.raises(RuntimeError, match="out of memory"):
+            client.encode(TEXTS)
+        assert not fallback_used
+
+        sock = raw_client(server)
+        reply = request(sock, {"op": "encode", "texts": TEXTS})
+        assert "buffer" in reply["error"]
+        sock.close()
+    finally:
+        client.close()
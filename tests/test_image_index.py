@@ -0,0 +1,100 @@
+"""
+Tests for CLIP image embeddings and text-to-image search
+"""
+
+import io
+
+import numpy as np
+import pytest
+from PIL import Image
+
+from src.core import vector_store
+from src.core.rag_system import MultimodalRAG
+
+COLORS = {"red": (220, 30, 30), "green": (30, 200, 40), "blue": (20, 40, 230)}
+
+
+class FakeClip:
+    """Stands in for a CLIP SentenceTransformer: images and color words share a space"""
+
+    def __init__(self):
+        self.images_encoded = 0
+
+    def encode(self, inputs, batch_size=32, **kwargs):
+        vectors = []
+        for item in inputs:
+            if isinstance(item, str):
+                vector = np.array([float(name in item.lower()) for name in COLORS]) + 0.05
+            else:
+                self.images_encoded += 1
+                vector = np.asarray(item.convert("RGB"), dtype=np.float64).reshape(-1, 3).mean(axis=0)
+            vectors.append(vector / np.linalg.norm(vector))
+        return np.array(vectors, dtype=np.float32)
+
+
+@pytest.fixture
+def clip(monkeypatch):
+    model = FakeClip()
+    monkeypatch.setitem(vector_store._models, ("fake-clip", "sentence_transformers"), model)
+    return model
+
+
+@pytest.fixture
+def rag(make_config, tmp_path, clip):
+    config = make_config({"image_embedding.enabled": True, "image_embedding.model": "fake-clip",
+                          "image_embedding.thumbnail_cache": str(tmp_path / "thumbs")})
+    return MultimodalRAG(str(config.config_path))
+
+
+def png(color, size=(120, 80)) -> bytes:
+    data = io.BytesIO()
+    Image.new("RGB", size, COLORS[color]).save(data, "PNG")
+    return data.getvalue()
+
+
+def record(image, path):
+    return {"image": image, "metadata": {"filename": path.rsplit("/", 1)[-1], "source_path": path,
+                                         "file_type": "image"}}
+
+
+def test_text_query_finds_matching_image(rag):
+    index = rag.vector_store.image_index
+    assert index.add_images([record(png(color), f"/data/{color}.png") for color in COLORS]) == 3
+
+    results = index.search("a red square", top_k=1)
+    assert [r["metadata"]["filename"] for r in results] == ["red.png"]
+    assert results[0]["metadata"]["content_type"] == "image_embedding"
+    # Tiny images are not embedded
+    assert index.add_images([record(png("red", (10, 10)), "/data/icon.png")]) == 0
+
+
+def test_reingest_upserts_from_cached_thumbnails(rag, clip, tmp_path):
+    index = rag.vector_store.image_index
+    records = [record(png(color), f"/data/{color}.png") for color in COLORS]
+    index.add_images(records)
+    assert len(list((tmp_path / "thumbs").glob("*.jpg"))) == 3
+    assert max(Image.open(path).size[0] for path in (tmp_path / "thumbs").glob("*.jpg")) <= 224
+
+    index.add_images(records)
+    assert index.collection.count() == 3
+    assert clip.images_encoded == 6
+
+
+def test_remove_only_drops_the_given_file(rag):
+    index = rag.vector_store.image_index
+    index.add_images([record(png("red"), "/a/photo.png"), record(png("blue"), "/b/photo.png")])
+    index.remove("/a/photo.png")
+    assert [m["source_path"] for m in index.collection.get()["metadatas"]] == ["/b/photo.png"]
+
+
+def test_image_files_are_searchable_through_the_rag(rag, tmp_path):
+    for color in COLORS:
+        (tmp_path / f"{color}.png").write_bytes(png(color))
+        assert rag.process_file(str(tmp_path / f"{color}.png"))["images_embedded"] == 1
+
+    results = rag.search("photo of something blue", top_k=2, threshold=-1.0)
+    assert results[0]["metadata"]["filename"] == "blue.png"
+
+    rag.remove_file(str(tmp_path / "blue.png"))
+    results = rag.search("photo of something blue", top_k=2, threshold=-1.0)
+    assert "blue.png" not in {r["metadata"]["filename"] for r in results}
@@ -0,0 +1,83 @@
+"""
+Tests for hot-path metrics and their Prometheus export
+"""
+
+import re
+
+import pytest
+
+from src.core.rag_system import MultimodalRAG
+from src.utils import metrics as metrics_module
+from src.utils.metrics import Histogram, Metrics, NullMetrics, get_metrics
+
+
+@pytest.fixture(autouse=True)
+def fresh_registry(monkeypatch):
+    monkeypatch.setattr(metrics_module, "_metrics", {})
+
+
+def test_histogram_quantiles_interpolate_within_buckets():
+    histogram = Histogram((0.1, 0.2, 0.4))
+    for value in [0.05] * 50 + [0.15] * 40 + [0.3] * 10:
+        histogram.observe(value)
+    assert histogram.quantile(0.25) == pytest.approx(0.05)
+    assert histogram.quantile(0.7) == pytest.approx(0.15)
+    assert histogram.quantile(0.95) == pytest.approx(0.3)
+    snapshot = histogram.snapshot()
+    assert snapshot["count"] == 100 and snapshot["mean"] == pytest.approx(0.115)
+
+    # Values past the last bound report that bound
+    histogram.observe(10.0)
+    assert histogram.quantile(1.0) == 0.4
+
+
+def test_prometheus_export_is_cumulative():
+    metrics = Metrics((0.01, 0.1))
+    metrics.inc("rag_searches_total", 3)
+    for seconds in (0.005, 0.05, 0.5):
+        metrics.observe("rag_index_query_seconds", seconds)
+    text = metrics.to_prometheus()
+
+    assert "# TYPE rag_searches_total counter\nrag_searches_total 3\n" in text
+    assert "# TYPE rag_index_query_seconds histogram" in text
+    buckets = re.findall(r'rag_index_query_seconds_bucket\{le="([^"]+)"\} (\d+)', text)
+    assert buckets == [("0.01", "1"), ("0.1", "2"), ("+Inf", "3")]
+    assert "rag_index_query_seconds_count 3\n" in text
+    assert float(re.search(r"rag_index_query_seconds_sum (\S+)", text).group(1)) == pytest.approx(0.555)
+    # Every declared metric is exported, even before it is used
+    assert text.count("# HELP ") == len(metrics_module.METRICS)
+
+    metrics.reset()
+    assert metrics.snapshot()["counters"]["rag_searches_total"] == 0
+    assert metrics.snapshot()["histograms"]["rag_index_query_seconds"]["count"] == 0
+
+
+def test_registry_is_shared_and_can_be_disabled(make_config):
+    config = make_config({"metrics.enabled": True, "metrics.buckets": [1.0, 0.5]})
+    metrics = get_metrics(config)
+    assert get_metrics(make_config({"metrics.enabled": True})) is metrics
+    assert metrics.histograms["rag_ocr_image_seconds"].buckets == (0.5, 1.0)
+
+    disabled = get_metrics(make_config({"metrics.enabled": False}))
+    assert isinstance(disabled, NullMetrics)
+    with disabled.timer("rag_index_query_seconds"):
+        disabled.inc("rag_searches_total")
+    assert disabled.snapshot() is None and disabled.to_prometheus() == ""
+
+
+def test_ingest_and_search_are_measured(make_config, write_text, tmp_path):
+    rag = MultimodalRAG(str(make_config({"metrics.enabled": True}).config_path))
+    rag.process_file(write_text(tmp_path / "a.txt", seed="alpha"))
+    chunks = rag.vector_store.collection.count()
+    rag.search("Paragraph covers topic", top_k=3, threshold=-1.0)
+    rag.vector_store.search("Paragraph covers topic", top_k=3, threshold=-1.0)
+
+    snapshot = rag.get_stats()["metrics"]
+    counters = snapshot["counters"]
+    assert counters["rag_searches_total"] == 2
+    assert counters["rag_query_cache_hits_total"] == 1
+    assert counters["rag_chunks_written_total"] == counters["rag_embedded_chunks_total"] > 0
+    assert counters["rag_chunks_written_total"] <= chunks
+    assert snapshot["histograms"]["rag_index_query_seconds"]["count"] == 2
+    assert snapshot["histograms"]["rag_chroma_write_seconds"]["count"] >= 1
+    assert "rag_searches_total 2" in rag.export_metrics()
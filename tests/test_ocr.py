@@ -0,0 +1,149 @@
+"""
+Tests for OCR engines and image preprocessing
+"""
+
+import sys
+import threading
+import types
+
+import numpy as np
+import pytest
+from PIL import Image, ImageDraw
+
+from src.utils.image_preprocessing import ImagePreprocessor
+from src.utils.image_processor import ImageProcessor
+from src.utils.ocr_backends import SubprocessBackend, TesserocrBackend, create_ocr_backend
+
+
+class FakeTessAPI:
+    """Stands in for tesserocr.PyTessBaseAPI, which needs Tesseract installed"""
+
+    created = []
+
+    def __init__(self, **kwargs):
+        self.kwargs = kwargs
+        self.ended = False
+        self.thread = threading.current_thread().name
+        FakeTessAPI.created.append(self)
+
+    def SetImage(self, image):
+        self.size = image.size
+
+    def GetUTF8Text(self):
+        assert not self.ended
+        return f"{self.size[0]}x{self.size[1]}"
+
+    def End(self):
+        self.ended = True
+
+
+@pytest.fixture
+def fake_tesserocr(monkeypatch):
+    FakeTessAPI.created = []
+    monkeypatch.setitem(sys.modules, "tesserocr", types.SimpleNamespace(PyTessBaseAPI=FakeTessAPI))
+    return FakeTessAPI
+
+
+def test_tesserocr_engines_are_reused_by_pool_threads(fake_tesserocr):
+    backend = TesserocrBackend("deu", psm=6)
+    assert fake_tesserocr.created[0].kwargs == {"lang": "deu", "psm": 6}
+
+    # Several documents through the shared pool: one engine per worker
+    for _ in range(3):
+        executor = backend.executor(2)
+        texts = list(executor.map(backend.image_to_string, [Image.new("L", (10 + i, 5)) for i in range(6)]))
+        assert texts == [f"{10 + i}x5" for i in range(6)]
+    assert backend.executor(8) is executor
+    assert len(fake_tesserocr.created) <= 3
+
+    backend.close()
+    assert all(api.ended for api in fake_tesserocr.created)
+
+
+def test_tesserocr_ends_engines_of_finished_threads(fake_tesserocr):
+    backend = TesserocrBackend()
+
+    def ocr():
+        backend.image_to_string(Image.new("L", (4, 4)))
+
+    thread = threading.Thread(target=ocr)
+    thread.start()
+    thread.join()
+    finished = fake_tesserocr.created[-1]
+    assert not finished.ended
+
+    # The next new engine ends the finished thread's one
+    thread = threading.Thread(target=ocr)
+    thread.start()
+    thread.join()
+    assert finished.ended
+    # The engine of this thread, created by the constructor, and the last one
+    assert sum(not api.ended for api in fake_tesserocr.created) == 2
+
+
+def test_auto_falls_back_to_subprocess(make_config, monkeypatch):
+    monkeypatch.setitem(sys.modules, "tesserocr", None)
+    config = make_config({"ocr.psm": 4, "ocr.tessdata_path": "/data/tess"})
+    backend = create_ocr_backend(config)
+    assert isinstance(backend, SubprocessBackend)
+    assert backend.options == '--tessdata-dir "/data/tess" --psm 4'
+
+    with pytest.raises(ImportError):
+        create_ocr_backend(config, "tesserocr")
+    with pytest.raises(ValueError):
+        create_ocr_backend(config, "easyocr")
+
+
+def text_page(size=(1200, 900), box=(700, 500, 1150, 850)) -> Image.Image:
+    """White page with lines of word-like blocks inside box"""
+    image = Image.new("L", size, 255)
+    draw = ImageDraw.Draw(image)
+    x0, y0, x1, y1 = box
+    for y in range(y0, y1, 24):
+        for x in range(x0, x1 - 20, 30):
+            draw.rectangle([x, y, x + 18, y + 10], fill=0)
+    return image
+
+
+def test_preprocessing_crops_resamples_and_binarizes(make_config):
+    preprocessor = ImagePreprocessor(make_config())
+    image = text_page()
+    preview, scale = preprocessor._preview(image)
+    left, top, right, bottom = preprocessor._text_box(preprocessor._edge_map(preview), scale, image.size)
+    assert left <= 700 and top <= 500 and right >= 1150 and bottom >= 850
+    assert (right - left) * (bottom - top) < 0.3 * 1200 * 900
+
+    prepared = preprocessor.prepare(image.convert("RGB"))
+    assert prepared.mode == "L"
+    assert set(np.unique(np.asarray(prepared))) == {0, 255}
+
+    # Resampled from the image's own DPI towards 300, capped by max_side
+    image.info["dpi"] = (100, 100)
+    assert preprocessor._resample(image).size == (3600, 2700)
+    assert max(preprocessor._resample(text_page((3000, 1000), (10, 10, 900, 900))).size) == 4000
+
+
+def test_preprocessing_skips_blank_images_and_finds_skew(make_config):
+    preprocessor = ImagePreprocessor(make_config())
+    assert preprocessor.prepare(Image.new("L", (800, 600), 255)) is None
+    gradient = Image.fromarray(np.tile(np.linspace(0, 255, 800), (600, 1)).astype(np.uint8))
+    assert preprocessor.prepare(gradient) is None
+
+    for angle in (3, -3):
+        skewed = text_page(box=(100, 100, 1100, 800)).rotate(angle, fillcolor=255, expand=True)
+        preview, _ = preprocessor._preview(skewed)
+        assert preprocessor._skew_angle(preview) == pytest.approx(-angle, abs=0.5)
+
+    disabled = ImagePreprocessor(make_config({"ocr.preprocessing.enabled": False}))
+    assert disabled.prepare(Image.new("RGB", (800, 600), "white")).size == (800, 600)
+
+
+def test_blank_images_never_reach_the_engine(make_config):
+    processor = ImageProcessor(make_config())
+    seen = []
+    processor._ocr_backend = types.SimpleNamespace(name="fake",
+                                                   image_to_string=lambda image: seen.append(image) or "text")
+    assert processor.extract_text_from_pil_image(Image.new("RGB", (640, 480), "white")) == ""
+    assert seen == []
+    assert processor.extract_text_from_pil_image(text_page()) == "text"
+    assert len(seen) == 1 and seen[0].size[0] < 1200 * 300 / 150
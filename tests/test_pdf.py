@@ -0,0 +1,174 @@
+"""
+Tests for layout-aware PDF extraction and OCR of scanned pages
+"""
+
+import io
+import threading
+
+import fitz
+import pytest
+from PIL import Image, ImageDraw
+
+from src.core.pdf_processor import PDFProcessor
+from src.utils import ocr_backends
+from src.utils.ocr_backends import OCRBackend
+
+HEADING = "Annual report heading spanning the page width"
+LEFT = ["Left column first paragraph about revenue. " * 4, "Left column second paragraph on staff. " * 2]
+RIGHT = "Right column paragraph about costs. " * 4
+
+
+def add_layout_page(doc):
+    """Heading, two text columns and a ruled two-column table"""
+    page = doc.new_page(width=595, height=842)
+    page.insert_text((50, 60), HEADING, fontsize=14)
+    page.insert_textbox(fitz.Rect(50, 100, 280, 300), LEFT[0], fontsize=10)
+    page.insert_textbox(fitz.Rect(320, 100, 550, 300), RIGHT, fontsize=10)
+    page.insert_textbox(fitz.Rect(50, 320, 280, 400), LEFT[1], fontsize=10)
+
+    xs, ys = [50, 200, 350], [450, 480, 510, 540]
+    for x in xs:
+        page.draw_line((x, ys[0]), (x, ys[-1]))
+    for y in ys:
+        page.draw_line((xs[0], y), (xs[-1], y))
+    for r, row in enumerate([["Item", "Cost"], ["Bolt", "3"], ["Nut", "1"]]):
+        for c, text in enumerate(row):
+            page.insert_text((xs[c] + 5, ys[r] + 20), text, fontsize=11)
+
+
+def add_text_page(doc, text):
+    page = doc.new_page(width=595, height=842)
+    page.insert_textbox(fitz.Rect(50, 50, 545, 800), text, fontsize=11)
+
+
+def add_scanned_page(doc):
+    """A page that is one full-size image of word-like blocks, without a text layer"""
+    image = Image.new("L", (620, 877), 255)
+    draw = ImageDraw.Draw(image)
+    for y in range(60, 800, 24):
+        for x in range(60, 540, 30):
+            draw.rectangle([x, y, x + 18, y + 10], fill=0)
+    data = io.BytesIO()
+    image.save(data, "PNG")
+    page = doc.new_page(width=595, height=842)
+    page.insert_image(page.rect, stream=data.getvalue())
+
+
+def save(doc, path) -> str:
+    doc.save(str(path))
+    doc.close()
+    return str(path)
+
+
+class FakeOCR(OCRBackend):
+    """Records the pages it is given and the threads that OCR them"""
+
+    name = "fake"
+
+    def __init__(self):
+        self.threads = set()
+        self.sizes = []
+
+    def image_to_string(self, image):
+        self.threads.add(threading.current_thread().name)
+        self.sizes.append(image.size)
+        return f"Scanned page text number {len(self.sizes)} with enough words to chunk."
+
+
+@pytest.fixture
+def fake_ocr(monkeypatch):
+    backend = FakeOCR()
+    monkeypatch.setitem(ocr_backends._backends, "auto", backend)
+    yield backend
+    backend.close()
+
+
+def test_layout_mode_reads_columns_in_order(make_config, tmp_path):
+    doc = fitz.open()
+    add_layout_page(doc)
+    path = save(doc, tmp_path / "layout.pdf")
+    processor = PDFProcessor(make_config({"processing.pdf_mode": "layout", "processing.chunk_size": 1000}))
+    documents = processor.process_pdf(path, "layout.pdf")
+
+    text = documents[0]["content"]
+    positions = [text.index(part) for part in (HEADING, LEFT[0][:30], LEFT[1][:30], RIGHT[:30])]
+    assert positions == sorted(positions)
+    assert documents[0]["metadata"]["block_count"] == 4
+    assert documents[0]["metadata"]["bbox"].startswith("50.0,")
+
+    tables = [d for d in documents if d["metadata"]["content_type"] == "table"]
+    assert [d["content"] for d in tables] == ["Item: Bolt; Cost: 3\nItem: Nut; Cost: 1"]
+    assert tables[0]["metadata"]["row_range"] == "1-2"
+    # Table text is not repeated in the text chunks
+    assert "Bolt" not in text
+
+
+def test_layout_mode_splits_blocks_at_chunk_size(make_config, tmp_path):
+    doc = fitz.open()
+    add_layout_page(doc)
+    path = save(doc, tmp_path / "layout.pdf")
+    processor = PDFProcessor(make_config({"processing.pdf_mode": "layout", "processing.chunk_size": 120,
+                                          "processing.pdf_tables": False}))
+    documents = processor.process_pdf(path, "layout.pdf")
+    assert all(len(d["content"]) <= 120 for d in documents)
+    # Without table detection the cells are ordinary blocks
+    assert any("Bolt" in d["content"] for d in documents)
+
+
+def test_scanned_pages_are_ocred_in_page_order(make_config, tmp_path, fake_ocr):
+    doc = fitz.open()
+    add_text_page(doc, "First digital page with a proper text layer. " * 3)
+    add_scanned_page(doc)
+    add_text_page(doc, "Third digital page with a proper text layer. " * 3)
+    path = save(doc, tmp_path / "mixed.pdf")
+
+    processor = PDFProcessor(make_config({"ocr.scanned_pages.dpi": 100}))
+    stats = {}
+    documents = processor.process_pdf(path, "mixed.pdf", stats)
+    assert stats["pages"] == 3 and stats["ocr_pages"] == 1
+    assert [(d["metadata"]["page_number"], d["metadata"]["content_type"]) for d in documents] == \
+        [(1, "text"), (2, "page_ocr"), (3, "text")]
+    # The whole page was rendered and OCRed once, off this thread
+    assert len(fake_ocr.sizes) == 1
+    assert fake_ocr.threads and threading.current_thread().name not in fake_ocr.threads
+
+
+def test_scanned_pages_share_one_ocr_pool(make_config, tmp_path, fake_ocr):
+    doc = fitz.open()
+    for _ in range(5):
+        add_scanned_page(doc)
+    path = save(doc, tmp_path / "scan.pdf")
+
+    config = make_config({"ocr.scanned_pages.dpi": 72, "ocr.scanned_pages.workers": 2})
+    for _ in range(2):
+        documents = PDFProcessor(config).process_pdf(path, "scan.pdf")
+        assert [d["metadata"]["page_number"] for d in documents] == [1, 2, 3, 4, 5]
+    assert fake_ocr.executor(8)._max_workers == 2
+    assert len(fake_ocr.threads) <= 2
+
+
+def test_scan_detection(make_config, tmp_path, fake_ocr):
+    doc = fitz.open()
+    add_text_page(doc, "Enough digital text to count as a text layer.")
+    add_scanned_page(doc)
+    doc.new_page()
+    add_text_page(doc, "Short")
+    doc[3].draw_rect(fitz.Rect(60, 60, 120, 100), fill=(0, 0, 0))
+    # Text drawn as vector shapes, with no image to measure
+    page = doc.new_page(width=595, height=842)
+    for y in range(60, 800, 24):
+        for x in range(60, 540, 30):
+            page.draw_rect(fitz.Rect(x, y, x + 18, y + 10), fill=(0, 0, 0))
+    path = save(doc, tmp_path / "pages.pdf")
+
+    processor = PDFProcessor(make_config())
+    doc = fitz.open(path)
+    assert [processor._is_scanned(page) for page in doc] == [False, True, False, False, True]
+    doc.close()
+
+    processor = PDFProcessor(make_config({"ocr.scanned_pages.enabled": False}))
+    stats = {}
+    documents = processor.process_pdf(path, "pages.pdf", stats)
+    # Without detection only the embedded image is OCRed, as an image
+    assert stats["ocr_pages"] == 0
+    assert [d["metadata"]["content_type"] for d in documents if d["metadata"]["page_number"] == 2] == ["image_ocr"]
@@ -0,0 +1,86 @@
+"""
+Tests for the staged ingestion pipeline
+"""
+
+import threading
+
+from src.core.pipeline import Pipeline, Stage
+from src.core.rag_system import MultimodalRAG
+
+
+def run_in_thread(fn, timeout: float = 10.0):
+    """Run fn and fail instead of hanging the suite on a deadlock"""
+    thread = threading.Thread(target=fn, daemon=True)
+    thread.start()
+    thread.join(timeout)
+    assert not thread.is_alive(), "pipeline did not finish"
+
+
+def test_sink_receives_outputs_while_input_is_read():
+    consumed = []
+    seen_at = []
+
+    def items():
+        for i in range(20):
+            consumed.append(i)
+            yield i
+
+    def sink(result):
+        seen_at.append(len(consumed))
+
+    pipeline = Pipeline([Stage("double", lambda x: x * 2, 3), Stage("odd", lambda x: None if x % 4 else x, 2)],
+                        queue_size=2)
+    outputs = pipeline.run(items(), sink=sink)
+
+    assert outputs == []
+    assert len(seen_at) == 10
+    # Bounded queues: the first results arrive long before the input ends
+    assert seen_at[0] < 20
+    stats = pipeline.get_stats()
+    assert stats["stages"]["double"]["processed"] == 20
+    assert stats["stages"]["odd"]["processed"] == 20
+
+
+def test_failing_error_handler_does_not_block_the_pipeline():
+    handled = []
+
+    def fail_odd(x):
+        if x % 2:
+            raise ValueError(x)
+        return x
+
+    def on_error(item, stage, error):
+        handled.append(item)
+        raise RuntimeError("handler failed")
+
+    outputs = []
+    pipeline = Pipeline([Stage("fail", fail_odd, 1), Stage("copy", lambda x: x, 1)], queue_size=1, on_error=on_error)
+    run_in_thread(lambda: outputs.extend(pipeline.run(range(50))))
+
+    assert sorted(outputs) == list(range(0, 50, 2))
+    assert sorted(handled) == list(range(1, 50, 2))
+    assert pipeline.get_stats()["stages"]["fail"]["failed"] == 25
+
+
+def test_failing_sink_does_not_block_the_pipeline():
+    def sink(result):
+        raise RuntimeError("sink failed")
+
+    pipeline = Pipeline([Stage("copy", lambda x: x, 1), Stage("copy2", lambda x: x, 1)], queue_size=1)
+    run_in_thread(lambda: pipeline.run(range(30), sink=sink))
+    assert pipeline.get_stats()["stages"]["copy2"]["processed"] == 30
+
+
+def test_process_folder_summarizes_files(make_config, write_text, tmp_path):
+    rag = MultimodalRAG(str(make_config().config_path))
+    for i in range(4):
+        write_text(tmp_path / "docs" / f"file{i}.txt", seed=f"doc{i}")
+    (tmp_path / "docs" / "empty.txt").write_text("")
+
+    results = rag.process_folder(str(tmp_path / "docs"))
+    assert results["total_files"] == 4
+    assert results["text"]["files_processed"] == 4
+    assert results["total_chunks"] == rag.vector_store.collection.count()
+    stages = results["stages"]["stages"]
+    assert stages["write"]["processed"] == 4
+    assert stages["extract"]["failed"] >= 1
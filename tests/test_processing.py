@@ -0,0 +1,164 @@
+"""
+Tests for the ingestion path: dedup index, job queue and token batching
+"""
+
+import os
+
+import numpy as np
+import pytest
+
+from src.core.deduplicator import ChunkDeduplicator, add_provenance, remove_provenance
+from src.core.job_queue import DONE, EXTRACTING, FAILED, PENDING, IngestionQueue
+from src.core.vector_store import VectorStore
+from src.models.schemas import ChunkBatch
+from src.utils.token_batching import TokenBatcher
+
+TEXT = ("The quarterly report shows revenue growth in every region, driven by the new product line "
+        "and steady demand from enterprise customers across the north and south markets.")
+
+
+def documents(prefix: str, texts, source_path: str):
+    return [{"id": f"{prefix}_{i}_0000000{i}", "content": text,
+             "metadata": {"filename": os.path.basename(source_path), "source_path": source_path,
+                          "file_type": "text", "chunk_index": i}}
+            for i, text in enumerate(texts)]
+
+
+def test_dedup_finds_near_duplicates(make_config):
+    dedup = ChunkDeduplicator(make_config())
+    batch = ChunkBatch.from_documents(documents("a.txt", [TEXT, "Something else entirely about cats."], "/a.txt"))
+    unique, stored = dedup.deduplicate_batch(batch)
+    assert len(unique) == 2 and not stored
+
+    edited = TEXT.replace("markets.", "market.")
+    batch = ChunkBatch.from_documents(documents("b.txt", [edited, edited], "/b.txt"))
+    unique, stored = dedup.deduplicate_batch(batch)
+    assert len(unique) == 0
+    assert [m["source_path"] for m in stored["a.txt_0_00000000"]] == ["/b.txt", "/b.txt"]
+
+    dedup.forget(["a.txt_0_00000000"])
+    unique, stored = dedup.deduplicate_batch(ChunkBatch.from_documents(documents("c.txt", [TEXT], "/c.txt")))
+    assert len(unique) == 1 and not stored
+
+
+def test_dedup_index_is_seeded_from_the_store(make_config):
+    config = make_config({"hierarchy.enabled": False})
+    VectorStore(config).add_documents(documents("a.txt", [TEXT], "/data/a.txt"))
+
+    # A new process starts with an empty index
+    store = VectorStore(config, query_cache_size=4)
+    batch = store.prepare_documents(ChunkBatch.from_documents(documents("b.txt", [TEXT], "/data/b.txt")))
+    assert len(batch) == 0
+    metadata = store.collection.get(ids=["a.txt_0_00000000"])["metadatas"][0]
+    assert metadata["sources"] == ["/data/a.txt", "/data/b.txt"]
+    assert metadata["duplicate_count"] == 1
+
+
+def test_seeding_reads_only_the_newest_chunks(make_config):
+    config = make_config({"hierarchy.enabled": False, "dedup.max_index_entries": 1})
+    VectorStore(config).add_documents(documents("a.txt", [TEXT], "/data/a.txt"))
+    VectorStore(config).add_documents(documents("b.txt", ["Something else entirely about cats and dogs."],
+                                                "/data/b.txt"))
+
+    store = VectorStore(config, query_cache_size=4)
+    store._seed_deduplicator()
+    assert list(store.deduplicator._signatures) == ["b.txt_0_00000000"]
+
+
+def test_provenance_counts_files_not_matches():
+    metadata = {"filename": "a.txt", "source_path": "/data/a.txt"}
+    for _ in range(3):
+        add_provenance(metadata, {"filename": "b.txt", "source_path": "/data/b.txt"})
+    add_provenance(metadata, {"filename": "c.txt", "source_path": "/data/c.txt"})
+    assert metadata["sources"] == ["/data/a.txt", "/data/b.txt", "/data/c.txt"]
+    assert metadata["duplicate_count"] == 2
+
+    assert remove_provenance(metadata, ["/data/a.txt"])
+    assert metadata["source_path"] == "/data/b.txt" and metadata["filename"] == "b.txt"
+    assert metadata["duplicate_count"] == 1
+    assert not remove_provenance(metadata, ["/data/b.txt", "/data/c.txt"])
+
+    # Sources written as a "|"-separated string by earlier versions
+    legacy = {"filename": "a.txt", "source_path": "/data/a.txt", "sources": "/data/a.txt|/data/b.txt",
+              "duplicate_count": 5}
+    assert remove_provenance(legacy, ["/data/b.txt"])
+    assert legacy["sources"] == ["/data/a.txt"] and legacy["duplicate_count"] == 0
+
+
+def test_job_queue_claim_fail_and_recover(make_config, write_text, tmp_path):
+    config = make_config()
+    first = write_text(tmp_path / "a.txt")
+    second = write_text(tmp_path / "b.txt")
+    queue = IngestionQueue(config)
+    assert queue.enqueue([first, second]) == 2
+    assert queue.enqueue([first, second]) == 0
+
+    job = queue.claim("worker")
+    assert job["file_path"] == os.path.abspath(first) and job["state"] == EXTRACTING
+    other = queue.claim("worker")
+    assert other["file_path"] == os.path.abspath(second)
+    assert queue.claim("worker") is None
+
+    # max_attempts is 2: one retry, then failed
+    assert queue.fail(job, "boom") == PENDING
+    assert queue.fail(queue.claim("worker"), "boom") == FAILED
+    assert queue.failures()[0]["error"] == "boom"
+
+    # The second job was interrupted mid-run
+    queue.start_embedding(other)
+    queue.close()
+    queue = IngestionQueue(config)
+    assert queue.recover() == 1
+    resumed = queue.claim("worker")
+    assert resumed["file_path"] == os.path.abspath(second) and resumed["written"] == 1
+    queue.complete(resumed, 3)
+    assert queue.states([second, first]) == {second: DONE, first: FAILED}
+
+    os.utime(second, (1, 1))
+    assert queue.enqueue([second]) == 1
+    assert queue.counts()[PENDING] == 1
+
+
+class WordModel:
+    """One token per word, vectors from word counts"""
+
+    max_seq_length = 10
+
+    def count_tokens(self, texts):
+        return [len(text.split()) for text in texts]
+
+    def encode(self, texts, batch_size=32):
+        vectors = np.array([[len(text.split()), 1.0] for text in texts], dtype=np.float32)
+        return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+    def get_sentence_embedding_dimension(self):
+        return 2
+
+
+def test_split_windows_fit_the_model():
+    batcher = TokenBatcher(WordModel(), overflow="split")
+    text = " ".join(f"w{i}" for i in range(37))
+    windows = batcher._split(text, 37)
+    assert len(windows) > 1
+    assert all(len(window.split()) <= 10 for window in windows)
+    assert " ".join(windows) == text
+
+
+def test_combine_weights_windows_by_tokens():
+    vectors = np.array([[1.0, 0.0], [0.0, 1.0]])
+    combined = TokenBatcher._combine(vectors, [3, 1])
+    assert np.linalg.norm(combined) == pytest.approx(1.0)
+    assert combined[0] / combined[1] == pytest.approx(3.0)
+
+    # Vectors that are not unit length are averaged without renormalizing
+    np.testing.assert_allclose(TokenBatcher._combine(np.array([[2.0, 0.0], [4.0, 0.0]]), [1, 1]), [3.0, 0.0])
+
+
+def test_encode_reports_overlong_texts():
+    texts = ["short text", " ".join(["word"] * 25)]
+    embeddings, overlong = TokenBatcher(WordModel(), overflow="split").encode(texts)
+    assert embeddings.shape == (2, 2)
+    assert list(overlong) == [1] and overlong[1]["token_count"] == 25 and overlong[1]["split_windows"] >= 3
+
+    _, overlong = TokenBatcher(WordModel()).encode(texts)
+    assert overlong[1]["truncated_tokens"] == 15
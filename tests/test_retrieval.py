@@ -0,0 +1,177 @@
+"""
+Tests for deletes, compaction and columnar export of the vector store
+"""
+
+import os
+import uuid
+
+import numpy as np
+import pytest
+
+from src.core import snapshot
+from src.core.rag_system import MultimodalRAG
+from src.core.vector_store import VectorStore
+
+
+def stored(store: VectorStore):
+    """{id: metadata} of every chunk in the store"""
+    found = {}
+    for page in store.iter_chunks(embeddings=False):
+        found.update(zip(page["ids"], page["metadatas"]))
+    return found
+
+
+def chunks(filename: str, source_path: str, count: int, text: str = "chunk"):
+    """Chunk dicts with fresh ids in the processors' format"""
+    return [{
+        "id": f"{filename}_{i}_{str(uuid.uuid4())[:8]}",
+        "content": f"{text} {i} of {source_path} " + " ".join(f"w{i * 13 + j}" for j in range(12)),
+        "metadata": {"filename": filename, "source_path": source_path, "file_type": "text", "chunk_index": i}
+    } for i in range(count)]
+
+
+def test_remove_file_keeps_same_named_file(make_config, write_text, tmp_path):
+    rag = MultimodalRAG(str(make_config().config_path))
+    first = write_text(tmp_path / "a" / "notes.txt", seed="alpha")
+    second = write_text(tmp_path / "b" / "notes.txt", seed="beta")
+    rag.process_file(first)
+    written = rag.process_file(second)["chunks_created"]
+
+    assert rag.remove_file(first) > 0
+    remaining = stored(rag.vector_store)
+    assert len(remaining) == written
+    assert {m["source_path"] for m in remaining.values()} == {os.path.abspath(second)}
+    assert rag.vector_store.hierarchy.documents.get()["ids"] == [os.path.abspath(second)]
+
+
+def test_delete_hands_duplicates_to_remaining_file(make_config, write_text, tmp_path):
+    rag = MultimodalRAG(str(make_config().config_path))
+    first = write_text(tmp_path / "a" / "report.txt", seed="same")
+    second = write_text(tmp_path / "b" / "copy.txt", seed="same")
+    written = rag.process_file(first)["chunks_created"]
+    assert rag.process_file(second)["duplicates_skipped"] == written
+
+    assert rag.remove_file(first) == 0
+    kept = stored(rag.vector_store)
+    assert len(kept) == written
+    for metadata in kept.values():
+        assert metadata["source_path"] == os.path.abspath(second)
+        assert metadata["filename"] == "copy.txt"
+        assert metadata["sources"] == [os.path.abspath(second)]
+        assert metadata["duplicate_count"] == 0
+
+    assert rag.remove_file(second) == written
+    assert not stored(rag.vector_store)
+
+
+def test_delete_of_duplicate_file_only_touches_its_chunks(make_config, write_text, tmp_path):
+    rag = MultimodalRAG(str(make_config().config_path))
+    original = write_text(tmp_path / "a" / "report.txt", seed="same")
+    copy = write_text(tmp_path / "b" / "copy.txt", seed="same")
+    other = write_text(tmp_path / "c" / "other.txt", seed="other")
+    other_copy = write_text(tmp_path / "d" / "other.txt", seed="other")
+    for path in (original, copy, other, other_copy):
+        rag.process_file(path)
+
+    assert rag.remove_file(copy) == 0
+    for metadata in stored(rag.vector_store).values():
+        if metadata["source_path"] == os.path.abspath(original):
+            assert metadata["sources"] == [os.path.abspath(original)]
+            assert metadata["duplicate_count"] == 0
+        else:
+            assert metadata["sources"] == [os.path.abspath(other), os.path.abspath(other_copy)]
+            assert metadata["duplicate_count"] == 1
+
+
+def test_reingested_job_replaces_its_chunks(make_config, write_text, tmp_path):
+    rag = MultimodalRAG(str(make_config().config_path))
+    path = write_text(tmp_path / "docs" / "notes.txt", paragraphs=8)
+    rag.process_folder(str(tmp_path / "docs"))
+
+    write_text(tmp_path / "docs" / "notes.txt", paragraphs=4, seed="edited")
+    os.utime(path, (1, 1))
+    results = rag.process_folder(str(tmp_path / "docs"))
+    assert results["total_files"] == 1
+    assert len(stored(rag.vector_store)) == results["total_chunks"]
+
+
+def test_compact_collection_keeps_latest_ingest_per_file(make_config):
+    store = VectorStore(make_config({"dedup.enabled": False, "hierarchy.enabled": False}))
+    # The same file ingested twice without a delete, the second time with
+    # fewer chunks, and a same-named file elsewhere
+    store.add_documents(chunks("notes.txt", "/data/a/notes.txt", 5))
+    latest = chunks("notes.txt", "/data/a/notes.txt", 2)
+    store.add_documents(latest)
+    store.add_documents(chunks("notes.txt", "/data/b/notes.txt", 3, text="other"))
+
+    counts = snapshot.compact_collection(store.client, store.collection_name, batch_size=2)
+    assert counts == {"rows": 10, "kept": 5, "stale": 5, "orphans": 0}
+    collection = store.client.get_collection(store.collection_name)
+    kept = collection.get(where={"source_path": "/data/a/notes.txt"}, include=[])["ids"]
+    assert sorted(kept) == sorted(doc["id"] for doc in latest)
+
+    counts = snapshot.compact_collection(store.client, store.collection_name, keep_files={"/data/b/notes.txt"})
+    assert counts == {"rows": 5, "kept": 3, "stale": 0, "orphans": 2}
+
+
+def test_compaction_keeps_reingested_and_handed_over_chunks(make_config, write_text, tmp_path):
+    rag = MultimodalRAG(str(make_config().config_path))
+    first = write_text(tmp_path / "a" / "report.txt", seed="same")
+    second = write_text(tmp_path / "b" / "copy.txt", paragraphs=10, seed="same")
+    rag.process_file(first)
+    rag.process_file(second)
+    # Ingested again without a delete: unchanged chunks match their old
+    # copies and join the new ingest
+    assert rag.process_file(second)["chunks_created"] > 0
+
+    rag.remove_file(first)
+    before = stored(rag.vector_store)
+    counts = snapshot.compact_collection(rag.vector_store.client, rag.vector_store.collection_name)
+    assert counts["stale"] == 0
+    assert counts["kept"] == len(before)
+
+
+@pytest.mark.parametrize("layout", ["npy", "parquet", "arrow"])
+def test_columnar_round_trip(make_config, tmp_path, layout):
+    if layout != "npy":
+        pytest.importorskip("pyarrow")
+    config = make_config({"dedup.enabled": False})
+    source = VectorStore(config)
+    source.add_documents(chunks("notes.txt", "/data/notes.txt", 7))
+    exported = source.export_columnar(str(tmp_path / "export"), batch_size=3, layout=layout)
+    assert exported["rows"] == 7 and exported["layout"] == layout
+
+    target = VectorStore(config, collection_name="imported_docs")
+    assert target.import_columnar(str(tmp_path / "export"), batch_size=3) == 7
+    original = source.collection.get(include=["documents", "metadatas", "embeddings"])
+    copied = target.collection.get(ids=original["ids"], include=["documents", "metadatas", "embeddings"])
+    order = [copied["ids"].index(doc_id) for doc_id in original["ids"]]
+    assert [copied["documents"][i] for i in order] == original["documents"]
+    assert [copied["metadatas"][i] for i in order] == original["metadatas"]
+    np.testing.assert_allclose(np.asarray(copied["embeddings"])[order], original["embeddings"], rtol=1e-6)
+
+    with pytest.raises(ValueError):
+        target.import_columnar(str(tmp_path / "export"))
+
+
+def test_snapshot_round_trip(make_config, tmp_path):
+    config = make_config()
+    source = VectorStore(config)
+    source.add_documents(chunks("notes.txt", "/data/notes.txt", 5))
+    exported = snapshot.export_snapshot(config, str(tmp_path / "snap"), batch_size=2)
+    assert exported["collections"] == 3 and exported["rows"] == 6
+
+    imported = snapshot.import_snapshot(config, str(tmp_path / "snap"), collection_name="restored_docs",
+                                        batch_size=2)
+    assert imported["rows"] == 6
+    original = source.collection.get(include=["documents", "metadatas", "embeddings"])
+    copied = source.client.get_collection("restored_docs").get(ids=original["ids"],
+                                                               include=["documents", "metadatas", "embeddings"])
+    order = [copied["ids"].index(doc_id) for doc_id in original["ids"]]
+    assert [copied["documents"][i] for i in order] == original["documents"]
+    assert [copied["metadatas"][i] for i in order] == original["metadatas"]
+    np.testing.assert_allclose(np.asarray(copied["embeddings"])[order], original["embeddings"], rtol=1e-6)
+    assert source.client.get_collection("restored_docs_documents").count() == 1
+
+    with pytest.raises(ValueError):
+        snapshot.import_snapshot(config, str(tmp_path / "snap"), collection_name="restored_docs")
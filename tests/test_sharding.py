@@ -0,0 +1,72 @@
+"""
+Tests for shard routing and fan-out search
+"""
+
+import os
+
+from src.core.sharded_store import ShardedVectorStore
+
+
+def sharded(make_config, **overrides):
+    settings = {"sharding.enabled": True, "sharding.shards": 4, "hierarchy.enabled": False,
+                "dedup.enabled": False}
+    settings.update(overrides)
+    return ShardedVectorStore(make_config(settings))
+
+
+def routes(store, paths):
+    targets = store._route([{"filename": os.path.basename(path), "source_path": path} for path in paths])
+    return {path: collection.name for path, collection in zip(paths, targets)}
+
+
+def test_adding_a_shard_moves_few_files(make_config):
+    store = sharded(make_config)
+    paths = [f"/data/folder{i % 7}/file{i}.txt" for i in range(400)]
+    before = routes(store, paths)
+    assert routes(store, paths) == before
+    assert len(set(before.values())) == 4
+    # Every shard gets a fair share
+    assert min(list(before.values()).count(name) for name in set(before.values())) > 60
+
+    new = store.add_shard().name
+    after = routes(store, paths)
+    moved = [path for path in paths if after[path] != before[path]]
+    assert {after[path] for path in moved} == {new}
+    assert 40 < len(moved) < 130
+
+
+def test_same_named_files_route_independently(make_config):
+    store = sharded(make_config)
+    paths = [f"/data/folder{i}/notes.txt" for i in range(40)]
+    assert len(set(routes(store, paths).values())) > 1
+
+
+def test_keyed_shard_names_are_distinct_and_valid(make_config):
+    store = sharded(make_config, **{"sharding.route_key": "customer"})
+    names = [store._keyed_shard(value).name for value in ("a.b", "a_b", "acme.", "--x--", "日本")]
+    assert len(set(names)) == 5
+    assert all(name[-1].isalnum() and "__" not in name for name in names)
+
+    # Reopening finds the keyed shards again
+    reopened = ShardedVectorStore(store.config)
+    assert reopened._keyed_shard("a.b").name == names[0]
+    assert len(reopened.keyed_shards) == 5
+
+
+def test_search_and_delete_across_shards(make_config):
+    store = sharded(make_config)
+    for i in range(12):
+        path = f"/data/file{i}.txt"
+        store.add_documents([{
+            "id": f"file{i}.txt_{j}_0000000{j}",
+            "content": f"topic{i} " * 5 + f"paragraph {j} about subject {i}",
+            "metadata": {"filename": f"file{i}.txt", "source_path": path, "file_type": "text", "chunk_index": j}
+        } for j in range(3)])
+    assert sum(1 for collection in store._collections() if collection.count()) > 1
+    assert store.get_collection_stats() == 36
+
+    results = store.search("topic7 topic7 topic7", top_k=3, threshold=-1.0, hierarchical=False)
+    assert [r["metadata"]["source_path"] for r in results] == ["/data/file7.txt"] * 3
+
+    assert store.delete_file("/data/file7.txt") == 3
+    assert store.get_collection_stats() == 33
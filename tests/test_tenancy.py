@@ -0,0 +1,71 @@
+"""
+Tests for tenant collections, per-tenant settings and the result cache
+"""
+
+import time
+
+import pytest
+
+from src.core.rag_system import MultimodalRAG
+from src.core.tenancy import TenantRegistry
+
+TENANTS = {
+    "acme.eu": {"collection_name": "acme_eu_docs", "query_cache_size": 1, "embedding_cache_size": 3},
+    "beta": {"collection_name": "beta_docs"}
+}
+
+
+def test_dotted_tenant_names_keep_their_settings(make_config):
+    registry = TenantRegistry(make_config({"tenancy.tenants": TENANTS}))
+    tenant = registry.get("acme.eu")
+    assert tenant.collection_name == "acme_eu_docs"
+    assert tenant.results.maxsize == 1
+    assert tenant.vector_store.query_embeddings.maxsize == 3
+
+    # Unlisted tenants get a derived collection and the shared defaults
+    other = registry.get("acme.us")
+    assert other.collection_name == "test_docs_tenant_acme_us"
+    assert other.results.maxsize == 256
+    assert registry.get("acme.eu") is tenant
+
+
+def test_unknown_tenants_can_be_refused(make_config):
+    registry = TenantRegistry(make_config({"tenancy.tenants": TENANTS, "tenancy.allow_unknown": False}))
+    assert registry.get("beta").collection_name == "beta_docs"
+    with pytest.raises(ValueError):
+        registry.get("gamma")
+
+
+def test_tenants_are_isolated(make_config, write_text, tmp_path):
+    rag = MultimodalRAG(str(make_config({"tenancy.tenants": TENANTS}).config_path))
+    rag.process_file(write_text(tmp_path / "eu.txt", seed="euro"), tenant="acme.eu")
+    rag.process_file(write_text(tmp_path / "beta.txt", seed="beta"), tenant="beta")
+
+    for tenant, filename in (("acme.eu", "eu.txt"), ("beta", "beta.txt")):
+        results = rag.search("Paragraph covers topic", top_k=20, threshold=-1.0, tenant=tenant)
+        assert results and {r["metadata"]["filename"] for r in results} == {filename}
+    assert rag.get_stats()["total_documents"] == 0
+
+    rag.remove_file(str(tmp_path / "beta.txt"), tenant="beta")
+    assert rag.get_stats(tenant="beta")["total_documents"] == 0
+    assert rag.get_stats(tenant="acme.eu")["total_documents"] > 0
+
+
+def test_result_cache_expires_and_is_invalidated(make_config, write_text, tmp_path):
+    rag = MultimodalRAG(str(make_config({"tenancy.cache_ttl_seconds": 0.2}).config_path))
+    rag.process_file(write_text(tmp_path / "a.txt", seed="first"))
+    tenant = rag.tenants.get()
+
+    first = rag.search("Paragraph covers topic", top_k=3, threshold=-1.0)
+    first[0]["metadata"]["filename"] = "changed by the caller"
+    again = rag.search("Paragraph covers topic", top_k=3, threshold=-1.0)
+    assert again[0]["metadata"]["filename"] == "a.txt"
+    assert tenant.results.get_stats()["hits"] == 1
+
+    time.sleep(0.3)
+    rag.search("Paragraph covers topic", top_k=3, threshold=-1.0)
+    assert tenant.results.get_stats()["hits"] == 1
+
+    # Ingesting into the tenant drops its cached results
+    rag.process_file(write_text(tmp_path / "b.txt", seed="second"))
+    assert len(tenant.results) == 0
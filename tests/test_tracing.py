@@ -0,0 +1,85 @@
+"""
+Tests for per-call tracing and profiling
+"""
+
+import json
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from src.core.rag_system import MultimodalRAG
+from src.utils.tracing import Tracer, in_current_trace, span
+
+
+def test_spans_nest_and_join_from_worker_threads(make_config):
+    tracer = Tracer(make_config())
+    pool = ThreadPoolExecutor(2)
+    with tracer.trace("outer", force=True, query="q") as trace:
+        with span("step", size=2) as step:
+            step.set(hit=True)
+            with span("inner"):
+                pass
+
+            @in_current_trace
+            def work(i):
+                with span("worker", item=i):
+                    return threading.get_ident()
+
+            threads = set(pool.map(work, range(4)))
+        # Nested traced calls only add a span
+        with tracer.trace("nested", force=True) as nested:
+            assert nested is None
+
+    spans = trace.to_dict()["spans"]
+    assert [(s["name"], s["depth"]) for s in spans[:3]] == [("outer", 0), ("step", 1), ("inner", 2)]
+    assert spans[1]["args"] == {"size": 2, "hit": True}
+    workers = [s for s in spans if s["name"] == "worker"]
+    assert len(workers) == 4 and {s["depth"] for s in workers} == {2}
+    assert {e["tid"] for e in trace.to_chrome()["traceEvents"] if e["name"] == "worker"} == threads
+    assert spans[-1]["name"] == "nested"
+    assert trace.summary()["outer"] >= trace.summary()["step"]
+
+    # The pool's threads are back to untraced afterwards
+    assert [type(s).__name__ for s in pool.map(lambda _: span("late"), range(4))] == ["_NullSpan"] * 4
+    pool.shutdown()
+
+
+def test_untraced_calls_are_free(make_config):
+    tracer = Tracer(make_config({"tracing.enabled": False}))
+    with tracer.trace("call") as trace:
+        assert trace is None
+        assert span("anything") is span("other")
+    fn = lambda: None
+    assert in_current_trace(fn) is fn
+
+
+def test_sampled_traces_are_profiled_and_written(make_config, tmp_path):
+    tracer = Tracer(make_config({"tracing.enabled": True, "tracing.sample_rate": 1.0, "tracing.profile_rate": 1.0,
+                                 "tracing.profile_top": 5, "tracing.output_dir": str(tmp_path / "traces")}))
+    with tracer.trace("search", query="q") as trace:
+        sum(i * i for i in range(10000))
+    assert 0 < len(trace.profile) <= 5
+
+    files = list((tmp_path / "traces").glob("search-*.json"))
+    assert len(files) == 1
+    written = json.loads(files[0].read_text())
+    assert written["otherData"]["id"] == trace.id
+    assert written["traceEvents"][0]["name"] == "search"
+
+    # Short traces are not written
+    tracer.min_duration_ms = 10000
+    with tracer.trace("search"):
+        pass
+    assert len(list((tmp_path / "traces").glob("*.json"))) == 1
+
+
+def test_rag_calls_return_their_traces(make_config, write_text, tmp_path):
+    rag = MultimodalRAG(str(make_config().config_path))
+    result = rag.process_file(write_text(tmp_path / "a.txt", seed="alpha"), trace=True)
+    names = {s["name"] for s in result["trace"]["spans"]}
+    assert {"process_file", "embed_batch", "chroma_add"} <= names
+
+    results, trace = rag.search("Paragraph covers topic", top_k=3, threshold=-1.0, trace=True)
+    assert results
+    summary = trace.summary()
+    assert {"search", "vector_search", "encode_query", "chroma_query"} <= set(summary)
+    assert rag.search("Paragraph covers topic", top_k=3, threshold=-1.0, trace=False)
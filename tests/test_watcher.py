@@ -0,0 +1,106 @@
+"""
+Tests for folder watching
+"""
+
+import os
+import threading
+import time
+
+from src.core.job_queue import DONE, PENDING
+from src.core.rag_system import MultimodalRAG
+from src.core.watcher import DELETED, MODIFIED
+
+
+def chunks_of(rag, path, tenant=None):
+    store = rag.tenants.get(tenant).vector_store
+    return len(store.collection.get(where={"source_path": os.path.abspath(path)})["ids"])
+
+
+def wait_for(condition, timeout: float = 15.0) -> bool:
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        if condition():
+            return True
+        time.sleep(0.05)
+    return False
+
+
+def test_apply_indexes_only_the_changed_files(make_config, write_text, tmp_path):
+    rag = MultimodalRAG(str(make_config().config_path))
+    watcher = rag.watch(str(tmp_path / "watched"))
+    other = write_text(tmp_path / "elsewhere" / "queued.txt", seed="other")
+    rag.jobs.enqueue([other])
+
+    path = write_text(tmp_path / "watched" / "a.txt", seed="alpha")
+    now = time.time()
+    watcher._apply({path: (MODIFIED, now, now)})
+
+    assert chunks_of(rag, path) > 0
+    # Work queued by someone else is left for its own run
+    assert rag.jobs.states([path, other]) == {path: DONE, other: PENDING}
+    assert chunks_of(rag, other) == 0
+
+    os.remove(path)
+    watcher._apply({path: (DELETED, time.time(), time.time())})
+    assert chunks_of(rag, path) == 0
+
+    stats = watcher.get_stats()
+    assert stats["files_indexed"] == 1 and stats["files_removed"] == 1
+    # Deletes are timed on their own, not as freshness lag
+    assert len(watcher.lags) == 1 and len(watcher.removal_lags) == 1
+    assert "lag_p50" in stats and "removal_lag_p50" in stats
+
+
+def test_apply_keeps_tenants_apart(make_config, write_text, tmp_path):
+    rag = MultimodalRAG(str(make_config().config_path))
+    watcher = rag.watch(str(tmp_path / "watched"), tenant="acme")
+    path = write_text(tmp_path / "watched" / "a.txt", seed="alpha")
+    # The same file queued for the default tenant is not run by acme's watcher
+    rag.jobs.enqueue([path])
+
+    now = time.time()
+    watcher._apply({path: (MODIFIED, now, now)})
+    assert chunks_of(rag, path, "acme") > 0
+    assert chunks_of(rag, path) == 0
+    assert rag.jobs.states([path]) == {path: PENDING}
+
+
+def test_rescan_removes_files_gone_from_disk(make_config, write_text, tmp_path):
+    rag = MultimodalRAG(str(make_config().config_path))
+    folder = tmp_path / "watched"
+    kept = write_text(folder / "kept.txt", seed="kept")
+    gone = write_text(folder / "gone.txt", seed="gone")
+    rag.process_folder(str(folder))
+    assert chunks_of(rag, gone) > 0
+
+    os.remove(gone)
+    watcher = rag.watch(str(folder))
+    watcher.rescan()
+    assert chunks_of(rag, gone) == 0 and chunks_of(rag, kept) > 0
+    assert watcher.get_stats()["files_removed"] == 1
+    assert rag.jobs.paths() == [kept]
+
+
+def test_polling_watcher_follows_the_folder(make_config, write_text, tmp_path):
+    config = make_config({"watch.backend": "polling", "watch.poll_interval_seconds": 0.1,
+                          "watch.debounce_seconds": 0.1})
+    rag = MultimodalRAG(str(config.config_path))
+    folder = tmp_path / "watched"
+    folder.mkdir()
+    watcher = rag.watch(str(folder))
+    thread = threading.Thread(target=watcher.run, kwargs={"initial_scan": False}, daemon=True)
+    thread.start()
+    try:
+        # Files written before the first snapshot would not be events
+        assert wait_for(lambda: watcher.source is not None)
+        path = write_text(folder / "new.txt", seed="fresh")
+        assert wait_for(lambda: chunks_of(rag, path) > 0)
+        os.remove(path)
+        assert wait_for(lambda: chunks_of(rag, path) == 0)
+    finally:
+        watcher.stop()
+        thread.join(10)
+
+    stats = watcher.get_stats()
+    assert stats["backend"] == "polling"
+    assert stats["files_indexed"] == 1 and stats["files_removed"] == 1